@@ -23,6 +23,7 @@ to check for polygon self intersections.
 
 from __future__ import annotations
 import manifold3d as _m
+import numpy as _np
 
 
 class ValidationError(BaseException):
@@ -36,6 +37,8 @@ class ValidationError(BaseException):
 
 
 from ._color import _parse_color
+from . import _cache
+from . import _trace
 
 __version__ = "1.3.0"
 
@@ -60,6 +63,26 @@ class Obj3d:
             o = _m.Manifold().as_original()
         self.mo = o
 
+    # Pickling (used by `parallel_map` and the geometry cache) goes through the mesh.
+    # Colors are not kept.
+    def __getstate__(self) -> dict:
+        mesh = self.mo.to_mesh64()
+        return {
+            "verts": mesh.vert_properties,
+            "tris": mesh.tri_verts,
+            "merge_from": _np.array(mesh.merge_from_vert, _np.uint64),
+            "merge_to": _np.array(mesh.merge_to_vert, _np.uint64),
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        mesh = _m.Mesh64(
+            state["verts"],
+            state["tris"],
+            merge_from_vert=state["merge_from"],
+            merge_to_vert=state["merge_to"],
+        )
+        self.mo = _m.Manifold(mesh)
+
     def bounding_box(self) -> tuple[float, float, float, float, float, float]:
         """
         Return the bounding box of this object.
@@ -136,6 +159,7 @@ class Obj3d:
         """
         return self.mo.is_empty()
 
+    @_cache.cache_op("Obj3d.minkowski_difference")
     def minkowski_difference(self, other: Obj3d) -> Obj3d:
         """
         Return the minkowski_sum of this object and other.
@@ -144,6 +168,7 @@ class Obj3d:
         """
         return Obj3d(self.mo.minkowski_difference(other.mo))
 
+    @_cache.cache_op("Obj3d.minkowski_sum")
     def minkowski_sum(self, other: Obj3d) -> Obj3d:
         """
         Return the minkowski_sum of this object and other.
@@ -386,6 +411,43 @@ class Obj3d:
         return self.mo.volume()
 
 
+class _Deferred:
+    """
+    A 2D boolean operation that has not been computed yet.
+
+    See `Config.set_lazy_evaluation`. The operands are `Obj2d` objects,
+    which may themselves be deferred.
+    """
+
+    def __init__(self, op: _m.OpType, operands: list[Obj2d]) -> None:
+        self.op = op
+        self.operands = operands
+
+    def _gather(self) -> list[object]:
+        # Nested operations that can be done in the same batch_boolean call are merged.
+        Add = _m.OpType.Add
+        Subtract = _m.OpType.Subtract
+        l = []
+        for i, o in enumerate(self.operands):
+            d = o._mo
+            if type(d) == _Deferred and (
+                (d.op == self.op and (self.op != Subtract or i == 0))
+                or (self.op == Subtract and i > 0 and d.op == Add)
+            ):
+                l.extend(d._gather())
+            else:
+                l.append(o.mo)
+        return l
+
+    def evaluate(self) -> object:
+        l = self._gather()
+        if self.op == _m.OpType.Subtract:
+            from .bulk_ops import _cutters
+
+            l = _cutters(l, 2)
+        return _m.CrossSection.batch_boolean(l, self.op)
+
+
 class Obj2d:
     """
     Wrapper class for "CrossSections", which are 2D graphical objects.
@@ -397,9 +459,46 @@ class Obj2d:
     def __init__(self, o: object = None, color=None) -> None:
         if o == None:
             o = _m.CrossSection()
-        self.mo = o
+        self._mo = o
         self._color = color
 
+    @property
+    def mo(self) -> object:
+        if type(self._mo) == _Deferred:
+            self._mo = self._mo.evaluate()
+        return self._mo
+
+    @mo.setter
+    def mo(self, o: object) -> None:
+        self._mo = o
+
+    # Pickling (used by `parallel_map` and the geometry cache) goes through the polygons.
+    def __getstate__(self) -> dict:
+        polys = self.mo.to_polygons()
+        return {
+            "pts": _np.concatenate(polys) if len(polys) > 0 else _np.zeros((0, 2)),
+            "lens": _np.array([len(p) for p in polys], _np.int64),
+            "color": _np.array(self._color if self._color != None else (), _np.int64),
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        pts = state["pts"]
+        lens = state["lens"]
+        ends = _np.cumsum(lens)
+        polys = [pts[e - n : e] for n, e in zip(lens, ends)]
+        color = state["color"]
+        self._mo = _m.CrossSection(polys, _m.FillRule.Positive)
+        self._color = tuple(color.tolist()) if len(color) == 3 else None
+
+    def _deferred_map(self, method: str, *args) -> Obj2d:
+        # Booleans commute with affine transforms, so a transform of a deferred
+        # operation is pushed down to its operands.
+        d = self._mo
+        return Obj2d(
+            _Deferred(d.op, [getattr(o, method)(*args) for o in d.operands]),
+            color=self._color,
+        )
+
     def area(self) -> float:
         """
         The area of this Obj2d.
@@ -499,6 +598,8 @@ class Obj2d:
             uv[0] = 1
         if axes[1]:
             uv[1] = 1
+        if type(self._mo) == _Deferred:
+            return self._deferred_map("mirror", axes)
         return Obj2d(self.mo.mirror(uv), self._color)
 
     def num_verts(self) -> int:
@@ -526,7 +627,7 @@ class Obj2d:
 
         """
         if segments == -1:
-            segments = Config.get_default_segments()
+            segments = Config.get_segments(delta)
         _chkGE("segments", segments, 3)
 
         if join_type == "round":
@@ -618,6 +719,8 @@ class Obj2d:
         Rotate this object by the given degrees.
 
         """
+        if type(self._mo) == _Deferred:
+            return self._deferred_map("rotate", degrees)
         return Obj2d(self.mo.rotate(degrees), color=self._color)
 
     def scale(self, factors: list[float, float]) -> Obj2d:
@@ -627,6 +730,8 @@ class Obj2d:
         If you want no change, use `1.0`, that means 100% (thus unchanged).
         """
         _chkV2("factors", factors)
+        if type(self._mo) == _Deferred:
+            return self._deferred_map("scale", factors)
         return Obj2d(self.mo.scale(factors), color=self._color)
 
     def to_paths(self) -> list[list[float, float]]:
@@ -646,6 +751,8 @@ class Obj2d:
         if len(matrix2x3) != 2 or len(matrix2x3[0]) != 3 or len(matrix2x3[1]) != 3:
             raise ValueError("Improperly sized 2x3 matrix.")
 
+        if type(self._mo) == _Deferred:
+            return self._deferred_map("transform", matrix2x3)
         return Obj2d(self.mo.transform(matrix2x3), color=self._color)
 
     def translate(self, offsets: list[float, float]) -> Obj2d:
@@ -653,6 +760,8 @@ class Obj2d:
         Translate (move) this object by the given offsets.
         """
         _chkV2("offsets", offsets)
+        if type(self._mo) == _Deferred:
+            return self._deferred_map("translate", offsets)
         return Obj2d(self.mo.translate(offsets), color=self._color)
 
 
@@ -676,9 +785,16 @@ class Config:
         pass
 
     _default_segments = 36
+    _chord_tolerance = None
+    _min_facet_angle = 3.0
     _default_units = "mm"
     _layer_resolution = 0.1
     _default_color = _parse_color("tan")
+    _cache_dir = None
+    _lazy_evaluation = False
+    _max_workers = None
+    _boolean_memory_limit = None
+    _cache_max_size = 1024
 
     # Prevent instantiation
     # def __new__(cls, *args, **kwargs):
@@ -713,10 +829,85 @@ class Config:
         In circular functions, if the value passed in for `segments` is `-1`, then
         the `default_segments` value is used. Thus circular functions have
         a default value for `segments` of `-1`.
+
+        To have each circular object choose its own number of segments from its radius,
+        see `set_chord_tolerance`.
         """
         _chkGE("segments", segments, 3)
         cls._default_segments = segments
 
+    @classmethod
+    def get_chord_tolerance(cls) -> float | None:
+        """
+        Get the largest distance allowed between a circle and its segments,
+        or `None` if circular objects use `default_segments`.
+        """
+        return cls._chord_tolerance
+
+    @classmethod
+    def set_chord_tolerance(cls, tolerance: float | None = None) -> None:
+        """
+        Set the largest distance allowed between a true circle and the segments drawing it.
+
+        When a tolerance is set, circular functions called with `segments = -1`
+        choose the number of segments from their radius (see `get_segments`),
+        instead of using `default_segments` for everything.
+        Small holes then get few segments and large curves get many,
+        so models have far fewer triangles (and operations on them are faster)
+        while every curve stays within `tolerance` of its true shape.
+
+        A tolerance equal to the layer resolution is usually invisible when printed:
+
+        ```
+        Config.set_chord_tolerance(Config.get_layer_resolution())
+        ```
+
+        The default is `None`, which uses `default_segments` for every radius.
+        """
+        if tolerance != None:
+            _chkGT("tolerance", tolerance, 0)
+        cls._chord_tolerance = tolerance
+
+    @classmethod
+    def get_min_facet_angle(cls) -> float:
+        """
+        Get the smallest angle (in degrees) a segment may cover when a chord tolerance is set.
+        """
+        return cls._min_facet_angle
+
+    @classmethod
+    def set_min_facet_angle(cls, degrees: float = 3.0) -> None:
+        """
+        Set the smallest angle (in degrees) a segment may cover when a chord tolerance is set.
+
+        This limits the number of segments used for very large circles
+        to `360 / degrees`. The default is 3 degrees, so at most 120 segments.
+        """
+        _chkGT("degrees", degrees, 0)
+        cls._min_facet_angle = degrees
+
+    @classmethod
+    def get_segments(cls, radius: float) -> int:
+        """
+        Get the number of segments a circular function uses for `radius` when called with `segments = -1`.
+
+        Without a chord tolerance (see `set_chord_tolerance`) this is `default_segments`.
+        Otherwise it is the fewest segments keeping the circle within the tolerance,
+        limited by `min_facet_angle`, and rounded up to a multiple of 4 (never less than 8).
+        """
+        tol = cls._chord_tolerance
+        if tol == None:
+            return cls._default_segments
+        radius = abs(radius)
+        most = max(8, int(360.0 / cls._min_facet_angle) // 4 * 4)
+        if radius <= tol:
+            n = 8
+        else:
+            # A segment covering angle a is at most radius * (1 - cos(a/2)) from the circle.
+            n = int(_np.ceil(_np.pi / _np.arccos(1.0 - tol / radius) - 1e-9))
+        n = min(max(n, 8), most)
+        return (n + 3) // 4 * 4
+
     @classmethod
     def get_default_units(cls) -> str:
         """
@@ -777,6 +968,170 @@ class Config:
         """
         cls._default_color = _parse_color(cspec)
 
+    @classmethod
+    def get_lazy_evaluation(cls) -> bool:
+        """
+        Get whether 2D boolean operations are deferred until their result is needed.
+        """
+        return cls._lazy_evaluation
+
+    @classmethod
+    def set_lazy_evaluation(cls, lazy: bool = False) -> None:
+        """
+        Set whether 2D boolean operations are deferred until their result is needed.
+
+        Obj3d operations are always deferred: Manifold records them and only computes
+        the result when it is needed (for example by `volume`, `save` or `view`).
+        Before that, transforms are combined, nested booleans are merged into
+        single batch operations, and shared parts are only computed once.
+
+        Obj2d booleans (`union`, `difference` and `intersect`) are normally computed
+        immediately. When `lazy` is `True` they are recorded instead.
+        Nested operations that can be done together (for example a `union` of `union`s,
+        or a `difference` whose cutters are a `union`) are merged into one operation,
+        and transforms of a recorded operation are applied to its operands.
+        The work is done the first time the result is used.
+
+        The default is `False`.
+        """
+        cls._lazy_evaluation = lazy
+
+    @classmethod
+    def get_max_workers(cls) -> int:
+        """
+        Get the number of worker processes used by `parallel_map`.
+        It defaults to the number of CPUs.
+        """
+        if cls._max_workers == None:
+            import os
+
+            return os.cpu_count() or 1
+        return cls._max_workers
+
+    @classmethod
+    def set_max_workers(cls, workers: int | None = None) -> None:
+        """
+        Set the number of worker processes used by `parallel_map`.
+        Use `None` for the number of CPUs.
+        With `1`, everything is done in the current process.
+        """
+        if workers != None:
+            _chkGE("workers", workers, 1)
+        cls._max_workers = workers
+
+    @classmethod
+    def get_boolean_memory_limit(cls) -> float | None:
+        """
+        Get the memory limit, in megabytes, for one `Obj3d` boolean operation, or `None` if there is none.
+        """
+        return cls._boolean_memory_limit
+
+    @classmethod
+    def set_boolean_memory_limit(cls, megabytes: float | None = None) -> None:
+        """
+        Set a memory limit, in megabytes, for one `Obj3d` `union`, `difference` or `intersect`.
+
+        An operation whose operands are estimated to need more is done in pieces:
+        its space is split into cells (halving the longest side until each cell is under the limit),
+        the objects are cut at the cell walls, each cell is computed on its own
+        (by several processes, see `set_max_workers`) and the pieces are joined again.
+        Besides bounding the memory each step needs, this is often much faster
+        for parts with thousands of features on a large face, such as a perforated plate.
+        It is slower for parts that are large only because they are finely meshed (a lithophane, say).
+
+        When several processes are used, as with `parallel_map`, your script needs
+        an `if __name__ == "__main__":` guard around the code that builds the model:
+
+        ```
+        if __name__ == "__main__":
+            Config.set_boolean_memory_limit(500)
+            save("plate.stl", difference(plate, *holes))
+        ```
+
+        Inside a `parallel_map` worker, or when the main script can't be loaded again
+        (it was read from standard input, say), the cells are computed in this process.
+
+        The default is `None`: every operation is done in one piece.
+        """
+        if megabytes != None:
+            _chkGT("megabytes", megabytes, 0)
+        cls._boolean_memory_limit = megabytes
+
+    @classmethod
+    def get_cache_dir(cls) -> str | None:
+        """
+        Get the directory used to cache expensive constructions, or `None` if caching is off.
+        """
+        return cls._cache_dir
+
+    @classmethod
+    def set_cache_dir(cls, directory: str | None = None) -> None:
+        """
+        Set the directory used to cache expensive constructions.
+        Caching is off by default, set `directory` to `None` to turn it off again.
+
+        When on, the results of slow operations such as `rounded_cuboid`, `text`,
+        `minkowski_sum` and the `ProjectBox` walls are saved in `directory`.
+        Running a script again reuses them as long as the parameters, the inputs and the
+        `Config` values that change geometry (segments, chord tolerance, layer resolution) are the same.
+        So if you change one feature of a model, only the parts that depend on it are rebuilt.
+
+        Colors assigned to an `Obj3d` before it goes through a cached operation are not kept.
+
+        A good place for this is your `.piecadrc`:
+
+        ```
+        Config.set_cache_dir("/home/me/.cache/piecad")
+        ```
+        """
+        cls._cache_dir = directory
+
+    @classmethod
+    def get_cache_max_size(cls) -> float:
+        """
+        Get the maximum size of the cache directory in megabytes.
+        """
+        return cls._cache_max_size
+
+    @classmethod
+    def set_cache_max_size(cls, megabytes: float = 1024) -> None:
+        """
+        Set the maximum size of the cache directory in megabytes.
+        When it grows larger, the least recently used entries are removed.
+        """
+        _chkGT("megabytes", megabytes, 0)
+        cls._cache_max_size = megabytes
+
+    @classmethod
+    def get_profiling(cls) -> bool:
+        """
+        Get whether piecad operations are being profiled.
+        """
+        return _trace._enabled
+
+    @classmethod
+    def set_profiling(cls, profiling: bool = False) -> None:
+        """
+        Set whether piecad operations are profiled.
+
+        When on, every operation (the `Obj2d` and `Obj3d` methods, bulk operations,
+        primitives, `load` and `save`) records its time, the vertex and triangle counts
+        of its inputs and result, and the line of your script that called it.
+        See `profile_summary` and `save_profile_trace` to look at the results.
+
+        Profiling makes each operation compute its result immediately
+        (normally Obj3d operations wait until the result is needed),
+        so a profiled script may run a little slower.
+
+        Profiling can also be turned on without changing your script by setting the
+        `PIECAD_PROFILE` environment variable:
+        `PIECAD_PROFILE=1` prints the summary when the script ends,
+        `PIECAD_PROFILE=trace.json` also saves the trace to `trace.json`.
+
+        The default is `False`.
+        """
+        _trace._enabled = profiling
+
 
 def _chkIn(name: str, val: object, const: list) -> bool:
     if val not in const:
@@ -836,6 +1191,9 @@ def _handle_piecadrc():
         exec(s, {"Config": Config, "print": print})
 
 
+_trace.trace_methods(Obj3d)
+_trace.trace_methods(Obj2d)
+
 from .utilities import *
 from .bulk_ops import *
 from .trigonometry import *
@@ -843,3 +1201,4 @@ from .primitives_2d import *
 from .primitives_3d import *
 
 _handle_piecadrc()
+_trace._handle_env()
@@ -0,0 +1,191 @@
+"""
+Content-addressed on-disk cache for expensive constructions.
+
+It is off unless `Config.set_cache_dir` has been given a directory.
+
+Each cached operation is keyed by a hash of its name, its parameters, the `Config`
+values that change geometry, and the keys of its input objects. Objects coming out
+of a cached operation carry their key, so the keys of later operations depend on
+how their inputs were built and not on hashing the inputs' meshes again.
+Objects made some other way are hashed by their mesh.
+
+Entries are `.npz` files. When the directory grows over `Config.get_cache_max_size()`
+the least recently used entries are removed.
+
+Entries do not hold Obj3d colors, so a result carrying them is not stored and is
+built again each time, colors and all. The colors of an input are part of its key.
+"""
+
+import functools
+import hashlib
+import os
+import numpy as np
+
+
+def _enabled():
+    from . import Config
+
+    return Config.get_cache_dir() != None
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=20)
+    for p in parts:
+        h.update(p if type(p) == bytes else repr(p).encode())
+    return h.hexdigest()
+
+
+def _run_colors(mesh):
+    from . import Obj3d
+
+    return [
+        (i, Obj3d.color_map[id])
+        for i, id in enumerate(mesh.run_original_id)
+        if id in Obj3d.color_map
+    ]
+
+
+def _obj_key(o):
+    if getattr(o, "_cache_key", None) == None:
+        from . import Obj3d
+
+        if type(o) == Obj3d:
+            mesh = o.mo.to_mesh64()
+            o._cache_key = _digest(
+                "3d",
+                mesh.vert_properties.tobytes(),
+                mesh.tri_verts.tobytes(),
+                _run_colors(mesh),
+            )
+        else:
+            polys = o.mo.to_polygons()
+            o._cache_key = _digest(
+                "2d", o._color, [len(p) for p in polys], *[p.tobytes() for p in polys]
+            )
+    return o._cache_key
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+def _param(v):
+    from . import Obj2d, Obj3d
+
+    ty = type(v)
+    if ty == Obj3d or ty == Obj2d:
+        return (ty.__name__, _obj_key(v))
+    if ty == list or ty == tuple:
+        return (ty.__name__, tuple(_param(x) for x in v))
+    if ty == dict:
+        return tuple(sorted((k, _param(x)) for k, x in v.items()))
+    if ty == np.ndarray:
+        return (v.dtype.str, v.shape, v.tobytes())
+    if v == None or ty in (bool, int, float, str):
+        return v
+    raise _Uncacheable(ty)
+
+
+def _key(name, args, kwargs):
+    from . import Config, __version__
+
+    return _digest(
+        __version__,
+        name,
+        Config.get_default_segments(),
+        Config.get_chord_tolerance(),
+        Config.get_min_facet_angle(),
+        Config.get_layer_resolution(),
+        _param(args),
+        _param(kwargs),
+    )
+
+
+def _path(key):
+    from . import Config
+
+    return os.path.join(Config.get_cache_dir(), key + ".npz")
+
+
+def _load(key):
+    from . import Obj2d, Obj3d
+
+    fname = _path(key)
+    try:
+        with np.load(fname) as d:
+            o = Obj3d.__new__(Obj3d) if d["kind"] == "3d" else Obj2d.__new__(Obj2d)
+            o.__setstate__(d)
+        os.utime(fname)
+    except (OSError, KeyError, ValueError):
+        return None
+    o._cache_key = key
+    return o
+
+
+def _store(key, o):
+    "Store `o` under `key`, unless it has colors an entry cannot hold."
+    from . import Config, Obj3d
+
+    kind = "3d" if type(o) == Obj3d else "2d"
+    if kind == "3d" and len(_run_colors(o.mo.to_mesh64())) > 0:
+        return False
+    os.makedirs(Config.get_cache_dir(), exist_ok=True)
+    fname = _path(key)
+    tmp = f"{fname}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, kind=kind, **o.__getstate__())
+    os.replace(tmp, fname)
+    _evict(Config.get_cache_dir(), Config.get_cache_max_size() * 1024 * 1024)
+    return True
+
+
+def _evict(directory, max_bytes):
+    entries = []
+    total = 0
+    with os.scandir(directory) as it:
+        for e in it:
+            if e.name.endswith(".npz"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+                total += st.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def cached(name, build, *args, **kwargs):
+    """
+    Return `build(*args, **kwargs)`, reusing an earlier result stored under `name`
+    and the same parameters.
+    """
+    if not _enabled():
+        return build(*args, **kwargs)
+    try:
+        key = _key(name, args, kwargs)
+    except _Uncacheable:
+        return build(*args, **kwargs)
+    o = _load(key)
+    if o == None:
+        o = build(*args, **kwargs)
+        if _store(key, o):
+            o._cache_key = key
+    return o
+
+
+def cache_op(name):
+    "Decorator that runs a function returning an Obj2d or Obj3d through `cached`."
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
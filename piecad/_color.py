@@ -199,3 +199,26 @@ def _parse_color(c):
         raise ValidationError(
             "A color is specifed by a string or a tuple of RGB values"
         )
+
+
+def _face_color_palette(mesh, color_map, def_color):
+    """
+    Resolve the colors of a Manifold mesh one run at a time.
+
+    Returns `(palette, face_idx)`: an `(n, 3)` uint8 array of the distinct colors
+    (the default color is always entry 0) and each face's index into it.
+    """
+    import numpy as np
+
+    palette = [tuple(def_color)]
+    lookup = {palette[0]: 0}
+    run_idx = []
+    for id in mesh.run_original_id:
+        color = tuple(color_map.get(id, def_color))
+        if color not in lookup:
+            lookup[color] = len(palette)
+            palette.append(color)
+        run_idx.append(lookup[color])
+    run_lengths = np.diff(np.asarray(mesh.run_index, np.int64)) // 3
+    face_idx = np.repeat(np.asarray(run_idx, np.intp), run_lengths)
+    return np.array(palette, np.uint8), face_idx
@@ -1,9 +1,84 @@
+import ctypes
 import manifold3d as m
+import numpy as np
 import lib3mf.Lib3MF as lib3mf
 from datetime import datetime as dt
+from ._color import _face_color_palette
 
 
-def export_3mf(filename, mo, color_map, units="mm", def_color=(210, 180, 140)):
+def _c_array(ty, arr):
+    # Pass a contiguous NumPy array as a pointer to lib3mf structures (no copy).
+    return arr.ctypes.data_as(ctypes.POINTER(ty))
+
+
+def _native(mesh, function):
+    # The lib3mf C function `function` behind `mesh`, or None if this lib3mf
+    # doesn't expose it the way the Python binding (2.x) has so far.
+    w = getattr(mesh, "_wrapper", None)
+    lib = getattr(w, "lib", None)
+    if not hasattr(mesh, "_handle") or not hasattr(w, "checkError"):
+        return None
+    return getattr(lib, function, None)
+
+
+def _set_geometry(mesh, vertices, triangles):
+    # Same as mesh.SetGeometry, but without building a Python object per vertex/triangle.
+    setgeometry = _native(mesh, "lib3mf_meshobject_setgeometry")
+    if setgeometry == None:
+        mesh.SetGeometry(
+            (lib3mf.Position * len(vertices)).from_buffer_copy(vertices),
+            (lib3mf.Triangle * len(triangles)).from_buffer_copy(triangles),
+        )
+        return
+    mesh._wrapper.checkError(
+        mesh,
+        setgeometry(
+            mesh._handle,
+            ctypes.c_uint64(len(vertices)),
+            _c_array(lib3mf.Position, vertices),
+            ctypes.c_uint64(len(triangles)),
+            _c_array(lib3mf.Triangle, triangles),
+        ),
+    )
+
+
+def _set_all_triangle_properties(mesh, props):
+    # Same as mesh.SetAllTriangleProperties, straight from a NumPy buffer.
+    setproperties = _native(mesh, "lib3mf_meshobject_setalltriangleproperties")
+    if setproperties == None:
+        mesh.SetAllTriangleProperties(
+            (lib3mf.TriangleProperties * len(props)).from_buffer_copy(props)
+        )
+        return
+    mesh._wrapper.checkError(
+        mesh,
+        setproperties(
+            mesh._handle,
+            ctypes.c_uint64(len(props)),
+            _c_array(lib3mf.TriangleProperties, props),
+        ),
+    )
+
+
+def _transform(wrapper, matrix3x4):
+    # lib3mf stores the transposed matrix: four rows of three, the translation last.
+    t = wrapper.GetIdentityTransform()
+    for c in range(4):
+        for r in range(3):
+            t.Fields[c][r] = matrix3x4[r][c]
+    return t
+
+
+def export_3mf(
+    filename, mos, color_map, units="mm", def_color=(210, 180, 140), transforms=None
+):
+    """
+    Write the Manifolds in `mos` to `filename`, each as its own mesh object and build item.
+
+    If `transforms[i]` is not `None` it is an (N,3,4) array of matrices:
+    `mos[i]` is written once, and the build item is a components object
+    holding one component (a reference to the mesh plus a matrix) per transform.
+    """
     try:
         # Create a new 3MF model
         wrapper = lib3mf.Wrapper()
@@ -15,58 +90,49 @@ def export_3mf(filename, mo, color_map, units="mm", def_color=(210, 180, 140)):
         elif units == "in":
             model.SetUnit(lib3mf.ModelUnit.Inch)
 
-        # Create a mesh object
-        mesh = model.AddMeshObject()
-        mesh.SetName("Mesh")
-        m_mesh = mo.to_mesh64()
-
-        # Define cube vertices
-        if m_mesh.vert_properties.shape[1] > 3:
-            vertices = m_mesh.vert_properties[:, :3]
-        else:
-            vertices = m_mesh.vert_properties
-        verts = []
-        for v in vertices:
-            pos = lib3mf.Position((v[0], v[1], v[2]))
-            verts.append(pos)
-            mesh.AddVertex(pos)
-
-        # Define cube faces (triangles)
-        triangles = m_mesh.tri_verts
-        tris = []
-        for t in triangles:
-            tri = lib3mf.Triangle((t[0], t[1], t[2]))
-            tris.append(tri)
-            mesh.AddTriangle(tri)
-
-        mesh.SetGeometry(verts, tris)  # Why is this necessary?
-
-        # Create a ColorGroup resource
+        # Create a ColorGroup resource shared by all the meshes,
+        # one entry per distinct color.
         color_group = model.AddColorGroup()
-        dc = color_group.AddColor(
-            lib3mf.Color(def_color[0], def_color[1], def_color[2], 255)
-        )
-        mesh.SetObjectLevelProperty(color_group.GetResourceID(), dc)
-
-        for i in range(0, len(m_mesh.run_index) - 1):
-            for j in range(m_mesh.run_index[i] // 3, m_mesh.run_index[i + 1] // 3):
-                id = m_mesh.run_original_id[i]
-                if id == -1 or id not in color_map:
-                    color = def_color
-                else:
-                    color = color_map[id]
-                cid = color_group.AddColor(
-                    lib3mf.Color(color[0], color[1], color[2], 255)
-                )
-                mesh.SetTriangleProperties(
-                    j,
-                    lib3mf.TriangleProperties(
-                        color_group.GetResourceID(), (cid, cid, cid)
-                    ),
-                )
-
-        # Add mesh to build
-        model.AddBuildItem(mesh, wrapper.GetIdentityTransform())
+        gid = color_group.GetResourceID()
+        cids = {}
+
+        def color_id(color):
+            if color not in cids:
+                r, g, b = color
+                cids[color] = color_group.AddColor(lib3mf.Color(r, g, b, 255))
+            return cids[color]
+
+        dc = color_id(tuple(def_color))
+
+        for i, mo in enumerate(mos):
+            # Create a mesh object
+            mesh = model.AddMeshObject()
+            mesh.SetName("Mesh" if len(mos) == 1 else f"Mesh {i + 1}")
+            m_mesh = mo.to_mesh()
+
+            vertices = np.ascontiguousarray(m_mesh.vert_properties[:, :3], np.float32)
+            triangles = np.ascontiguousarray(m_mesh.tri_verts, np.uint32)
+            _set_geometry(mesh, vertices, triangles)
+
+            palette, face_idx = _face_color_palette(m_mesh, color_map, def_color)
+            palette_cids = np.array(
+                [color_id(tuple(c)) for c in palette.tolist()], np.uint32
+            )
+            props = np.empty((len(face_idx), 4), np.uint32)
+            props[:, 0] = gid
+            props[:, 1:] = palette_cids[face_idx][:, None]
+            mesh.SetObjectLevelProperty(gid, dc)
+            _set_all_triangle_properties(mesh, props)
+
+            if transforms == None or transforms[i] is None:
+                # Add mesh to build
+                model.AddBuildItem(mesh, wrapper.GetIdentityTransform())
+                continue
+            components = model.AddComponentsObject()
+            components.SetName(f"Instances {i + 1}")
+            for matrix in transforms[i]:
+                components.AddComponent(mesh, _transform(wrapper, matrix))
+            model.AddBuildItem(components, wrapper.GetIdentityTransform())
 
         # Write to file
         writer = model.QueryWriter("3mf")
@@ -84,4 +150,4 @@ if __name__ == "__main__":
     mo = m.Manifold.cube((40, 40, 40))
     mo2 = m.Manifold.cube((40, 40, 40)).translate((4, 4, 4))
     mo = mo + mo2
-    export_3mf("/home/brian/Downloads/t.3mf", mo, {})
+    export_3mf("/home/brian/Downloads/t.3mf", [mo], {})
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Faces written per chunk, so huge meshes don't need one big record array
+# (an STL face record is 50 bytes).
+_CHUNK = 1 << 20
+
+_stl_dtype = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")]
+)
+
+_ply_face_dtype = np.dtype([("n", "u1"), ("v", "<i4", (3,)), ("color", "u1", (4,))])
+
+
+def _chunks(n):
+    for start in range(0, n, _CHUNK):
+        yield start, min(start + _CHUNK, n)
+
+
+def export_stl(filename, meshes):
+    """
+    Write `meshes`, a list of `(vertices, triangles)` arrays, to `filename` as one binary STL.
+    """
+    n_faces = sum(len(tris) for _, tris in meshes)
+    with open(filename, "wb") as f:
+        f.write(bytes(80))
+        np.array([n_faces], "<u4").tofile(f)
+        for vertices, tris in meshes:
+            for start, end in _chunks(len(tris)):
+                tri_pts = vertices[tris[start:end]]
+                normals = np.cross(
+                    tri_pts[:, 1] - tri_pts[:, 0], tri_pts[:, 2] - tri_pts[:, 0]
+                )
+                lengths = np.linalg.norm(normals, axis=1)
+                lengths[lengths == 0] = 1.0
+                rec = np.zeros(end - start, _stl_dtype)
+                rec["normal"] = normals / lengths[:, None]
+                rec["vertices"] = tri_pts
+                rec.tofile(f)
+
+
+def export_ply(filename, meshes):
+    """
+    Write `meshes`, a list of `(vertices, triangles, face_colors)` arrays,
+    to `filename` as one binary little endian PLY with RGBA face colors.
+    """
+    n_verts = sum(len(v) for v, _, _ in meshes)
+    n_faces = sum(len(t) for _, t, _ in meshes)
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        "comment Piecad\n"
+        f"element vertex {n_verts}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"element face {n_faces}\n"
+        "property list uchar int vertex_indices\n"
+        "property uchar red\n"
+        "property uchar green\n"
+        "property uchar blue\n"
+        "property uchar alpha\n"
+        "end_header\n"
+    )
+    with open(filename, "wb") as f:
+        f.write(header.encode("ascii"))
+        for vertices, _, _ in meshes:
+            for start, end in _chunks(len(vertices)):
+                np.asarray(vertices[start:end], "<f4").tofile(f)
+        offset = 0
+        for vertices, tris, colors in meshes:
+            for start, end in _chunks(len(tris)):
+                rec = np.empty(end - start, _ply_face_dtype)
+                rec["n"] = 3
+                rec["v"] = tris[start:end] + offset
+                rec["color"][:, :3] = colors[start:end]
+                rec["color"][:, 3] = 255
+                rec.tofile(f)
+            offset += len(vertices)
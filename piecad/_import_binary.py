@@ -0,0 +1,163 @@
+import os
+import numpy as np
+
+_stl_dtype = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")]
+)
+
+_ply_types = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+
+def weld(corners):
+    """
+    Merge identical vertices in `corners`, an (N,3) float32 array.
+
+    Return `(vertices, index)` where `vertices[index]` equals `corners`.
+    """
+    corners = np.ascontiguousarray(corners, np.float32)
+    corners[corners == 0] = 0  # -0.0 and 0.0 are the same vertex
+    bits = corners.view(np.uint32)
+    key = bits[:, 0].astype(np.uint64) << np.uint64(32)
+    key |= bits[:, 1]
+    key ^= bits[:, 2].astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    _, first, index = np.unique(key, return_index=True, return_inverse=True)
+    vertices = corners[first]
+    if not (vertices[index] == corners).all():
+        # Two different vertices share a key; fall back to comparing all 12 bytes.
+        _, first, index = np.unique(
+            corners.view(np.dtype((np.void, 12))).ravel(),
+            return_index=True,
+            return_inverse=True,
+        )
+        vertices = corners[first]
+    return vertices, index.ravel()
+
+
+def _drop_degenerate(tris):
+    keep = (
+        (tris[:, 0] != tris[:, 1])
+        & (tris[:, 1] != tris[:, 2])
+        & (tris[:, 2] != tris[:, 0])
+    )
+    return tris if keep.all() else tris[keep]
+
+
+def load_stl(filename):
+    """
+    Read a binary STL file, returning `(vertices, triangles)`,
+    or `None` if it is not a binary STL.
+    """
+    size = os.path.getsize(filename)
+    if size < 84:
+        return None
+    with open(filename, "rb") as f:
+        f.seek(80)
+        n = int.from_bytes(f.read(4), "little")
+    if size != 84 + n * _stl_dtype.itemsize or n == 0:
+        return None  # ASCII (or damaged)
+    records = np.memmap(filename, _stl_dtype, "r", offset=84, shape=(n,))
+    vertices, index = weld(records["vertices"].reshape(-1, 3))
+    del records
+    tris = index.astype(np.uint32).reshape(-1, 3)
+    return vertices, _drop_degenerate(tris)
+
+
+def _ply_header(f):
+    if f.readline().strip() != b"ply":
+        return None
+    elements = []
+    fmt = None
+    while True:
+        line = f.readline()
+        if line == b"":
+            return None
+        words = line.decode("ascii", "replace").split()
+        if len(words) == 0 or words[0] == "comment" or words[0] == "obj_info":
+            continue
+        if words[0] == "end_header":
+            return fmt, elements, f.tell()
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and len(elements) > 0:
+            elements[-1][2].append(words[1:])
+
+
+def load_ply(filename):
+    """
+    Read a binary little endian PLY file of triangles, returning `(vertices, triangles)`,
+    or `None` if it is some other kind of PLY.
+    """
+    with open(filename, "rb") as f:
+        header = _ply_header(f)
+    if header == None:
+        return None
+    fmt, elements, offset = header
+    names = [e[0] for e in elements]
+    if fmt != "binary_little_endian" or names != ["vertex", "face"]:
+        return None
+
+    _, n_verts, v_props = elements[0]
+    if any(p[0] == "list" or p[0] not in _ply_types for p in v_props):
+        return None
+    v_dtype = np.dtype([(p[1], "<" + _ply_types[p[0]]) for p in v_props])
+    if not all(c in v_dtype.names for c in "xyz"):
+        return None
+
+    # Faces are only read directly when every face is a triangle:
+    # then each face record has a fixed size.
+    _, n_faces, f_props = elements[1]
+    f_fields = []
+    for p in f_props:
+        if p[0] == "list":
+            if p[1] not in _ply_types or p[2] not in _ply_types:
+                return None
+            f_fields.append((p[3] + "_n", "<" + _ply_types[p[1]]))
+            f_fields.append((p[3], "<" + _ply_types[p[2]], (3,)))
+        elif p[0] in _ply_types:
+            f_fields.append((p[1], "<" + _ply_types[p[0]]))
+        else:
+            return None
+    f_dtype = np.dtype(f_fields)
+    index_name = next(
+        (n for n in ("vertex_indices", "vertex_index") if n in f_dtype.names), None
+    )
+    if index_name == None:
+        return None
+    if os.path.getsize(filename) != offset + n_verts * v_dtype.itemsize + (
+        n_faces * f_dtype.itemsize
+    ):
+        return None  # Not all triangles (or trailing data)
+
+    verts = np.memmap(filename, v_dtype, "r", offset=offset, shape=(n_verts,))
+    faces = np.memmap(
+        filename,
+        f_dtype,
+        "r",
+        offset=offset + n_verts * v_dtype.itemsize,
+        shape=(n_faces,),
+    )
+    if not (faces[index_name + "_n"] == 3).all():
+        return None
+    vertices = np.stack([verts["x"], verts["y"], verts["z"]], axis=1)
+    tris = np.array(faces[index_name], np.uint32)
+    del verts, faces
+    return vertices, _drop_degenerate(tris)
@@ -2,7 +2,6 @@ import numpy as np
 from PIL import Image
 from . import Obj3d
 import manifold3d as m
-import trimesh
 
 
 def load_heightmap(filename, max_dimension):
@@ -24,113 +23,40 @@ def load_heightmap(filename, max_dimension):
     return img
 
 
-def add_vertex(v, vertices, lookup):
-    key = tuple(np.round(v, 5))
-    if key in lookup:
-        return lookup[key]
-
-    lookup[key] = len(vertices)
-    vertices.append(v)
-    return lookup[key]
+def _quads(p1, p2, p3, p4):
+    # Two triangles per quad, for whole arrays of quads at once.
+    return np.stack(
+        (np.stack((p1, p3, p2), axis=-1), np.stack((p2, p3, p4), axis=-1)), axis=-2
+    ).reshape(-1, 3)
 
 
 def create_lithophane(heightmap, pixel_size, min_thickness, max_thickness, base=0.0):
 
     rows, cols = heightmap.shape
-
-    vertices = []
-    lookup = {}
-    faces = []
-
-    top = np.zeros((rows, cols), dtype=int)
-    bottom = np.zeros((rows, cols), dtype=int)
-
-    for y in range(rows):
-        for x in range(cols):
-
-            z = min_thickness + heightmap[y, x] * (max_thickness - min_thickness)
-
-            top[y, x] = add_vertex(
-                (x * pixel_size, (rows - 1 - y) * pixel_size, z),
-                vertices,
-                lookup,
-            )
-
-            bottom[y, x] = add_vertex(
-                (x * pixel_size, (rows - 1 - y) * pixel_size, base),
-                vertices,
-                lookup,
-            )
-
-    # Top
-    for y in range(rows - 1):
-        for x in range(cols - 1):
-
-            a = top[y, x]
-            b = top[y, x + 1]
-            c = top[y + 1, x]
-            d = top[y + 1, x + 1]
-
-            faces.append((a, c, b))
-            faces.append((b, c, d))
-
-    # Bottom
-    for y in range(rows - 1):
-        for x in range(cols - 1):
-
-            a = bottom[y, x]
-            b = bottom[y + 1, x]
-            c = bottom[y, x + 1]
-            d = bottom[y + 1, x + 1]
-
-            faces.append((a, b, c))
-            faces.append((c, b, d))
-
-    # Perimeter walls
-    def quad(t1, t2, b1, b2):
-        faces.append((t1, b1, t2))
-        faces.append((t2, b1, b2))
-
-    # Left
-    for y in range(rows - 1):
-        quad(
-            top[y, 0],
-            top[y + 1, 0],
-            bottom[y, 0],
-            bottom[y + 1, 0],
+    n = rows * cols
+
+    # Top surface vertices come first, then the bottom surface.
+    vertices = np.empty((2, rows, cols, 3), np.float32)
+    vertices[:, :, :, 0] = np.arange(cols) * pixel_size
+    vertices[:, :, :, 1] = ((rows - 1 - np.arange(rows)) * pixel_size)[:, None]
+    vertices[0, :, :, 2] = min_thickness + heightmap * (max_thickness - min_thickness)
+    vertices[1, :, :, 2] = base
+
+    top = np.arange(n, dtype=np.uint32).reshape(rows, cols)
+    bottom = top + np.uint32(n)
+
+    faces = np.concatenate(
+        (
+            # Top
+            _quads(top[:-1, :-1], top[:-1, 1:], top[1:, :-1], top[1:, 1:]),
+            # Bottom
+            _quads(bottom[:-1, :-1], bottom[1:, :-1], bottom[:-1, 1:], bottom[1:, 1:]),
+            # Perimeter walls: left, right, top edge, bottom edge
+            _quads(top[:-1, 0], top[1:, 0], bottom[:-1, 0], bottom[1:, 0]),
+            _quads(top[1:, -1], top[:-1, -1], bottom[1:, -1], bottom[:-1, -1]),
+            _quads(top[0, 1:], top[0, :-1], bottom[0, 1:], bottom[0, :-1]),
+            _quads(top[-1, :-1], top[-1, 1:], bottom[-1, :-1], bottom[-1, 1:]),
         )
+    )
 
-    # Right
-    for y in range(rows - 1):
-        quad(
-            top[y + 1, cols - 1],
-            top[y, cols - 1],
-            bottom[y + 1, cols - 1],
-            bottom[y, cols - 1],
-        )
-
-    # Top edge
-    for x in range(cols - 1):
-        quad(
-            top[0, x + 1],
-            top[0, x],
-            bottom[0, x + 1],
-            bottom[0, x],
-        )
-
-    # Bottom edge
-    for x in range(cols - 1):
-        quad(
-            top[rows - 1, x],
-            top[rows - 1, x + 1],
-            bottom[rows - 1, x],
-            bottom[rows - 1, x + 1],
-        )
-
-    vertices = np.array(vertices, np.float64)
-    faces = np.array(faces, np.int64)
-    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False, validate=True)
-    vertices = np.array(mesh.vertices, np.float64)
-    faces = np.array(mesh.faces, np.uint64)
-
-    return Obj3d(m.Manifold(m.Mesh(vertices, faces)))
+    return Obj3d(m.Manifold(m.Mesh(vertices.reshape(-1, 3), faces)))
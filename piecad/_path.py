@@ -2,25 +2,69 @@
 ## Create a 2D object from an SVG-like path.
 """
 
-from svgpathtools import svg2paths, parse_path, Line, QuadraticBezier, CubicBezier, Arc
+import manifold3d as _m
+import math as _math
+import numpy as _np
 from . import _chkGE, _chkV2, Obj2d, Config
 import typing
 
 
-def _cp(pt: tuple[float, float]) -> complex:
-    return complex(pt[0], pt[1])
-
-
-def _xy(cplex):
-    return (cplex.real, cplex.imag)
+def _quadratic_bezier(p0, p1, p2, t):
+    s = 1.0 - t
+    return (s * s)[:, None] * p0 + (2 * s * t)[:, None] * p1 + (t * t)[:, None] * p2
+
+
+def _cubic_bezier(p0, p1, p2, p3, t):
+    s = 1.0 - t
+    return (
+        (s * s * s)[:, None] * p0
+        + (3 * s * s * t)[:, None] * p1
+        + (3 * s * t * t)[:, None] * p2
+        + (t * t * t)[:, None] * p3
+    )
+
+
+def _arc_center(start, radii, x_axis_rotation, large_arc, sweep, end):
+    # Endpoint to center parameterization, SVG 1.1 appendix F.6.5.
+    # Returns (center, radii, rotation (radians), start angle, angle swept).
+    rx, ry = abs(radii[0]), abs(radii[1])
+    phi = _math.radians(x_axis_rotation)
+    cos_phi, sin_phi = _math.cos(phi), _math.sin(phi)
+    dx, dy = (start[0] - end[0]) / 2.0, (start[1] - end[1]) / 2.0
+    x1 = cos_phi * dx + sin_phi * dy
+    y1 = -sin_phi * dx + cos_phi * dy
+    # Radii too small to reach the end are scaled up (F.6.6).
+    scale = (x1 * x1) / (rx * rx) + (y1 * y1) / (ry * ry)
+    if scale > 1:
+        rx *= _math.sqrt(scale)
+        ry *= _math.sqrt(scale)
+    num = rx * rx * ry * ry - rx * rx * y1 * y1 - ry * ry * x1 * x1
+    den = rx * rx * y1 * y1 + ry * ry * x1 * x1
+    k = _math.sqrt(max(num, 0.0) / den) if den != 0 else 0.0
+    if large_arc == sweep:
+        k = -k
+    cx1, cy1 = k * rx * y1 / ry, -k * ry * x1 / rx
+    cx = cos_phi * cx1 - sin_phi * cy1 + (start[0] + end[0]) / 2.0
+    cy = sin_phi * cx1 + cos_phi * cy1 + (start[1] + end[1]) / 2.0
+    theta = _math.atan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+    theta_end = _math.atan2((-y1 - cy1) / ry, (-x1 - cx1) / rx)
+    delta = (theta_end - theta) % (2 * _math.pi)
+    if not sweep and delta > 0:
+        delta -= 2 * _math.pi
+    return (cx, cy), (rx, ry), phi, theta, delta
+
+
+def _arc(arc, t):
+    (cx, cy), (rx, ry), phi, theta, delta = arc
+    a = theta + t * delta
+    x, y = rx * _np.cos(a), ry * _np.sin(a)
+    cos_phi, sin_phi = _math.cos(phi), _math.sin(phi)
+    return _np.stack(
+        [cos_phi * x - sin_phi * y + cx, sin_phi * x + cos_phi * y + cy], 1
+    )
 
 
 class Path:
-    _ll = []
-    _list = []
-    _cur_pt = (0, 0)
-    _beginning_pt = None
-
     def __init__(self, initial_point: tuple[float, float] = (0, 0), segments: int = -1):
         """
         Create an SVG-like path starting at `initial_point`. The path can contain lines, arcs, and
@@ -32,29 +76,67 @@ class Path:
 
         <iframe width="100%" height="400" src="../examples/path.html"></iframe>
         """
-        if segments == -1:
+        if segments == -1 and Config.get_chord_tolerance() == None:
             segments = Config.get_default_segments()
-        _chkGE("segments", segments, 3)
-        self._inital_pt = initial_point
-        self._segments = segments
-
-    def _add(self, o: object):
-        if type(o) == Line:
-            self._list.append(_xy(o.start))
-            self._list.append(_xy(o.end))
-        else:
-            self._list.append(_xy(o.start))
-            for t in range(1, self._segments):
-                self._list.append(_xy(o.point(t / (float(self._segments) - 1))))
-            self._list.append(_xy(o.end))
+        if segments != -1:
+            _chkGE("segments", segments, 3)
+        _chkV2("initial_point", initial_point)
+        self._segments = segments  # -1: each curve chooses from the chord tolerance.
+        # Each subpath is a list of (N,2) arrays of points, joined by `close`.
+        self._subpaths = []
+        self._start_subpath(initial_point)
+
+    def _start_subpath(self, pt):
+        self._cur_pt = (float(pt[0]), float(pt[1]))
+        self._chunks = [_np.array([self._cur_pt], _np.float64)]
+        self._subpaths.append(self._chunks)
+
+    def _t(self, pieces):
+        # Curve parameters, leaving out the start (already the current point).
+        return _np.linspace(0.0, 1.0, pieces + 1)[1:]
+
+    def _bezier_pieces(self, p):
+        if self._segments != -1:
+            return self._segments - 1
+        # n straight pieces stay within max|B''| / (8 n^2) of the curve, and |B''| is
+        # at most deg * (deg - 1) times the largest second difference of the control points.
+        deg = len(p) - 1
+        d2 = _np.hypot(*(p[:-2] - 2 * p[1:-1] + p[2:]).T).max()
+        n = _math.ceil(
+            _math.sqrt(deg * (deg - 1) * d2 / (8 * Config.get_chord_tolerance()))
+        )
+        return min(max(n, 1), int(360 / Config.get_min_facet_angle()))
+
+    def _arc_pieces(self, radii, delta):
+        if self._segments != -1:
+            return self._segments - 1
+        full = Config.get_segments(max(radii))
+        return max(_math.ceil(full * abs(delta) / (2 * _math.pi) - 1e-9), 1)
+
+    def _add(self, pts: _np.ndarray, end: tuple[float, float]):
+        pts[-1] = end  # Exactly, not as computed.
+        self._chunks.append(pts)
+        self._cur_pt = (float(end[0]), float(end[1]))
+
+    def move_to(self, point: tuple[float, float]) -> typing.Self:
+        """
+        Start a new closed shape in this path at `point`.
+
+        The shapes follow the even/odd fill rule (see `polygon`),
+        so a shape inside another one is a hole.
+        """
+        _chkV2("point", point)
+        if len(self._chunks) == 1:  # Nothing drawn since the last move.
+            self._subpaths.pop()
+        self._start_subpath(point)
+        return self
 
     def line_to(self, end: tuple[float, float]) -> typing.Self:
         """
         Add a line from the current point to `end`.
         """
         _chkV2("end", end)
-        self._add(Line(_cp(self._cur_pt), _cp(end)))
-        self._cur_pt = end
+        self._add(_np.array([end], _np.float64), end)
         return self
 
     def quadratic_bezier_to(
@@ -65,8 +147,9 @@ class Path:
         """
         _chkV2("control_panel", control_point)
         _chkV2("end", end)
-        self._add(QuadraticBezier(_cp(self._cur_pt), _cp(control_point), _cp(end)))
-        self._cur_pt = end
+        p = _np.array([self._cur_pt, control_point, end], _np.float64)
+        t = self._t(self._bezier_pieces(p))
+        self._add(_quadratic_bezier(p[0], p[1], p[2], t), end)
         return self
 
     def cubic_bezier_to(
@@ -82,12 +165,11 @@ class Path:
         _chkV2("control_point_1", control_point_1)
         _chkV2("control_point_2", control_point_2)
         _chkV2("end", end)
-        self._add(
-            CubicBezier(
-                _cp(self._cur_pt), _cp(control_point_1), _cp(control_point_2), _cp(end)
-            )
+        p = _np.array(
+            [self._cur_pt, control_point_1, control_point_2, end], _np.float64
         )
-        self._cur_pt = end
+        t = self._t(self._bezier_pieces(p))
+        self._add(_cubic_bezier(p[0], p[1], p[2], p[3], t), end)
         return self
 
     def arc_to(
@@ -116,29 +198,26 @@ class Path:
             radii = (radii, radii)
         _chkV2("radii", radii)
         _chkV2("end", end)
-        self._add(
-            Arc(
-                _cp(self._cur_pt),
-                _cp(radii),
-                x_axis_rotation,
-                large_arc,
-                ccw,
-                _cp(end),
-            )
-        )
-        self._cur_pt = end
+        if (
+            radii[0] == 0
+            or radii[1] == 0
+            or (end[0] == self._cur_pt[0] and end[1] == self._cur_pt[1])
+        ):
+            return self.line_to(end)  # As SVG does.
+        arc = _arc_center(self._cur_pt, radii, x_axis_rotation, large_arc, ccw, end)
+        t = self._t(self._arc_pieces(arc[1], arc[4]))
+        self._add(_arc(arc, t), end)
         return self
 
     def close(self) -> Obj2d:
         """
         Returns an `Obj2d` shape of the path.
         """
-        try:
-            a = polygon
-        except NameError:
-            from . import polygon
-
-        if len(self._list) > 1 and self._list[0] == self._list[-1]:
-            self._list.pop()
-        obj = polygon([self._list], check=False)
-        return obj
+        polys = []
+        for chunks in self._subpaths:
+            pts = _np.concatenate(chunks)
+            if len(pts) > 1 and (pts[0] == pts[-1]).all():
+                pts = pts[:-1]
+            if len(pts) > 0:
+                polys.append(pts)
+        return Obj2d(_m.CrossSection(polys, _m.FillRule.EvenOdd))
@@ -1,4 +1,7 @@
 from piecad import *
+import manifold3d as _m
+import numpy as np
+import os
 from fontTools.ttLib import TTFont
 import fontTools.ttLib
 from fontTools.ttLib.removeOverlaps import removeOverlaps
@@ -6,11 +9,19 @@ import fontTools
 import fontPens.flattenPen
 from importlib import resources as impresources
 from . import fonts
+from .bulk_ops import _boxes, _overlap_pairs
 
 _font = None
+_font_file = None
 _glyph_set = None
 _cmap = None
 
+# Flattened glyph outlines, per font file, per code point:
+# {font_file: {code_point: (CrossSection, width, max_y)}}
+# When Config.get_cache_dir() is set they are also kept on disk, one file per font.
+_glyphs = {}
+_glyphs_dirty = set()
+
 
 def _close_font():
     global _font
@@ -20,16 +31,25 @@ def _close_font():
 
 
 def set_font(fname):
-    global _font, _cmap, _glyph_set
+    global _font_file
 
     if fname[0] != "/" and fname[0] != "\\" and fname[0] != ".":
         font_file = impresources.files(fonts) / fname
     else:
         font_file = fname
+    if not os.path.isfile(font_file):
+        raise FileNotFoundError(f"Font file not found: {font_file}")
 
     _close_font()
+    _font_file = str(font_file)
+
+
+def _load_font():
+    # Opening a font and removing its overlaps is slow (about 0.3 seconds),
+    # so it is only done when a glyph is not already cached.
+    global _font, _cmap, _glyph_set
 
-    _font = TTFont(font_file)
+    _font = TTFont(_font_file)
     removeOverlaps(_font)
     _cmap = _font.getBestCmap()
     _glyph_set = _font.getGlyphSet()
@@ -38,7 +58,14 @@ def set_font(fname):
 set_font("Roboto-Regular.ttf")
 
 
-def _get_glyph_polygon(c):
+def font_name():
+    "The file name of the current font."
+    return _font_file
+
+
+def _draw_glyph(c):
+    if _font == None:
+        _load_font()
     glyph = _glyph_set[_cmap[ord(c)]]
     recorder = fontTools.pens.recordingPen.RecordingPen()
     flattener = fontPens.flattenPen.FlattenPen(recorder)
@@ -66,15 +93,81 @@ def _get_glyph_polygon(c):
             if y > max_y:
                 max_y = y
 
-    try:
-        a = polygon
-    except NameError:
-        from . import polygon
+    cs = _m.CrossSection(paths, _m.FillRule.EvenOdd)
+    return cs, glyph.width, max_y
 
-    obj = polygon(paths, check=False)
-    obj.width = glyph.width
-    obj.max_y = max_y
-    return obj
+
+def _glyph_file(font_file):
+    from . import _cache
+
+    st = os.stat(font_file)
+    key = _cache._digest("glyphs", font_file, st.st_size, st.st_mtime_ns)
+    return os.path.join(Config.get_cache_dir(), f"glyphs-{key}.npz")
+
+
+def _load_glyphs(font_file):
+    table = {}
+    if Config.get_cache_dir() == None:
+        return table
+    try:
+        with np.load(_glyph_file(font_file)) as d:
+            pts = d["pts"]
+            ends = np.cumsum(d["lens"])
+            polys = np.split(pts, ends[:-1]) if len(pts) > 0 else []
+            counts = np.cumsum(d["counts"]) - d["counts"]
+            for i, cp in enumerate(d["codes"].tolist()):
+                g_polys = polys[counts[i] : counts[i] + d["counts"][i]]
+                table[cp] = (
+                    _m.CrossSection(g_polys, _m.FillRule.EvenOdd),
+                    float(d["widths"][i]),
+                    float(d["max_ys"][i]),
+                )
+    except (OSError, KeyError, ValueError):
+        pass
+    return table
+
+
+def save_glyphs():
+    """
+    Write the glyph outlines drawn since the last call (or not yet on disk)
+    to the cache directory, if `Config.get_cache_dir()` is set.
+    """
+    if Config.get_cache_dir() == None:
+        _glyphs_dirty.clear()
+        return
+    for font_file, table in _glyphs.items():
+        fname = _glyph_file(font_file)
+        if font_file not in _glyphs_dirty and os.path.exists(fname):
+            continue
+        codes = sorted(table)
+        polys = [table[cp][0].to_polygons() for cp in codes]
+        flat = [p for g in polys for p in g]
+        os.makedirs(Config.get_cache_dir(), exist_ok=True)
+        tmp = f"{fname}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                codes=np.array(codes, np.int64),
+                widths=np.array([table[cp][1] for cp in codes], np.float64),
+                max_ys=np.array([table[cp][2] for cp in codes], np.float64),
+                counts=np.array([len(g) for g in polys], np.int64),
+                lens=np.array([len(p) for p in flat], np.int64),
+                pts=np.concatenate(flat) if len(flat) > 0 else np.zeros((0, 2)),
+            )
+        os.replace(tmp, fname)
+    _glyphs_dirty.clear()
+
+
+def _get_glyph(c):
+    table = _glyphs.get(_font_file)
+    if table == None:
+        table = _glyphs[_font_file] = _load_glyphs(_font_file)
+    cp = ord(c)
+    g = table.get(cp)
+    if g == None:
+        g = table[cp] = _draw_glyph(c)
+        _glyphs_dirty.add(_font_file)
+    return g
 
 
 def text_func(size: float, text: str, inter_char_space=None):
@@ -93,17 +186,23 @@ def text_func(size: float, text: str, inter_char_space=None):
     l = []
     max_y = 0
     for c in text:
-        poly = _get_glyph_polygon(c)
-        width = poly.width
-        if poly.max_y > max_y:
-            max_y = poly.max_y
+        cs, width, g_max_y = _get_glyph(c)
+        if g_max_y > max_y:
+            max_y = g_max_y
         if line_pos > 0:
             line_pos += inter_char_space
-        poly = poly.translate([line_pos, 0])
+        l.append(cs.translate((line_pos, 0)))
         line_pos += width
-        l.append(poly)
+    # Glyphs that are apart (the usual case) are just put together;
+    # kerned or overhanging ones, or a negative inter_char_space,
+    # can make neighbours touch or overlap, and then they need a union.
+    l = [cs for cs in l if not cs.is_empty()]
+    if len(_overlap_pairs(_boxes(l, 2))[0]) > 0:
+        cs = _m.CrossSection.batch_boolean(l, _m.OpType.Add)
+    else:
+        cs = _m.CrossSection.compose(l)
     f = size / max_y
-    obj = union(*l).scale([f, f])
+    obj = Obj2d(cs).scale([f, f])
     return obj
 
 
@@ -0,0 +1,252 @@
+"""
+Operation profiling.
+
+It is off unless `Config.set_profiling(True)` is called or the `PIECAD_PROFILE`
+environment variable is set.
+
+When on, every public piecad operation (the `Obj2d`/`Obj3d` methods, bulk operations,
+primitives, `load` and `save`) is recorded with its wall time, the number of
+vertices and triangles going in and coming out, and the line of the script that called it.
+Operations called by other operations are nested: their time is subtracted
+from the caller's self time.
+
+Manifold normally computes a result only when it is needed. While profiling, each
+result is computed before the operation returns, so the time is charged to the
+operation that made it.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+_enabled = False
+_records = []
+_records_lock = threading.Lock()
+# Each thread nests its own operations.
+_local = threading.local()
+_piecad_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class _Record:
+    __slots__ = (
+        "name",
+        "location",
+        "start",
+        "duration",
+        "child_time",
+        "in_verts",
+        "in_tris",
+        "out_verts",
+        "out_tris",
+        "counters",
+        "tid",
+    )
+
+    def __init__(self, name, location):
+        self.name = name
+        self.location = location
+        self.child_time = 0.0
+        self.counters = None
+        self.tid = threading.get_ident()
+
+
+def _location():
+    # The first frame outside the piecad package (cheaper than inspect.stack).
+    f = sys._getframe(2)
+    while f != None and f.f_code.co_filename.startswith(_piecad_dir):
+        f = f.f_back
+    if f == None:
+        return "?"
+    return f"{os.path.basename(f.f_code.co_filename)}:{f.f_lineno}"
+
+
+def _counts(v):
+    from . import Obj2d, Obj3d
+
+    ty = type(v)
+    if ty == Obj3d:
+        return v.mo.num_vert(), v.mo.num_tri()
+    if ty == Obj2d:
+        return v.mo.num_vert(), 0
+    if ty == list or ty == tuple:
+        verts = tris = 0
+        for x in v:
+            if type(x) == Obj3d or type(x) == Obj2d:
+                nv, nt = _counts(x)
+                verts += nv
+                tris += nt
+        return verts, tris
+    return 0, 0
+
+
+def _stack():
+    # The operations being recorded in this thread, innermost last.
+    stack = getattr(_local, "stack", None)
+    if stack == None:
+        stack = _local.stack = []
+    return stack
+
+
+def _call(name, func, args, kwargs):
+    rec = _Record(name, _location())
+    rec.in_verts, rec.in_tris = _counts(args)
+    stack = _stack()
+    parent = stack[-1] if len(stack) > 0 else None
+    stack.append(rec)
+    rec.start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        rec.out_verts, rec.out_tris = _counts(
+            result if type(result) == list else (result,)
+        )
+        return result
+    finally:
+        rec.duration = time.perf_counter() - rec.start
+        stack.pop()
+        if parent != None:
+            parent.child_time += rec.duration
+        with _records_lock:
+            _records.append(rec)
+
+
+def traced(name, func):
+    "Return `func` recording each call under `name` while profiling is on."
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        return _call(name, func, args, kwargs)
+
+    wrapper._traced = True
+    return wrapper
+
+
+def trace_module(namespace, skip=()):
+    "Wrap the public functions defined in the module whose dictionary is `namespace`."
+    for n, f in list(namespace.items()):
+        if n.startswith("_") or n in skip or type(f) != types.FunctionType:
+            continue
+        if f.__module__ == namespace["__name__"] and not getattr(f, "_traced", False):
+            namespace[n] = traced(n, f)
+
+
+def trace_methods(cls, skip=()):
+    "Wrap the public methods of `cls`."
+    for n, f in list(vars(cls).items()):
+        if n.startswith("_") or n in skip or not callable(f):
+            continue
+        if isinstance(f, (classmethod, staticmethod)):
+            continue
+        setattr(cls, n, traced(f"{cls.__name__}.{n}", f))
+
+
+def count(name, n=1):
+    "Add `n` to the counter `name` of the operation being recorded (if any)."
+    stack = _stack()
+    if _enabled and len(stack) > 0:
+        rec = stack[-1]
+        if rec.counters == None:
+            rec.counters = {}
+        rec.counters[name] = rec.counters.get(name, 0) + n
+
+
+def clear():
+    with _records_lock:
+        _records.clear()
+
+
+def _all_records():
+    with _records_lock:
+        return list(_records)
+
+
+def summary():
+    groups = {}
+    for r in _all_records():
+        g = groups.get((r.name, r.location))
+        if g == None:
+            g = groups[(r.name, r.location)] = [0, 0.0, 0.0, 0, 0, 0, 0, {}]
+        g[0] += 1
+        g[1] += r.duration
+        g[2] += r.duration - r.child_time
+        g[3] += r.in_verts
+        g[4] += r.in_tris
+        g[5] += r.out_verts
+        g[6] += r.out_tris
+        if r.counters != None:
+            for k, v in r.counters.items():
+                g[7][k] = g[7].get(k, 0) + v
+    rows = sorted(groups.items(), key=lambda item: -item[1][2])
+    header = (
+        f"{'self ms':>10} {'total ms':>10} {'calls':>6} {'in verts':>10} {'in tris':>10}"
+        f" {'out verts':>10} {'out tris':>10}  operation @ location"
+    )
+    lines = [header, "-" * len(header)]
+    for (name, location), g in rows:
+        extra = "".join(f" {k}={v}" for k, v in sorted(g[7].items()))
+        lines.append(
+            f"{g[2] * 1000:10.2f} {g[1] * 1000:10.2f} {g[0]:6d} {g[3]:10d} {g[4]:10d}"
+            f" {g[5]:10d} {g[6]:10d}  {name} @ {location}{extra}"
+        )
+    return "\n".join(lines)
+
+
+def chrome_trace():
+    pid = os.getpid()
+    events = []
+    for r in _all_records():
+        args = {
+            "location": r.location,
+            "in_verts": r.in_verts,
+            "in_tris": r.in_tris,
+            "out_verts": r.out_verts,
+            "out_tris": r.out_tris,
+        }
+        if r.counters != None:
+            args.update(r.counters)
+        events.append(
+            {
+                "name": r.name,
+                "cat": "piecad",
+                "ph": "X",
+                "ts": r.start * 1e6,
+                "dur": r.duration * 1e6,
+                "pid": pid,
+                "tid": r.tid,
+                "args": args,
+            }
+        )
+    events.sort(key=lambda e: e["ts"])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def save_trace(filename):
+    with open(filename, "w") as f:
+        json.dump(chrome_trace(), f)
+
+
+def _report_at_exit(trace_file):
+    if len(_records) == 0:
+        return
+    print(summary(), file=sys.stderr)
+    if trace_file != None:
+        save_trace(trace_file)
+        print(f"Profile trace written to: {trace_file}", file=sys.stderr)
+
+
+def _handle_env():
+    # PIECAD_PROFILE=1 prints the summary when the script ends,
+    # PIECAD_PROFILE=file.json also writes the Chrome trace to file.json.
+    global _enabled
+    v = os.environ.get("PIECAD_PROFILE", "")
+    if v == "" or v == "0":
+        return
+    import atexit
+
+    _enabled = True
+    atexit.register(_report_at_exit, v if v.endswith(".json") else None)
@@ -3,8 +3,23 @@
 """
 
 import manifold3d as _m
+import numpy as _np
+import sys as _sys
+from typing import Callable as _Callable, Iterable as _Iterable
 
-from . import Obj2d, Obj3d, ValidationError, _chkGOTY
+from . import Config, Obj2d, Obj3d, ValidationError, _chkGE, _chkGOTY, _Deferred
+from . import _trace
+from .trigonometry import _cos_sin
+
+# Parts composed (or unioned) at a time: Manifold.compose and batch_boolean slow down
+# faster than linearly with the number of parts, so big ones are done in groups.
+_COMPOSE_GROUP = 1000
+
+# Roughly the memory a Manifold boolean uses per triangle of its operands (bytes, measured).
+_BYTES_PER_TRIANGLE = 1000
+# Cells are halved at most this many times (an operand that isn't cut, such as
+# a cutter of a difference, can keep a cell over the memory limit).
+_MAX_CELL_DEPTH = 12
 
 
 def compose(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
@@ -42,6 +57,13 @@ def difference(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
 
     In some packages this function might be called subtract
 
+    Objects whose bounding box misses the first object's are left out,
+    and for `Obj3d`, those that don't touch any of the others are combined with `compose`
+    before they are subtracted. (When profiling, see `Config.set_profiling`,
+    the numbers of these are shown as `culled` and `composed`.)
+
+    Very large `Obj3d` differences can be done in pieces, see `Config.set_boolean_memory_limit`.
+
     <iframe width="100%" height="250" src="examples/difference2d.html"></iframe>
 
     <iframe width="100%" height="250" src="examples/difference3d.html"></iframe>
@@ -54,19 +76,50 @@ def difference(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
         if type(o) != ty:
             raise ValidationError("Mixed types in parameter: objs.")
     if ty == Obj2d:
-        l = []
-        for o in objs:
-            l.append(o.mo)
+        if Config.get_lazy_evaluation():
+            return Obj2d(_Deferred(_m.OpType.Subtract, list(objs)))
+        l = _cutters([o.mo for o in objs], 2)
         return Obj2d(_m.CrossSection.batch_boolean(l, _m.OpType.Subtract))
     elif ty == Obj3d:
-        l = []
-        for o in objs:
-            l.append(o.mo)
+        l = [o.mo for o in objs]
+        r = _tiled(l, "Subtract")
+        if r != None:
+            return Obj3d(r)
+        l = _cutters(l, 3)
         return Obj3d(_m.Manifold.batch_boolean(l, _m.OpType.Subtract))
     else:
         raise ValidationError("All objects must be of one type, Obj2d or Obj3d")
 
 
+def grid_array(
+    obj: Obj2d | Obj3d,
+    counts: tuple[int, int] | tuple[int, int, int],
+    spacing: tuple[float, float] | tuple[float, float, float],
+) -> Obj2d | Obj3d:
+    """
+    Returns `counts[0]` by `counts[1]` copies of `obj`, `spacing[0]` apart along X
+    and `spacing[1]` apart along Y. The first copy is `obj` where it is.
+
+    For an `Obj3d`, `counts` and `spacing` can also have a third (Z) entry.
+
+    Like `linear_array`, copies that do not overlap are combined with `compose`,
+    so large grids of holes (vents, grilles, perforated plates) are quick to make.
+    """
+    ty = type(obj)
+    _chkGOTY("obj", ty)
+    dims = 2 if ty == Obj2d else 3
+    if len(counts) != len(spacing) or not 2 <= len(counts) <= dims:
+        raise ValidationError(
+            f"Parameters counts and spacing must both have length 2{' or 3' if dims == 3 else ''}."
+        )
+    # A row, then a row of rows (the rows are the same, so each is only made once).
+    for axis in range(len(counts)):
+        step = [0.0] * dims
+        step[axis] = spacing[axis]
+        obj = linear_array(obj, counts[axis], tuple(step))
+    return obj
+
+
 def hull(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
     """
     Return a convex hull of the given objects.
@@ -129,6 +182,11 @@ def intersect(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
     """
     Returns the object made by adding those portions that occur only in all `objs` together.
 
+    If the bounding boxes of `objs` have nothing in common, the (empty) result
+    is returned without computing the intersection.
+
+    Very large `Obj3d` intersections can be done in pieces, see `Config.set_boolean_memory_limit`.
+
     <iframe width="100%" height="250" src="examples/intersect2d.html"></iframe>
 
     <iframe width="100%" height="250" src="examples/intersect3d.html"></iframe>
@@ -141,23 +199,179 @@ def intersect(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
         if type(o) != ty:
             raise ValidationError("Mixed types in parameter: objs.")
     if ty == Obj2d:
+        if Config.get_lazy_evaluation():
+            return Obj2d(_Deferred(_m.OpType.Intersect, list(objs)))
         l = []
         for o in objs:
             l.append(o.mo)
+        if len(l) > 1 and _misses(l, 2):
+            _trace.count("culled", len(l))
+            return Obj2d(_m.CrossSection())
         return Obj2d(_m.CrossSection.batch_boolean(l, _m.OpType.Intersect))
     elif ty == Obj3d:
         l = []
         for o in objs:
             l.append(o.mo)
+        if len(l) > 1 and _misses(l, 3):
+            _trace.count("culled", len(l))
+            return Obj3d(_m.Manifold())
+        r = _tiled(l, "Intersect")
+        if r != None:
+            return Obj3d(r)
         return Obj3d(_m.Manifold.batch_boolean(l, _m.OpType.Intersect))
     else:
         raise ValidationError("All objects must be of one type, Obj2d or Obj3d")
 
 
+def linear_array(
+    obj: Obj2d | Obj3d,
+    count: int,
+    step: tuple[float, float] | tuple[float, float, float],
+) -> Obj2d | Obj3d:
+    """
+    Returns `count` copies of `obj` in a line, each moved by `step` from the one before.
+    The first copy is `obj` where it is.
+
+    When the copies do not overlap they are combined with `compose`, which is
+    much faster than `union`; otherwise they are combined with `union`.
+
+    See also `grid_array` and `polar_array`.
+    """
+    ty = type(obj)
+    _chkGOTY("obj", ty)
+    _chkGE("count", count, 1)
+    dims = 2 if ty == Obj2d else 3
+    if len(step) != dims:
+        raise ValidationError(f"Parameter step list/tuple must have length of {dims}.")
+    offsets = _np.arange(count)[:, None] * _np.asarray(step, _np.float64)
+    bb = _np.asarray(obj.bounding_box()).reshape(2, dims)
+    # Copies in a line don't overlap if their boxes are separated along some axis.
+    disjoint = count == 1 or bool((_np.abs(step) > bb[1] - bb[0]).any())
+    mo = obj.mo
+    copies = [mo.translate(tuple(o)) for o in offsets.tolist()]
+    return _array(obj, copies, disjoint)
+
+
+def parallel_map(func: _Callable, *iterables: _Iterable) -> list:
+    """
+    Return `[func(*args) for args in zip(*iterables)]`, with the calls done in parallel.
+
+    Use this for expensive constructions that don't depend on each other
+    (things like `minkowski_sum`, `revolve`, `extrude_chaining` or `text`),
+    then combine the results as usual:
+
+    ```
+    def post(i):
+        return cylinder(20, 3).minkowski_sum(sphere(1)).translate((i * 10, 0, 0))
+
+    if __name__ == "__main__":
+        o = union(*parallel_map(post, range(8)))
+    ```
+
+    The results are always in the same order as the arguments, so the final object
+    does not depend on which call finished first.
+
+    The calls are done in `Config.get_max_workers()` worker processes
+    (manifold3d holds Python's global interpreter lock while it works, so threads
+    would not run in parallel).
+    Thus `func` must be a function defined at the top level of a module,
+    the arguments and results are copied between processes,
+    and your script needs the `if __name__ == "__main__":` guard shown above.
+    Colors assigned to Obj3d objects are not kept.
+    The workers start with this process's `Config` settings (and `text` font).
+
+    If `Config.get_max_workers()` is 1, the calls are done in order in this process.
+    """
+    arg_lists = [list(it) for it in iterables]
+    n = min(len(l) for l in arg_lists) if len(arg_lists) > 0 else 0
+    workers = min(Config.get_max_workers(), n)
+    if workers <= 1:
+        return [func(*args) for args in zip(*arg_lists)]
+
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_start_worker,
+        initargs=(_settings(),),
+    ) as ex:
+        return list(ex.map(func, *arg_lists))
+
+
+def _settings():
+    # The Config values (and the font used by `text`) of this process, for _start_worker.
+    settings = {
+        name: value
+        for name, value in vars(Config).items()
+        if name.startswith("_")
+        and not name.startswith("__")
+        and not isinstance(value, (classmethod, staticmethod))
+        and not callable(value)
+    }
+    text = _sys.modules.get("piecad._text")
+    font = text.font_name() if text != None else None
+    return settings, font
+
+
+def _start_worker(settings):
+    # Run in each parallel_map worker: a spawned process starts with the default Config.
+    values, font = settings
+    for name, value in values.items():
+        setattr(Config, name, value)
+    if font != None:
+        from . import _text
+
+        _text.set_font(font)
+
+
+def polar_array(obj: Obj2d | Obj3d, count: int, angle: float = 360.0) -> Obj2d | Obj3d:
+    """
+    Returns `count` copies of `obj` rotated about the origin (the Z axis for an `Obj3d`).
+    The first copy is `obj` where it is.
+
+    If `angle` is 360 the copies are spaced evenly around the full circle;
+    otherwise they are spread evenly from 0 to `angle` degrees, both included.
+
+    Copies whose bounding boxes do not overlap are combined with `compose`,
+    otherwise they are combined with `union`.
+    """
+    ty = type(obj)
+    _chkGOTY("obj", ty)
+    _chkGE("count", count, 1)
+    if angle % 360 == 0 or count == 1:
+        angles = _np.arange(count) * (angle / count)
+    else:
+        angles = _np.arange(count) * (angle / (count - 1))
+    cos, sin = _cos_sin(angles)
+    dims = 2 if ty == Obj2d else 3
+    matrices = _np.zeros((count, dims, dims + 1))
+    matrices[:, 0, 0], matrices[:, 0, 1] = cos, -sin
+    matrices[:, 1, 0], matrices[:, 1, 1] = sin, cos
+    if dims == 3:
+        matrices[:, 2, 2] = 1.0
+
+    # The box of each copy: its rotated corners, as (count, 2 * dims) lows then highs.
+    bb = _np.asarray(obj.bounding_box()).reshape(2, dims)
+    corners = _np.stack(_np.meshgrid(*bb.T, indexing="ij"), -1).reshape(-1, dims)
+    pts = corners @ matrices[:, :, :dims].transpose(0, 2, 1)
+    boxes = _np.concatenate([pts.min(1), pts.max(1)], 1)
+
+    mo = obj.mo
+    copies = [mo.transform(m) for m in matrices.tolist()]
+    return _array(obj, copies, len(_overlap_pairs(boxes)[0]) == 0)
+
+
 def union(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
     """
     Returns the object made by adding all the `objs` together.
 
+    A union of many `Obj3d` is split into groups that don't touch each other
+    (judged by bounding boxes); each group is unioned and the groups are combined
+    with `compose`, which keeps large unions (thousands of objects) fast.
+    Very large `Obj3d` unions can also be done in pieces, see `Config.set_boolean_memory_limit`.
+
     <iframe width="100%" height="250" src="examples/union2d.html"></iframe>
 
     <iframe width="100%" height="250" src="examples/union3d.html"></iframe>
@@ -170,14 +384,293 @@ def union(*objs: Obj2d | Obj3d) -> Obj2d | Obj3d:
         if type(o) != ty:
             raise ValidationError("Mixed types in parameter: objs.")
     if ty == Obj2d:
+        if Config.get_lazy_evaluation():
+            return Obj2d(_Deferred(_m.OpType.Add, list(objs)))
         l = []
         for o in objs:
             l.append(o.mo)
         return Obj2d(_m.CrossSection.batch_boolean(l, _m.OpType.Add))
     elif ty == Obj3d:
-        l = []
-        for o in objs:
-            l.append(o.mo)
-        return Obj3d(_m.Manifold.batch_boolean(l, _m.OpType.Add))
+        l = [o.mo for o in objs]
+        r = _tiled(l, "Add")
+        if r != None:
+            return Obj3d(r)
+        return Obj3d(_union(l))
     else:
         raise ValidationError("All objects must be of one type, Obj2d or Obj3d")
+
+
+def _boxes(mos, dims):
+    # The bounding boxes of Manifolds (dims 3) or CrossSections (dims 2),
+    # as an (N, 2 * dims) array: lows, then highs.
+    if dims == 3:
+        b = [mo.bounding_box() for mo in mos]
+    else:
+        b = [mo.bounds() for mo in mos]
+    return _np.array(b, _np.float64).reshape(len(mos), 2 * dims)
+
+
+def _overlap_pairs(boxes):
+    # The index pairs (i, j), i != j, of the (N, 2 * dims) boxes that overlap or touch.
+    # Sweep and prune along the axis where the boxes are most spread out.
+    n, dims = len(boxes), boxes.shape[1] // 2
+    lo, hi = boxes[:, :dims], boxes[:, dims:]
+    axis = int(_np.argmax(lo.max(0) - lo.min(0))) if n > 0 else 0
+    order = _np.argsort(lo[:, axis], kind="stable")
+    lo, hi = lo[order], hi[order]
+    # Boxes i + 1 .. ends[i] - 1 start before box i ends along the axis.
+    ends = _np.searchsorted(lo[:, axis], hi[:, axis], side="right")
+    counts = _np.maximum(ends - _np.arange(n) - 1, 0)
+    total = int(counts.sum())
+    i = _np.repeat(_np.arange(n), counts)
+    j = _np.arange(total) - _np.repeat(_np.cumsum(counts) - counts, counts) + i + 1
+    hit = ((lo[j] <= hi[i]) & (lo[i] <= hi[j])).all(1)
+    return order[i[hit]], order[j[hit]]
+
+
+def _compose(mos, dims):
+    if dims == 2:
+        return _m.CrossSection.compose(mos)
+    while len(mos) > 1:
+        groups = []
+        for i in range(0, len(mos), _COMPOSE_GROUP):
+            g = _m.Manifold.compose(mos[i : i + _COMPOSE_GROUP])
+            # Evaluated now: Manifold would otherwise merge the groups
+            # back into one big compose when the next level is evaluated.
+            g.num_vert()
+            groups.append(g)
+        mos = groups
+    return mos[0]
+
+
+def _cutters(mos, dims):
+    # The operands for subtracting mos[1:] from mos[0]: cutters whose bounding box
+    # misses the base's are dropped, and (in 3D) those not touching any other cutter
+    # are composed into one, which is the same as subtracting them one by one.
+    # (Clipper's 2D booleans are quick enough that composing doesn't pay.)
+    if len(mos) < 2:
+        return mos
+    boxes = _boxes(mos, dims)
+    base = boxes[0]
+    keep = (boxes[1:, :dims] < base[dims:]).all(1) & (
+        boxes[1:, dims:] > base[:dims]
+    ).all(1)
+    culled = len(keep) - int(keep.sum())
+    if culled > 0:
+        _trace.count("culled", culled)
+    cutters = [mo for mo, k in zip(mos[1:], keep.tolist()) if k]
+    if dims == 2:
+        return [mos[0]] + cutters
+    i, j = _overlap_pairs(boxes[1:][keep])
+    alone = _np.ones(len(cutters), bool)
+    alone[i] = False
+    alone[j] = False
+    if alone.sum() > 1:
+        _trace.count("composed", int(alone.sum()))
+        lone = [mo for mo, a in zip(cutters, alone.tolist()) if a]
+        cutters = [mo for mo, a in zip(cutters, alone.tolist()) if not a]
+        cutters.append(_compose(lone, dims))
+    return [mos[0]] + cutters
+
+
+def _components(n, i, j):
+    # A label for each of n nodes; nodes joined by the edges (i, j) get the same label.
+    labels = _np.arange(n)
+    while True:
+        li, lj = labels[i], labels[j]
+        low = _np.minimum(li, lj)
+        new = labels.copy()
+        _np.minimum.at(new, li, low)
+        _np.minimum.at(new, lj, low)
+        new = new[new]
+        if (new == labels).all():
+            return labels
+        labels = new
+
+
+def _union(mos):
+    # Union of the Manifolds `mos`. A big batch_boolean (or compose) slows down faster
+    # than linearly, so many operands are split into groups of about _COMPOSE_GROUP,
+    # keeping operands whose bounding boxes overlap (or touch) in the same group.
+    # The groups don't touch each other, so their unions are combined with compose.
+    if len(mos) <= _COMPOSE_GROUP:
+        return _m.Manifold.batch_boolean(mos, _m.OpType.Add)
+    i, j = _overlap_pairs(_boxes(mos, 3))
+    labels = _components(len(mos), i, j)
+    order = _np.argsort(labels, kind="stable")
+    starts = _np.flatnonzero(_np.diff(labels[order], prepend=-1)).tolist()
+    starts.append(len(mos))
+    groups = []
+    first = 0
+    for k in range(1, len(starts)):
+        if starts[k] - first >= _COMPOSE_GROUP or k == len(starts) - 1:
+            group = [mos[n] for n in order[first : starts[k]].tolist()]
+            g = _m.Manifold.batch_boolean(group, _m.OpType.Add)
+            g.num_vert()  # See _compose.
+            groups.append(g)
+            first = starts[k]
+    _trace.count("groups", len(groups))
+    return _compose(groups, 3)
+
+
+def _cell(op, objs, lo, hi):
+    # One cell, from `lo` to `hi`, of _tiled (a top level function, for parallel_map).
+    mos = [o.mo for o in objs]
+    if op == "Add":
+        mo = _union(mos)
+    else:
+        if op == "Subtract":
+            mos = _cutters(mos, 3)
+        mo = _m.Manifold.batch_boolean(mos, _m.OpType[op])
+    if mo.is_empty():
+        return Obj3d(mo)
+    # Points made by cutting at a wall can be off it by a rounding error,
+    # which would leave slivers where the cells are joined: put them back on it.
+    tol = mo.get_tolerance()
+    walls = _np.stack([lo, hi], 1)
+
+    def snap(v):
+        v = _np.array(v)
+        for axis in range(3):
+            for w in walls[axis]:
+                v[_np.abs(v[:, axis] - w) <= tol, axis] = w
+        return v
+
+    return Obj3d(mo.warp_batch(snap))
+
+
+def _wall(boxes, lo, hi, axis):
+    # Where to split the cell from `lo` to `hi` along `axis`: the place in its middle half
+    # that cuts through the fewest of `boxes`, nearest the middle. Cutting through
+    # small features (a hole, say) leaves the pieces hard to join again exactly.
+    mid = (lo[axis] + hi[axis]) / 2
+    q = (hi[axis] - lo[axis]) / 4
+    low, high = _np.sort(boxes[:, axis]), _np.sort(boxes[:, axis + 3])
+    at = _np.concatenate([[mid], low, high])
+    at = at[_np.abs(at - mid) <= q]
+    cut = _np.searchsorted(low, at, "left") - _np.searchsorted(high, at, "right")
+    best = _np.lexsort((_np.abs(at - mid), cut))[0]
+    return float(at[best])
+
+
+def _cells(items, lo, hi, op, limit, depth, cells):
+    # Split the cell from `lo` to `hi` in two along its longest side until the
+    # triangles of its `items`, (Manifold, bounding box, triangles) tuples, are under `limit`.
+    # All operands of a union, and the first operand of the other operations, are cut
+    # at the wall between the two halves. The others (cutters, say) are cut a little past it,
+    # so none of their faces lie on the wall.
+    if sum(t for _, _, t in items) <= limit or depth == _MAX_CELL_DEPTH:
+        cells.append(([mo for mo, _, _ in items], lo, hi))
+        return
+    axis = int(_np.argmax(hi - lo))
+    wall = _wall(_np.array([box for _, box, _ in items]), lo, hi, axis)
+    margin = (hi[axis] - lo[axis]) / 100
+    normal = [0.0, 0.0, 0.0]
+    normal[axis] = 1.0
+    halves = ([], [])  # Below and above the wall.
+    for k, item in enumerate(items):
+        mo, box, _ = item
+        if box[axis + 3] <= wall:
+            pieces = (item, None)
+        elif box[axis] >= wall:
+            pieces = (None, item)
+        elif op == "Add" or k == 0:
+            above, below = mo.split_by_plane(normal, wall)
+            pieces = (below, above)
+        else:
+            pieces = (
+                mo.trim_by_plane([-x for x in normal], -(wall + margin)),
+                mo.trim_by_plane(normal, wall - margin),
+            )
+        for side, piece in enumerate(pieces):
+            if isinstance(piece, _m.Manifold):
+                if piece.is_empty():
+                    piece = None
+                else:
+                    box = _np.array(piece.bounding_box())
+                    piece = (piece, box, piece.num_tri())
+            if piece != None:
+                halves[side].append(piece)
+            elif op != "Add":
+                halves[side].append(None)
+    for side, half in enumerate(halves):
+        if op == "Add":
+            if len(half) == 0:
+                continue
+        elif half[0] == None:
+            continue  # No first operand here, so nothing left of a difference or intersection.
+        elif op == "Intersect" and None in half:
+            continue  # An operand doesn't reach this half, so the intersection is empty.
+        half = [item for item in half if item != None]
+        cell_lo, cell_hi = lo.copy(), hi.copy()
+        if side == 0:
+            cell_hi[axis] = wall
+        else:
+            cell_lo[axis] = wall
+        _cells(half, cell_lo, cell_hi, op, limit, depth + 1, cells)
+
+
+def _can_spawn():
+    # Whether worker processes can be started here: not from inside a worker,
+    # and only if a worker could load the main script again.
+    import multiprocessing
+    import os
+
+    if multiprocessing.parent_process() != None:
+        return False
+    main = _sys.modules.get("__main__")
+    filename = getattr(main, "__file__", None)
+    return filename == None or os.path.isfile(filename)
+
+
+def _tiled(mos, op):
+    # The boolean `op` ("Add", "Subtract" or "Intersect") of the Manifolds `mos`
+    # done cell by cell (see Config.set_boolean_memory_limit),
+    # or None if the operands fit under the memory limit.
+    limit = Config.get_boolean_memory_limit()
+    if limit == None or len(mos) < 2:
+        return None
+    limit = limit * 1e6 / _BYTES_PER_TRIANGLE
+    tris = [mo.num_tri() for mo in mos]
+    if sum(tris) <= limit:
+        return None
+    boxes = _boxes(mos, 3)
+    if op == "Add":
+        lo, hi = boxes[:, :3].min(0), boxes[:, 3:].max(0)
+    else:
+        lo, hi = boxes[0, :3].copy(), boxes[0, 3:].copy()
+    cells = []
+    _cells(list(zip(mos, boxes, tris)), lo, hi, op, limit, 0, cells)
+    _trace.count("cells", len(cells))
+    if len(cells) == 0:
+        return _m.Manifold()
+    objs = [[Obj3d(mo) for mo in cell[0]] for cell in cells]
+    los, his = [cell[1] for cell in cells], [cell[2] for cell in cells]
+    if _can_spawn():
+        pieces = parallel_map(_cell, [op] * len(cells), objs, los, his)
+    else:
+        pieces = [_cell(*args) for args in zip([op] * len(cells), objs, los, his)]
+    pieces = [o.mo for o in pieces]
+    # The pieces only touch at the cell walls, where the union joins them.
+    return _m.Manifold.batch_boolean(pieces, _m.OpType.Add)
+
+
+def _misses(mos, dims):
+    # True if the bounding boxes of `mos` have no common interior,
+    # so their intersection is empty.
+    boxes = _boxes(mos, dims)
+    return bool((boxes[:, :dims].max(0) >= boxes[:, dims:].min(0)).any())
+
+
+def _array(obj, copies, disjoint):
+    # Combine the transformed copies of `obj` made by the array operators.
+    if type(obj) == Obj2d:
+        if disjoint:
+            return Obj2d(_compose(copies, 2), color=obj._color)
+        return Obj2d(_m.CrossSection.batch_boolean(copies, _m.OpType.Add), obj._color)
+    if not disjoint:
+        return Obj3d(_m.Manifold.batch_boolean(copies, _m.OpType.Add))
+    return Obj3d(_compose(copies, 3))
+
+
+_trace.trace_module(globals())
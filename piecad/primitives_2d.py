@@ -12,9 +12,11 @@ from ._poly_point_isect import (
     isect_segments_include_segments as _isect_segments_include_segments,
 )
 
-from . import _text
+# _text (fontTools) and _path (svgpathtools) are slow to import,
+# so they are imported by the functions that use them.
 
-from . import _path
+from . import _cache
+from . import _trace
 
 _unit_circles = {}
 
@@ -28,7 +30,7 @@ def circle(radius: float, segments: int = -1) -> Obj2d:
     Circles are created with the center at `(0,0)`
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(radius)
     _chkGT("radius", radius, 0.0)
     _chkGE("segments", segments, 3)
 
@@ -49,9 +51,9 @@ def ellipse(radii: list[float, float], segments: int = -1) -> Obj2d:
 
     Ellipses are created with the center at `(0,0)`
     """
-    if segments == -1:
-        segments = Config.get_default_segments()
     _chkV2("radii", radii)
+    if segments == -1:
+        segments = Config.get_segments(max(abs(radii[0]), abs(radii[1])))
     _chkGE("segments", segments, 3)
 
     if segments in _unit_circles:
@@ -113,6 +115,12 @@ def path(initial_point: tuple[float, float] = (0, 0), segments: int = -1) -> obj
     ) -> Path
     ```
 
+    Start another closed shape at `point`, for example a hole.
+    Shapes are filled using the even/odd rule, as in `polygon`.
+    ```
+    move_to(point: tuple[float, float]) -> Path
+    ```
+
     The `close` method returns an `Obj2d` representing the shape of the Path.
     ```
     close() -> Obj2d
@@ -122,7 +130,8 @@ def path(initial_point: tuple[float, float] = (0, 0), segments: int = -1) -> obj
 
     <iframe width="100%" height="400" src="../examples/path.html"></iframe>
     """
-    # _path.polygon = polygon
+    from . import _path
+
     return _path.Path(initial_point, segments)
 
 
@@ -219,7 +228,7 @@ def rounded_rectangle(
     When `center` is `True` it will cause the square to be centered at `(0,0)`.
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(rounding_radius)
     _chkGE("segments", segments, 3)
     _chkV2("size", size)
     _chkGT("rounding_radius", rounding_radius, 0)
@@ -346,16 +355,46 @@ def text_set_font(font_name: str) -> None:
     The default font is `Roboto-Regular.ttf`.
     Also available is `Hack-Regular.ttf` (Monospaced).
     """
+    from . import _text
+
     _text.set_font(font_name)
 
 
-def text(size: float, text: str, inter_char_space=None) -> Obj2d:
+def _text_label(size: float, s: str, inter_char_space) -> Obj2d:
+    from . import _text
+
+    return _cache.cached(
+        "text",
+        lambda *_: _text.text_func(size, s, inter_char_space=None),
+        _text.font_name(),
+        size,
+        s,
+        inter_char_space,
+    )
+
+
+def text(
+    size: float, text: str | list[str], inter_char_space=None
+) -> Obj2d | list[Obj2d]:
     """
     Draw the unicode printable characters in `text` in shapes of size `size`.
 
+    If `text` is a list of strings, a list with one Obj2d for each string is returned.
+    This is the fastest way to make many labels.
+
     The default font is `Roboto-Regular.ttf`.
     Also available is `Hack-Regular.ttf` (Monospaced).
 
     The default value for the spacing between characters (`inter_char_space`) is `size/3.0`.
     """
-    return _text.text_func(size, text, inter_char_space=None)
+    from . import _text
+
+    if type(text) == str:
+        labels = [_text_label(size, text, inter_char_space)]
+    else:
+        labels = [_text_label(size, s, inter_char_space) for s in text]
+    _text.save_glyphs()
+    return labels[0] if type(text) == str else labels
+
+
+_trace.trace_module(globals(), ("path", "text_set_font"))
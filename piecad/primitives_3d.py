@@ -2,18 +2,16 @@
 ## Create 3D objects such as spheres and cubes.
 """
 
+import functools as _functools
 import manifold3d as _m
 import math as _math
 import numpy as _np
-import trimesh
 
 from . import (
     Config,
     Obj2d,
     Obj3d,
     circle,
-    ellipse,
-    rounded_rectangle,
     cos,
     sin,
     ValidationError,
@@ -28,7 +26,40 @@ from . import (
     _chkV2,
 )
 
-from . import _lithophane
+from . import _cache
+from . import _trace
+from .trigonometry import _cos_sin
+
+# Unit sized shapes, built once and scaled by each call.
+# Manifolds are never changed in place, so one can be shared by many objects.
+_TEMPLATES = 64
+
+
+def _template(o: Obj3d) -> _m.Manifold:
+    o.mo.num_vert()  # Build the mesh now, not in every copy.
+    return o.mo
+
+
+@_functools.lru_cache(maxsize=_TEMPLATES)
+def _unit_cylinder(segments: int) -> _m.Manifold:
+    return _template(circle(1, segments).extrude(1))
+
+
+@_functools.lru_cache(maxsize=_TEMPLATES)
+def _unit_sphere(segments: int) -> _m.Manifold:
+    circ = _np.stack(_cos_sin(_np.arange(2 * segments) * (180.0 / segments)), axis=1)
+    return _template(_revolve(_right_half(circ), segments))
+
+
+# Not unit sized: the scaled copy would be off in the last bits.
+@_functools.lru_cache(maxsize=_TEMPLATES)
+def _torus(
+    outer_radius: float, inner_radius: float, tube_segments: int, segments: int
+) -> _m.Manifold:
+    sz = (outer_radius - inner_radius) / 2.0
+    circ = circle(sz, tube_segments).translate((outer_radius - sz, outer_radius - sz))
+    o = revolve(circ, segments=segments).translate((0, 0, -outer_radius + sz))
+    return _template(o)
 
 
 def cone(
@@ -54,7 +85,7 @@ def cone(
     <iframe width="100%" height="220" src="examples/cone.html"></iframe>
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(max(radius_low, radius_high))
     _chkGT("height", height, 0)
     _chkGT("radius_low", radius_low, 0)
     _chkGE("radius_high", radius_high, 0)
@@ -103,11 +134,11 @@ def cylinder(height: float, radius: float, segments: int = -1, center=False) ->
     (In other words, the bottom of the cylinder will be at `(0,0,-height/2.0`.)
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(radius)
     _chkGT("height", height, 0)
     _chkGT("radius", radius, 0)
     _chkGE("segments", segments, 3)
-    cyl = circle(radius, segments).extrude(height)
+    cyl = Obj3d(_unit_cylinder(segments).scale((radius, radius, height)))
     if center:
         cyl = cyl.translate((0, 0, -height / 2.0))
     return cyl
@@ -125,12 +156,12 @@ def ellipsoid(
 
     <iframe width="100%" height="220" src="examples/ellipsoid.html"></iframe>
     """
-    if segments == -1:
-        segments = Config.get_default_segments()
     _chkV3("radius", radii)
+    if segments == -1:
+        segments = Config.get_segments(max(abs(r) for r in radii))
     _chkGE("segments", segments, 3)
 
-    return sphere(1, segments=segments).scale(radii)
+    return Obj3d(_unit_sphere(segments).scale(radii))
 
 
 def elliptical_cylinder(
@@ -147,13 +178,13 @@ def elliptical_cylinder(
 
     <iframe width="100%" height="220" src="examples/elliptical_cylinder.html"></iframe>
     """
-    if segments == -1:
-        segments = Config.get_default_segments()
     _chkGT("height", height, 0)
     _chkV2("radii", radii)
+    if segments == -1:
+        segments = Config.get_segments(max(abs(radii[0]), abs(radii[1])))
     _chkGE("segments", segments, 3)
 
-    ecyl = extrude(ellipse(radii, segments), height)
+    ecyl = Obj3d(_unit_cylinder(segments).scale((radii[0], radii[1], height)))
     if center:
         ecyl = ecyl.translate((0, 0, -height / 2.0))
     return ecyl
@@ -173,8 +204,211 @@ def extrude(obj: Obj2d, height: float) -> Obj3d:
     return Obj3d(_m.Manifold.extrude(obj.mo, height))
 
 
+def _layer_paths(idx: int, shape: Obj2d | _np.ndarray) -> list[_np.ndarray]:
+    # The contours of one extrude_chaining layer as (N,2) float64 arrays.
+    if isinstance(shape, Obj2d):
+        if shape.is_empty():
+            raise ValidationError(f"At pairs index: {idx}, empty shape is not allowed")
+        return shape.mo.to_polygons()
+    a = _np.asarray(shape, _np.float64)
+    if a.ndim != 2 or a.shape[1] != 2 or a.shape[0] < 3:
+        raise ValidationError(
+            f"At pairs index: {idx}, expected an Obj2d or an (N,2) array of at least 3 points"
+        )
+    return [a]
+
+
+def _cap(layer: _np.ndarray, lens: list[int], is_convex: bool) -> _np.ndarray:
+    # Triangulate one (P,2) layer made of contours with lengths `lens`.
+    if not is_convex or len(lens) != 1:
+        return _np.asarray(
+            _m.triangulate(_np.split(layer, _np.cumsum(lens)[:-1])), _np.uint64
+        ).reshape(-1, 3)
+    # Fan triangulation
+    i = _np.arange(1, len(layer) - 1, dtype=_np.uint64)
+    return _np.stack([_np.zeros_like(i), i, i + 1], axis=1)
+
+
+def _chain_mesh(
+    vertices: _np.ndarray,
+    layers: _np.ndarray,
+    lens: list[int],
+    is_convex: bool,
+    closed: bool = False,
+) -> _np.ndarray:
+    # Return the triangles joining the (L,P,3) `vertices` ring by ring.
+    # `layers` is the (L,P,2) profile of each ring, made of contours with
+    # lengths `lens`; it is only used to triangulate the end caps.
+    # Layer k's vertices are at k*P, so each layer pair's side walls are
+    # the same index pattern shifted by k*P.
+    # A `closed` chain joins the last layer back to the first and has no caps.
+    n_layers, p, _ = vertices.shape
+    sizes = _np.asarray(lens, _np.uint64)
+    starts = _np.repeat(_np.cumsum(sizes) - sizes, lens)
+    lens_r = _np.repeat(sizes, lens)
+    j = _np.arange(p, dtype=_np.uint64)
+    j_next = (j - starts + 1) % lens_r + starts
+    n_pairs = n_layers if closed else n_layers - 1
+    lo = _np.arange(n_pairs, dtype=_np.uint64)[:, None] * p
+    hi = (_np.arange(1, n_pairs + 1, dtype=_np.uint64)[:, None] % n_layers) * p
+    walls = _np.stack(
+        [
+            _np.stack([j + lo, j_next + lo, j_next + hi], axis=-1),
+            _np.stack([j + lo, j_next + hi, j + hi], axis=-1),
+        ],
+        axis=2,
+    ).reshape(-1, 3)
+    if closed:
+        return walls
+
+    # Bottom caps are reversed.
+    return _np.concatenate(
+        [
+            _cap(layers[0], lens, is_convex)[:, ::-1],
+            walls,
+            _cap(layers[-1], lens, is_convex) + _np.uint64((n_layers - 1) * p),
+        ]
+    )
+
+
+def _profile_layers(profile: object, ts: _np.ndarray) -> _np.ndarray:
+    # The profiles for loft and sweep as an (L,N,2) array of counter-clockwise polygons.
+    n_layers = len(ts)
+    if callable(profile):
+        layers = _np.stack([_np.asarray(profile(t), _np.float64) for t in ts])
+    else:
+        layers = _np.asarray(profile, _np.float64)
+        if layers.ndim == 2:
+            layers = _np.broadcast_to(layers, (n_layers,) + layers.shape)
+    if layers.ndim != 3 or layers.shape[2] != 2 or layers.shape[1] < 3:
+        raise ValidationError(
+            "Profiles must be (N,2) arrays of at least 3 points, all of the same length."
+        )
+    if layers.shape[0] != n_layers:
+        raise ValidationError(
+            f"Expected {n_layers} profiles, one for each layer, got {layers.shape[0]}."
+        )
+    x, y = layers[0, :, 0], layers[0, :, 1]
+    if _np.dot(x, _np.roll(y, -1)) - _np.dot(y, _np.roll(x, -1)) < 0:
+        layers = layers[:, ::-1]
+    return layers
+
+
+def _rounded_rectangles(
+    sizes: _np.ndarray, radii: _np.ndarray, segments: int
+) -> _np.ndarray:
+    # The (L,P,2) points of L rounded rectangles with their bottom left corner at (0,0),
+    # as `rounded_rectangle` makes them. The hull of four `segments` sided circles keeps
+    # point i of the corner q circle when the directions it is farthest in
+    # (within 180/segments degrees of its own) reach into quadrant q.
+    # Counter-clockwise from angle 0 of the top right corner.
+    corners = [
+        _np.arange((q * segments - 2) // 4 + 1, -((-(q + 1) * segments - 2) // 4))
+        for q in range(4)
+    ]
+    q = _np.repeat(_np.arange(4), [len(i) for i in corners])
+    c, s = _cos_sin(_np.concatenate(corners) * (360.0 / segments))
+    right = (q == 0) | (q == 3)
+    top = q < 2
+    sizes = _np.asarray(sizes, _np.float64)
+    r = _np.asarray(radii, _np.float64)[:, None]
+    cx = _np.where(right, sizes[:, :1] - r, r)
+    cy = _np.where(top, sizes[:, 1:] - r, r)
+    return _np.stack([cx + r * c, cy + r * s], axis=-1)
+
+
+def _right_half(pts: _np.ndarray) -> _np.ndarray:
+    # The part of a convex counter-clockwise polygon with x >= 0, from bottom to top,
+    # starting and ending on the y axis (like `piecut(90, 270)`).
+    inside = pts[:, 0] > 0
+    start = _np.flatnonzero(inside & ~_np.roll(inside, 1))[0]
+    pts = _np.roll(pts, -start, axis=0)
+    n = _np.count_nonzero(inside)
+    ends = []
+    for a, b in ((pts[-1], pts[0]), (pts[n], pts[n - 1])):
+        if a[0] == 0:
+            ends.append(a)
+        else:
+            ends.append((0, a[1] + (b[1] - a[1]) * a[0] / (a[0] - b[0])))
+    return _np.concatenate([[ends[0]], pts[:n], [ends[1]]])
+
+
+def _revolve(profile: _np.ndarray, segments: int) -> Obj3d:
+    # `revolve` for a profile from `_right_half`, skipping the 2D boolean making it.
+    return Obj3d(_m.Manifold.revolve(_m.CrossSection([profile]), segments))
+
+
+def _chain_obj3d(vertices: _np.ndarray, triangles: _np.ndarray) -> Obj3d:
+    mo = _m.Manifold(_m.Mesh64(vertices.reshape(-1, 3), triangles))
+    if mo.is_empty():
+        raise ValidationError(f"Error creating Manifold: {mo.status()}.")
+    return Obj3d(mo)
+
+
+def _catmull_rom(
+    points: _np.ndarray, n: int, closed: bool
+) -> tuple[_np.ndarray, _np.ndarray]:
+    # Sample `n` points and tangents of a uniform Catmull-Rom spline through `points`.
+    if closed:
+        ext = _np.concatenate([points[-1:], points, points[:2]])
+        n_segs = len(points)
+    else:
+        ext = _np.concatenate(
+            [2 * points[:1] - points[1:2], points, 2 * points[-1:] - points[-2:-1]]
+        )
+        n_segs = len(points) - 1
+    u = _np.linspace(0, n_segs, n, endpoint=not closed)
+    i = _np.minimum(u.astype(_np.int64), n_segs - 1)
+    s = (u - i)[:, None]
+    p0, p1, p2, p3 = ext[i], ext[i + 1], ext[i + 2], ext[i + 3]
+    c1 = p2 - p0
+    c2 = 2 * p0 - 5 * p1 + 4 * p2 - p3
+    c3 = -p0 + 3 * p1 - 3 * p2 + p3
+    pts = p1 + 0.5 * s * (c1 + s * (c2 + s * c3))
+    tangents = 0.5 * (c1 + s * (2 * c2 + 3 * s * c3))
+    return pts, tangents
+
+
+def _frames(
+    pts: _np.ndarray, tangents: _np.ndarray, closed: bool
+) -> tuple[_np.ndarray, _np.ndarray]:
+    # Rotation minimizing frames (double reflection method) along the sampled path.
+    # Returns the unit normals and binormals; a profile point (x, y) is placed at
+    # pt + x * normal + y * binormal.
+    t = tangents / _np.linalg.norm(tangents, axis=1)[:, None]
+    ref = _np.array((1.0, 0.0, 0.0) if abs(t[0, 0]) < 0.9 else (0.0, 1.0, 0.0))
+    r = _np.empty_like(t)
+    r[0] = ref - _np.dot(ref, t[0]) * t[0]
+    r[0] /= _np.linalg.norm(r[0])
+
+    def reflect(i, j, ri):
+        v1 = pts[j] - pts[i]
+        c1 = _np.dot(v1, v1)
+        if c1 == 0:
+            return ri
+        r_l = ri - (2 / c1) * _np.dot(v1, ri) * v1
+        t_l = t[i] - (2 / c1) * _np.dot(v1, t[i]) * v1
+        v2 = t[j] - t_l
+        c2 = _np.dot(v2, v2)
+        return r_l if c2 == 0 else r_l - (2 / c2) * _np.dot(v2, r_l) * v2
+
+    n = len(pts)
+    for i in range(n - 1):
+        r[i + 1] = reflect(i, i + 1, r[i])
+    if closed:
+        # Spread the twist left over after going all the way round along the path.
+        r_end = reflect(n - 1, 0, r[n - 1])
+        angle = _math.atan2(_np.dot(_np.cross(r_end, r[0]), t[0]), _np.dot(r_end, r[0]))
+        a = angle * _np.arange(n)[:, None] / n
+        r = r * _np.cos(a) + _np.cross(t, r) * _np.sin(a)
+    r /= _np.linalg.norm(r, axis=1)[:, None]
+    return r, _np.cross(t, r)
+
+
 def extrude_chaining(
-    pairs: list[tuple[float, Obj2d]], is_convex: bool = False, diagnose: str = None
+    pairs: list[tuple[float, Obj2d | _np.ndarray]],
+    is_convex: bool = False,
+    diagnose: str = None,
 ) -> Obj3d:
     """
     Extrude multiple 2d objects into a single 3d Object.
@@ -185,6 +419,10 @@ def extrude_chaining(
     This list controls an extrusion of 2d shapes chained together
     into one 3d object.
 
+    Instead of an Obj2d, a shape may be given as an `(N,2)` array of points,
+    a single counter-clockwise polygon. This avoids the cost of creating
+    an Obj2d for every layer.
+
     The `height` is cumulative. You are always specifing the exact current height
     to be output for the current object. This is done so that you can have numerically
     robust dimensions in your object. If relative heights were used, extuding something
@@ -203,98 +441,40 @@ def extrude_chaining(
 
     <iframe width="100%" height="550" src="examples/extrude_chaining.html"></iframe>
     """
-    vertex_list = []
-    triangles = []
-
     _chkGT("pairs length", len(pairs), 1)
 
-    def add_cap(v_off, polys, top):
-
-        if not is_convex or len(polys) != 1:
-            tris = _m.triangulate(polys)
-            for t in tris:
-                if top:
-                    triangles.append((t[0] + v_off, t[1] + v_off, t[2] + v_off))
-                else:  # Bottom caps are reversed.
-                    triangles.append((t[2] + v_off, t[1] + v_off, t[0] + v_off))
-        else:  # Fan triangulation
-            n = len(poly)  # We have only one to deal with
-            chosen = 0
-            for i in range(1, n - 1):
-                cur = i
-                next = i + 1
-                if top:
-                    triangles.append((chosen + v_off, cur + v_off, next + v_off))
-                else:  # Bottom caps are clockwise.
-                    triangles.append((next + v_off, cur + v_off, chosen + v_off))
-
-    v_offs = []
-    v_offs.append(0)
-    o2d_polys = []
-    for h, o2d in pairs:
-        if o2d.is_empty():
-            raise ValidationError(
-                f"At pairs index: {cur_idx}, empty shape is not allowed"
-            )
-        polys = o2d.to_paths()
-        o2d_polys.append(polys)
-        for poly in polys:
-            for vert in poly:
-                vertex_list.append((vert[0], vert[1], h))
-        v_offs.append(len(vertex_list))
-    v_offs.pop()
-
-    prev_polys = o2d_polys[0]
-    prev_vo = 0
-    add_cap(prev_vo, prev_polys, top=False)
-    last = len(pairs)
-    cur_idx = 1
-
-    while cur_idx < last:
-        cur_polys = o2d_polys[cur_idx]
-        cur_vo = v_offs[cur_idx]
-
-        if len(cur_polys) != len(prev_polys):
-            raise ValidationError(
-                f"At pairs index: {cur_idx}, previous shape does not match current shape"
-            )
-
-        for i in range(0, len(cur_polys)):
-            b = prev_polys[i]
-            t = cur_polys[i]
-
-            if len(b) != len(t):
+    heights = []
+    layers = []
+    lens = None
+    for idx, (h, shape) in enumerate(pairs):
+        polys = _layer_paths(idx, shape)
+        cur_lens = [len(poly) for poly in polys]
+        if lens != None:
+            if len(cur_lens) != len(lens):
                 raise ValidationError(
-                    f"At pairs index: {cur_idx}, poly: {i}, previous shape does not match current shape"
+                    f"At pairs index: {idx}, previous shape does not match current shape"
                 )
-
-            bottom_p = 0 + prev_vo
-            top_p = 0 + cur_vo
-            _len = len(b)
-
-            for j in range(0, _len):
-                next_bottom_p = ((j + 1) % _len) + prev_vo
-                next_top_p = ((j + 1) % _len) + cur_vo
-                triangles.append((bottom_p, next_bottom_p, next_top_p))
-                triangles.append((bottom_p, next_top_p, top_p))
-                bottom_p = next_bottom_p
-                top_p = next_top_p
-
-            prev_vo = cur_vo
-            cur_vo += _len
-
-        prev_polys = cur_polys
-        prev_vo = v_offs[cur_idx]
-        cur_idx += 1
-
-    add_cap(prev_vo, prev_polys, top=True)
-
-    vertex_list = _np.array(vertex_list, _np.float64)
-    triangles = _np.array(triangles, _np.uint64)
+            for i in range(0, len(lens)):
+                if cur_lens[i] != lens[i]:
+                    raise ValidationError(
+                        f"At pairs index: {idx}, poly: {i}, previous shape does not match current shape"
+                    )
+        lens = cur_lens
+        heights.append(h)
+        layers.append(polys[0] if len(polys) == 1 else _np.concatenate(polys))
+
+    layers = _np.stack(layers)
+    vertices = _np.empty(layers.shape[:2] + (3,), _np.float64)
+    vertices[:, :, :2] = layers
+    vertices[:, :, 2] = _np.array(heights, _np.float64)[:, None]
+    triangles = _chain_mesh(vertices, layers, lens, is_convex)
+    vertex_list = vertices.reshape(-1, 3)
     mesh = _m.Mesh64(vertex_list, triangles)
     if diagnose != None:
         dot_idx = diagnose.rindex(".")
         ext = diagnose[dot_idx + 1 :]
+        import trimesh
+
         mesh_output = trimesh.Trimesh(vertices=vertex_list, faces=triangles)
         trimesh.exchange.export.export_mesh(mesh_output, diagnose, ext)
     mo = _m.Manifold(mesh)
@@ -350,7 +530,7 @@ def geodesic_sphere(radius, segments=-1) -> Obj3d:
     <iframe width="100%" height="220" src="examples/geodesic_sphere.html"></iframe>
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(radius)
     _chkGT("radius", radius, 0)
     _chkGE("segments", segments, 3)
 
@@ -377,6 +557,8 @@ def lithophane(
     to find the best range.
     """
 
+    from . import _lithophane
+
     hm = _lithophane.load_heightmap(image_filename, width_mm / pixel_size)
 
     o = _lithophane.create_lithophane(hm, pixel_size, min_thickness, max_thickness)
@@ -384,6 +566,49 @@ def lithophane(
     return o
 
 
+def loft(
+    profile: _np.ndarray | object, heights: list[float], is_convex: bool = False
+) -> Obj3d:
+    """
+    Create a 3d object by stacking 2d profiles at the given heights.
+
+    This is `extrude_chaining` working directly on arrays of points,
+    without creating an Obj2d for every layer.
+
+    Parameter `profile` is one of:
+
+    * A `(layers, N, 2)` array, a polygon of N points for each height.
+    * A single `(N, 2)` array, used at every height.
+    * A function taking `t`, which goes from 0 (the first height) to 1 (the last),
+    and returning an `(N, 2)` array. N must be the same for all layers.
+
+    The polygons must not cross themselves. They may be clockwise or counter-clockwise.
+
+    For `is_convex` see `extrude_chaining`.
+
+    ```
+    import numpy as np
+
+    # A cone that is round at the bottom and square at the top.
+    def morph(t):
+        a = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+        c = np.stack([np.cos(a), np.sin(a)], axis=1)
+        s = c / np.abs(c).max(axis=1)[:, None]
+        return (1 - t) * 10 * c + t * 4 * s
+
+    o = loft(morph, np.linspace(0, 20, 40), is_convex=True)
+    ```
+    """
+    heights = _np.asarray(heights, _np.float64)
+    _chkGT("heights length", len(heights), 1)
+    layers = _profile_layers(profile, _np.linspace(0.0, 1.0, len(heights)))
+    vertices = _np.empty(layers.shape[:2] + (3,), _np.float64)
+    vertices[:, :, :2] = layers
+    vertices[:, :, 2] = heights[:, None]
+    lens = [layers.shape[1]]
+    return _chain_obj3d(vertices, _chain_mesh(vertices, layers, lens, is_convex))
+
+
 def polyhedron(
     vertices: list[tuple[float, float, float]],
     faces: list[tuple[int, int, int]],
@@ -423,6 +648,8 @@ def polyhedron(
 
     """
     if validate:
+        import trimesh
+
         mesh_output = trimesh.Trimesh(
             vertices=vertices, faces=faces, force="mesh", validate=validate
         )
@@ -453,6 +680,7 @@ def pyramid(height: int, num_sides: int, radius: float) -> Obj3d:
     )
 
 
+@_cache.cache_op("rounded_cuboid")
 def rounded_cuboid(
     size: list[float, float, float],
     rounding_radius=2.0,
@@ -472,72 +700,65 @@ def rounded_cuboid(
     <iframe width="100%" height="250" src="examples/rounded_cuboid.html"></iframe>
     """
     if segments == -1:
-        segments = Config.get_default_segments()
+        segments = Config.get_segments(rounding_radius)
     _chkGE("segments", segments, 3)
     _chkGE("rounding_radius", rounding_radius, 0)
     _chkV3("size", size)
     if type(size) == float or type(size) == int:
         size = (size, size, size)
-    l = []
     res = Config.get_layer_resolution()
     arc_segs = rounding_radius / res
     deg_per_arc_seg = 90.0 / arc_segs
-    deg = 0.0
-    cur_z = 0
     x, y, z = size
     rr = rounding_radius
     ix = x - 2 * rr
     iy = y - 2 * rr
     smallest_rr = sin(deg_per_arc_seg) / 2.0
-    l.append(
-        (cur_z, rounded_rectangle((ix, iy), smallest_rr, segments).translate((rr, rr)))
-    )
-    deg += deg_per_arc_seg
+
+    # The angles of the layers rounding the bottom and the top edges.
+    up = []
+    deg = deg_per_arc_seg
     while deg < 90.0:
-        delta = rr * sin(deg)
-        cur_z = rr - rr * cos(deg)
-        l.append(
-            (
-                cur_z,
-                rounded_rectangle(
-                    (ix + 2 * delta, iy + 2 * delta), delta, segments
-                ).translate((rr - delta, rr - delta)),
-            )
-        )
+        up.append(deg)
         deg += deg_per_arc_seg
-
-    cur_z = rr
-    l.append((cur_z, rounded_rectangle((x, y), rr, segments)))
-
-    cur_z = z - rr
-    l.append((cur_z, rounded_rectangle((x, y), rr, segments)))
-
-    deg = 90.0
-    deg -= deg_per_arc_seg
+    down = []
+    deg = 90.0 - deg_per_arc_seg
     while deg > 0.0:
-        delta = rr * sin(deg)
-        cur_z = z - rr + rr * cos(deg)
-        l.append(
-            (
-                cur_z,
-                rounded_rectangle(
-                    ((ix) + 2 * delta, (iy) + 2 * delta), delta, segments
-                ).translate((rr - delta, rr - delta)),
-            )
-        )
+        down.append(deg)
         deg -= deg_per_arc_seg
+    c_up, s_up = _cos_sin(up)
+    c_down, s_down = _cos_sin(down)
+    d_up, d_down = rr * s_up, rr * s_down
 
-    cur_z = z
-    l.append(
-        (cur_z, rounded_rectangle((ix, iy), smallest_rr, segments).translate((rr, rr)))
+    # Each layer is a rounded rectangle of `radii` and `sizes`, moved by `offsets` in x and y.
+    heights = _np.concatenate(
+        [[0], rr - rr * c_up, [rr, z - rr], z - rr + rr * c_down, [z]]
     )
-
-    o = extrude_chaining(l, is_convex=True)
+    radii = _np.concatenate([[smallest_rr], d_up, [rr, rr], d_down, [smallest_rr]])
+    offsets = _np.concatenate([[rr], rr - d_up, [0, 0], rr - d_down, [rr]])
+    inner = _np.array([(ix, iy)])
+    sizes = _np.concatenate(
+        [
+            inner,
+            inner + 2 * d_up[:, None],
+            [(x, y), (x, y)],
+            inner + 2 * d_down[:, None],
+            inner,
+        ]
+    )
+    layers = _rounded_rectangles(sizes, radii, segments) + offsets[:, None, None]
+    vertices = _np.concatenate(
+        [layers, _np.broadcast_to(heights[:, None, None], layers.shape[:2] + (1,))],
+        axis=2,
+    )
+    n = layers.shape[1]
+    o = _chain_obj3d(vertices, _chain_mesh(vertices, layers, [n], True))
     if center:
         o = o.translate((-x / 2.0, -y / 2.0, -z / 2.0))
     return o
 
 
+@_cache.cache_op("rounded_cylinder")
 def rounded_cylinder(
     height: float,
     radius: float,
@@ -558,16 +779,20 @@ def rounded_cylinder(
 
     <iframe width="100%" height="250" src="examples/rounded_cylinder.html"></iframe>
     """
+    _chkGT("radius", radius, 0)
+    _chkGT("rounding_radius", rounding_radius, 0)
     if segments == -1:
-        segments = Config.get_default_segments()
+        profile_segments = Config.get_segments(rounding_radius)
+        segments = Config.get_segments(radius)
+    else:
+        profile_segments = segments
     _chkGE("segments", segments, 3)
-    _chkGT("radius", radius, 0)
-    rr = (
-        rounded_rectangle((2 * radius, height), rounding_radius, segments)
-        .translate((-radius, 0))
-        .piecut(90, 270)
+    # The right half of a rounded rectangle, revolved.
+    rect = _rounded_rectangles(
+        [(2 * radius, height)], [rounding_radius], profile_segments
     )
-    o3 = revolve(rr, segments=segments)
+    rect[0, :, 0] -= radius
+    o3 = _revolve(_right_half(rect[0]), segments)
     if center:
         o3 = o3.translate((0, 0, -height / 2.0))
     return o3
@@ -581,9 +806,10 @@ def revolve(obj: Obj2d, revolve_degrees: float = 360.0, segments: int = -1) -> O
 
     <iframe width="100%" height="220" src="examples/revolve.html"></iframe>
     """
-    if segments == -1:
-        segments = Config.get_default_segments()
     _chkTY("obj", obj, Obj2d)
+    if segments == -1:
+        x0, _, x1, _ = obj.bounding_box()
+        segments = Config.get_segments(max(abs(x0), abs(x1)))
     _chkGE("segments", segments, 3)
     _chkGT("revolve_degrees", revolve_degrees, 0)
     return Obj3d(_m.Manifold.revolve(obj.mo, segments, revolve_degrees))
@@ -598,13 +824,81 @@ def sphere(radius: float, segments: int = -1) -> Obj3d:
     <iframe width="100%" height="220" src="examples/sphere.html"></iframe>
     """
     if segments == -1:
-        segments = Config.get_default_segments()
-    _chkGE("radius", radius, 0)
+        segments = Config.get_segments(radius)
+    _chkGT("radius", radius, 0)
     _chkGE("segments", segments, 3)
 
-    circ = circle(radius, 2 * segments).piecut(90, 270)
+    return Obj3d(_unit_sphere(segments).scale((radius, radius, radius)))
 
-    return revolve(circ, segments=segments)
+
+def sweep(
+    profile: _np.ndarray | object,
+    path: list[tuple[float, float, float]],
+    closed: bool = False,
+    segments: int = -1,
+    is_convex: bool = False,
+) -> Obj3d:
+    """
+    Create a 3d object by sweeping a 2d profile along a 3d path.
+
+    The path is a smooth (Catmull-Rom) spline passing through the points in `path`,
+    which is sampled at `segments` places along its length.
+    If `closed` is `True` the path returns to its first point
+    and the result is a ring with no end caps (like a torus).
+
+    At each place the profile is placed perpendicular to the path,
+    its x axis following the path with as little twisting as possible.
+    The profile is drawn looking back along the path (like `extrude`,
+    when the path goes straight up).
+
+    Parameter `profile` is one of:
+
+    * A single `(N, 2)` array, used everywhere along the path.
+    * A `(segments, N, 2)` array, a polygon of N points for each place.
+    * A function taking `t`, which goes from 0 (the start of the path) to 1 (the end),
+    and returning an `(N, 2)` array. N must be the same for all places.
+
+    The polygons must not cross themselves. They may be clockwise or counter-clockwise.
+
+    For `segments` see the documentation of [`Config.set_default_segments`](index.html#piecad.Config.set_default_segments).
+
+    For `is_convex` see `extrude_chaining`.
+
+    ```
+    import numpy as np
+
+    # A handle whose cross section shrinks towards the middle.
+    def section(t):
+        a = np.linspace(0, 2 * np.pi, 32, endpoint=False)
+        r = 4 - 1.5 * np.sin(np.pi * t)
+        return r * np.stack([np.cos(a), np.sin(a)], axis=1)
+
+    o = sweep(section, [(0, 0, 0), (10, 0, 30), (50, 0, 30), (60, 0, 0)], segments=60)
+    ```
+    """
+    if segments == -1:
+        segments = Config.get_default_segments()
+    _chkGE("segments", segments, 3 if closed else 2)
+    path = _np.asarray(path, _np.float64)
+    if path.ndim != 2 or path.shape[1] != 3:
+        raise ValidationError("Parameter path must be a list of 3d points.")
+    _chkGE("path length", len(path), 3 if closed else 2)
+    steps = _np.diff(_np.concatenate([path, path[:1]]) if closed else path, axis=0)
+    if not _np.any(steps, axis=1).all():
+        raise ValidationError("Parameter path has repeated consecutive points.")
+
+    pts, tangents = _catmull_rom(path, segments, closed)
+    normals, binormals = _frames(pts, tangents, closed)
+    layers = _profile_layers(profile, _np.linspace(0.0, 1.0, segments))
+    vertices = (
+        pts[:, None, :]
+        + layers[:, :, 0, None] * normals[:, None, :]
+        + layers[:, :, 1, None] * binormals[:, None, :]
+    )
+    lens = [layers.shape[1]]
+    return _chain_obj3d(
+        vertices, _chain_mesh(vertices, layers, lens, is_convex, closed)
+    )
 
 
 def torus(outer_radius: float, inner_radius: float, segments=-1) -> Obj3d:
@@ -615,16 +909,20 @@ def torus(outer_radius: float, inner_radius: float, segments=-1) -> Obj3d:
 
     <iframe width="100%" height="220" src="examples/torus.html"></iframe>
     """
-    if segments == -1:
-        segments = Config.get_default_segments()
     _chkGT("outer_radius", outer_radius, 0)
     _chkGT("inner_radius", inner_radius, 0)
-    _chkGE("segments", segments, 3)
+    if segments != -1:
+        _chkGE("segments", segments, 3)
     if inner_radius >= outer_radius:
         raise ValidationError(
             "Parameter inner_radius must be smaller than outer_radius."
         )
-    sz = (outer_radius - inner_radius) / 2.0
-    circ = circle(sz, segments).translate((outer_radius - sz, outer_radius - sz))
+    tube_segments = segments
+    if segments == -1:
+        tube_segments = Config.get_segments((outer_radius - inner_radius) / 2.0)
+        segments = Config.get_segments(outer_radius)
+
+    return Obj3d(_torus(outer_radius, inner_radius, tube_segments, segments))
+
 
-    return revolve(circ, segments=segments).translate((0, 0, -outer_radius + sz))
+_trace.trace_module(globals())
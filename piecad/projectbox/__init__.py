@@ -24,6 +24,8 @@ from piecad import (
     Config,
     rounded_rectangle,
     union,
+    linear_array,
+    parallel_map,
     intersect,
     difference,
     polyhedron,
@@ -36,6 +38,7 @@ from piecad import (
     _chkGE,
     _chkV3,
 )
+from piecad import _cache
 
 class ProjectBox:
     """
@@ -59,9 +62,8 @@ class ProjectBox:
 
         <iframe width="100%" height="380" src="../examples/projectbox.html"></iframe>
         """
-        if segments == -1:
-            segments = Config.get_default_segments()
-        _chkGE("segments", segments, 3)
+        if segments != -1:
+            _chkGE("segments", segments, 3)
         _chkV3("size", size)
         _chkGE("wall", wall, 2.0)
 
@@ -84,9 +86,9 @@ class ProjectBox:
             rd = (screw_top_r+4*wall)+tiny
             rr = rd/2.0
             off = 4*wall+tiny
-            self.corner_offset = 3*rr
 
-            def post(rot):
+            def post():
+                # One corner post, built once and turned for each corner.
                 post_l = 2*rr
                 post_w = 3*wall+tiny
                 return difference(
@@ -98,7 +100,7 @@ class ProjectBox:
                     cylinder(radius=screw_r, height=screw_h).translate([0, 0, self.h-screw_h]),
                     cylinder(radius=rr+4, height=nut_h).piecut(300, 150).translate([0, 0, self.h-nut_h-wall]),
                     cylinder(radius=nut_r, height=nut_h, segments=6).translate([0, 0, self.h-nut_h-wall]),
-                ).translate([rr, rr, 0]).rotate([0, 0, rot])
+                ).translate([rr, rr, 0])
 
             if ty == 't' or ty == 'm':
                 w = dims[0]+2*off
@@ -106,11 +108,12 @@ class ProjectBox:
                 h = dims[2]
                 o = rounded_rectangle([w, d], rr, segments).extrude(h)
                 if ty == 't':
+                    p = post()
                     o = union(o,
-                       post(0),
-                       post(270).translate([0, d, 0]),
-                       post(180).translate([w, d, 0]),
-                       post(90).translate([w, 0, 0]),
+                       p,
+                       p.rotate([0, 0, 270]).translate([0, d, 0]),
+                       p.rotate([0, 0, 180]).translate([w, d, 0]),
+                       p.rotate([0, 0, 90]).translate([w, 0, 0]),
                     )
                     o = difference(
                         o,
@@ -131,12 +134,13 @@ class ProjectBox:
                         )
                         return o
 
+                    b = tbh()
                     o = difference(
                         o,
-                        tbh().translate([rr, rr, 0]),
-                        tbh().translate([w-rr, rr, 0]),
-                        tbh().translate([rr, d-rr, 0]),
-                        tbh().translate([w-rr, d-rr, 0]),
+                        b.translate([rr, rr, 0]),
+                        b.translate([w-rr, rr, 0]),
+                        b.translate([rr, d-rr, 0]),
+                        b.translate([w-rr, d-rr, 0]),
                     )
                 o = o.translate([-off, -off, -wall])
             else:
@@ -148,22 +152,30 @@ class ProjectBox:
                 o = o.translate([(dims[0]-w)/2, 0, -wall])
             return o
 
-        self._l_wall = mkwall([self.d, self.h, self.wall])
+        screw_top_r = 3.0+iota
+        self.corner_offset = 3*((screw_top_r+4*wall)+tiny)/2.0
+
+        def cached_wall(dims, ty=None):
+            # mkwall also depends on the box height, wall thickness and segments.
+            return _cache.cached("ProjectBox.wall", lambda *_: mkwall(dims, ty),
+                dims, ty, self.h, wall, segments)
+
+        self._l_wall = cached_wall([self.d, self.h, self.wall])
         self._l_unions = []
         self._l_differences = []
-        self._r_wall = mkwall([self.d, self.h, self.wall])
+        self._r_wall = self._l_wall  # The same until components are added.
         self._r_unions = []
         self._r_differences = []
-        self._f_wall = mkwall([self.w, self.h, self.wall])
+        self._f_wall = cached_wall([self.w, self.h, self.wall])
         self._f_unions = []
         self._f_differences = []
-        self._k_wall = mkwall([self.w, self.h, self.wall])
+        self._k_wall = self._f_wall
         self._k_unions = []
         self._k_differences = []
-        self._t_wall = mkwall([self.w, self.d, self.wall], 't')
+        self._t_wall = cached_wall([self.w, self.d, self.wall], 't')
         self._t_unions = []
         self._t_differences = []
-        self._m_wall = mkwall([self.w, self.d, self.wall], 'm')
+        self._m_wall = cached_wall([self.w, self.d, self.wall], 'm')
         self._m_unions = []
         self._m_differences = []
 
@@ -228,7 +240,7 @@ class ProjectBox:
         if hole != None:
             self._m_differences.append(hole.translate([x, y, 0]))
 
-    def finish(self) -> Obj3d:
+    def finish(self, parallel: bool = False) -> Obj3d:
         """
         The `finish` method returns a six-tuple of the parts of the project box:
 
@@ -236,21 +248,36 @@ class ProjectBox:
         left, right, front, back, top, bottom = ProjectBox((45, 30, 20)).finish()
         ```
 
+        Set `parallel` to `True` to finish the walls at the same time with
+        [`parallel_map`](../bulk_ops.html#piecad.bulk_ops.parallel_map)
+        (your script then needs the `if __name__ == "__main__":` guard described there).
         """
-        def f(box, differences, unions):
-            if len(unions) > 0:
-                box = union(box, *unions)
-            if len(differences) > 0:
-                box = difference(box, *differences)
-            return box
-        return (
-                f(self._l_wall, self._l_differences, self._l_unions),
-                f(self._r_wall, self._r_differences, self._r_unions),
-                f(self._f_wall, self._f_differences, self._f_unions),
-                f(self._k_wall, self._k_differences, self._k_unions),
-                f(self._t_wall, self._t_differences, self._t_unions),
-                f(self._m_wall, self._m_differences, self._m_unions),
-                )
+        parts = [
+            (self._l_wall, self._l_differences, self._l_unions),
+            (self._r_wall, self._r_differences, self._r_unions),
+            (self._f_wall, self._f_differences, self._f_unions),
+            (self._k_wall, self._k_differences, self._k_unions),
+            (self._t_wall, self._t_differences, self._t_unions),
+            (self._m_wall, self._m_differences, self._m_unions),
+        ]
+        # Walls that are still the same (no components added) are only finished once.
+        keys = [(id(b), tuple(map(id, d)), tuple(map(id, u))) for b, d, u in parts]
+        todo = dict(zip(keys, parts))
+        if parallel:
+            done = parallel_map(_finish_wall, *zip(*todo.values()))
+        else:
+            done = [_finish_wall(*part) for part in todo.values()]
+        done = dict(zip(todo, done))
+        return tuple(done[key] for key in keys)
+
+
+def _finish_wall(box, differences, unions):
+    # One wall of ProjectBox.finish (a top level function, for parallel_map).
+    if len(unions) > 0:
+        box = union(box, *unions)
+    if len(differences) > 0:
+        box = difference(box, *differences)
+    return box
 
 class pbc:
     @staticmethod
@@ -356,16 +383,15 @@ class pbc:
         ORIGIN: centered
         """
         tiny = 0.01
-        l = []
-        y = -(radius - hole_w)
-        while y <= radius - hole_w:
-            l.append(
-                cube([radius * 2, hole_w, wall + 2 * tiny], center=True).translate([0, y, 0])
-            )
-            y += 2 * hole_w
+        rows = linear_array(
+            cube([radius * 2, hole_w, wall + 2 * tiny], center=True).translate([0, -(radius - hole_w), 0]),
+            int((radius - hole_w) // hole_w) + 1,
+            (0, 2 * hole_w, 0),
+        )
         return intersect(
-            union(*l), cylinder(radius=radius, height=wall + 2 * tiny, center=True)
+            rows, cylinder(radius=radius, height=wall + 2 * tiny, center=True)
         ).translate([0, 0, -(wall / 2) - tiny])
 
 
-project_box_corner_offset = ProjectBox([20,20,20]).corner_offset
+# The corner_offset of a ProjectBox with the default wall (2.0).
+project_box_corner_offset = 3*((3.0+0.1+4*2.0)+0.5)/2.0
@@ -6,6 +6,7 @@ come out exact, DO come out exact.
 """
 
 import math as _math
+import numpy as _np
 
 
 def deg_to_rad(angleInDegrees: float) -> float:
@@ -94,6 +95,18 @@ def sin(angleInDegrees: float) -> float:
     return _math.sin(deg_to_rad(angleInDegrees))
 
 
+def _cos_sin(anglesInDegrees: _np.ndarray) -> tuple[_np.ndarray, _np.ndarray]:
+    # Cosine and sine of an array of angles, exact wherever `cos` and `sin` are.
+    d = _np.asarray(anglesInDegrees, _np.float64) % 360.0
+    r = d * (_math.pi / 180)
+    c, s = _np.cos(r), _np.sin(r)
+    for a, v in _quickCos.items():
+        c[d == a] = v
+    for a, v in _quickSin.items():
+        s[d == a] = v
+    return c, s
+
+
 def tan(angleInDegrees: float) -> float:
     "Tangent of angle in degrees."
     angleInDegrees = abs(angleInDegrees % 360.0)
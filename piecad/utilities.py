@@ -3,22 +3,20 @@
 """
 
 import atexit
-import http.client
 import json
 import queue
 import threading
 import manifold3d as _m
-import trimesh
 import inspect
 import os.path
-import subprocess
 import sys
 import time
 from pathlib import Path as _Path
 import numpy as _np
 from . import Obj2d, Obj3d, Config, _chkGE, _chkGO, ValidationError
 
-from ._export_3mf import export_3mf as _export_3mf
+from ._color import _face_color_palette
+from . import _trace
 
 
 def _info_str(tag):  # Must be called from inside another function.
@@ -51,10 +49,22 @@ def load(filename: str) -> Obj3d | Obj2d:
 
     \\(See [https://github/mikedh/trimesh] for more formats.\\)
 
+    Binary STL and PLY files are read directly (memory mapped),
+    identical vertices are merged, and the result is checked by Manifold.
+    Other formats, and files Manifold rejects, are read (and repaired if possible)
+    by trimesh.
+
     Currently 2d objects are not supported.
     """
     dot_idx = filename.rindex(".")
     ext = filename[dot_idx + 1 :]
+    if ext == "stl" or ext == "ply":
+        o = _load_binary(filename, ext)
+        if o != None:
+            return o
+
+    import trimesh
+
     mesh = trimesh.exchange.load.load(filename, ext, force="mesh", validate=True)
     if type(mesh) == trimesh.path.Path2D:
         raise ValidationError("Currently 2d objects are no supported.")
@@ -66,6 +76,27 @@ def load(filename: str) -> Obj3d | Obj2d:
     return o
 
 
+def _load_binary(filename, ext):
+    from . import _import_binary
+
+    if ext == "stl":
+        mesh = _import_binary.load_stl(filename)
+    else:
+        mesh = _import_binary.load_ply(filename)
+    if mesh == None:
+        return None
+    vertices, tris = mesh
+    if vertices.dtype == _np.float32:
+        mo = _m.Manifold(_m.Mesh(vertices, tris))
+    else:
+        mo = _m.Manifold(
+            _m.Mesh64(_np.asarray(vertices, _np.float64), tris.astype(_np.uint64))
+        )
+    if mo.status() != _m.Error.NoError:
+        return None
+    return Obj3d(mo)
+
+
 _save_dir = None
 
 
@@ -94,22 +125,73 @@ def _get_save_dir():
 
 
 def _face_colors(obj, mesh):
-    flen = len(mesh.tri_verts)
-    face_colors = _np.zeros((flen, 3), dtype=_np.uint8)
-    for i in range(0, len(mesh.run_index) - 1):
-        for j in range(mesh.run_index[i] // 3, mesh.run_index[i + 1] // 3):
-            id = mesh.run_original_id[i]
-            if id == -1 or id not in Obj3d.color_map:
-                color = Config.get_default_color()
-            else:
-                color = Obj3d.color_map[id]
-            face_colors[j][0] = color[0]
-            face_colors[j][1] = color[1]
-            face_colors[j][2] = color[2]
-    return face_colors
+    palette, face_idx = _face_color_palette(
+        mesh, Obj3d.color_map, Config.get_default_color()
+    )
+    return palette[face_idx]
 
 
-def save(filename: str, *objs: Obj3d | Obj2d) -> None:
+class Instances:
+    """
+    One `Obj3d` placed several times, for example the same post or fastener
+    at dozens of places on a panel.
+
+    Each entry of `transforms` places one copy. It is either the offsets
+    `(x, y, z)` to translate the copy by, or a 3x4 affine transformation matrix
+    (as for `Obj3d.transform`).
+
+    `save` writes the shape only once, plus a transform per copy, to 3MF (as components),
+    GLB and GLTF (as mesh instances) files; this makes them smaller and faster to write.
+    Other formats get a full copy of the shape for each transform.
+    """
+
+    def __init__(
+        self,
+        obj: Obj3d,
+        transforms: list[
+            tuple[float, float, float]
+            | tuple[
+                tuple[float, float, float, float],
+                tuple[float, float, float, float],
+                tuple[float, float, float, float],
+            ]
+        ],
+    ) -> None:
+        if type(obj) != Obj3d:
+            raise ValidationError("Parameter obj must be of type Obj3d")
+        _chkGE("len(transforms)", len(transforms), 1)
+        matrices = _np.zeros((len(transforms), 3, 4))
+        matrices[:, :, :3] = _np.eye(3)
+        for i, t in enumerate(transforms):
+            t = _np.asarray(t, _np.float64)
+            if t.shape == (3,):
+                matrices[i, :, 3] = t
+            elif t.shape == (3, 4):
+                matrices[i] = t
+            else:
+                raise ValidationError(
+                    "Each transform must be offsets (x, y, z) or a 3x4 matrix."
+                )
+        self.obj = obj
+        self.transforms = matrices
+
+    def to_obj3d(self) -> Obj3d:
+        """
+        Return all the copies as a single `Obj3d` (see `compose`).
+
+        The copies should not overlap; if they do, use `union` on `Obj3d.transform` of each instead.
+        """
+        mo = self.obj.mo
+        return Obj3d(_m.Manifold.compose([mo.transform(t) for t in self.transforms]))
+
+
+def save(
+    filename: str,
+    *objs: Obj3d | Instances | Obj2d,
+    validate: bool | None = None,
+    svg_precision: int = 5,
+    svg_relative: bool = False,
+) -> None:
     """
     Save a 3d or 2d object in a file suitable for printing, etc.
 
@@ -139,7 +221,22 @@ def save(filename: str, *objs: Obj3d | Obj2d) -> None:
 
     \\(See [https://github/mikedh/trimesh] for more formats.\\)
 
+    3MF, binary STL and PLY files are written directly from the mesh.
+    Other formats are written by trimesh, which checks the mesh and warns
+    if it is not watertight (this is slow for large meshes).
+    The default `validate` of `None` checks the meshes written by trimesh only,
+    so binary STL and PLY files are saved without trimesh's watertight check
+    unless `validate=True` is passed (they are then written through trimesh).
+    Set `validate` to `False` to skip the check for every format.
+
+    When several objects are saved to an STL or PLY file, they are combined into one mesh.
+
+    To place the same shape many times, pass it as `Instances`.
+
     For 2D, only the SVG (.svg) format is available.
+    Coordinates are written with `svg_precision` digits after the decimal point.
+    If `svg_relative` is `True`, each point of a path is written relative to the one before it,
+    which makes files (laser cutting layouts, say) noticeably smaller.
     """
 
     if filename.find("/") == -1 and filename.find("\\") == -1:
@@ -148,69 +245,55 @@ def save(filename: str, *objs: Obj3d | Obj2d) -> None:
     _chkGE("len(objs)", len(objs), 1)
     dot_idx = filename.rindex(".")
     ext = filename[dot_idx + 1 :]
-    if type(objs[0]) == Obj3d:
-        if len(objs) == 1:
-            obj = objs[0]
-            if filename.endswith(".3mf"):
-                _export_3mf(
-                    filename,
-                    obj.mo,
-                    Obj3d.color_map,
-                    Config.get_default_units(),
-                    Config.get_default_color(),
-                )
-                return
-            mesh = obj.mo.to_mesh64()
-            if mesh.vert_properties.shape[1] > 3:
-                vertices = mesh.vert_properties[:, :3]
-            else:
-                vertices = mesh.vert_properties
-
-            face_colors = _face_colors(obj, mesh)
-            mesh_output = trimesh.Trimesh(
-                vertices=vertices,
-                faces=mesh.tri_verts,
-                face_colors=face_colors,
-                process=False,
-                validate=True,
+    if type(objs[0]) != Obj2d:
+        if validate == None:
+            validate = ext != "stl" and ext != "ply"
+        for obj in objs:
+            if type(obj) != Obj3d and type(obj) != Instances:
+                raise ValidationError("Mixed types in parameter: objs.")
+        if ext == "3mf":
+            from ._export_3mf import export_3mf as _export_3mf
+
+            _export_3mf(
+                filename,
+                [obj.mo if type(obj) == Obj3d else obj.obj.mo for obj in objs],
+                Obj3d.color_map,
+                Config.get_default_units(),
+                Config.get_default_color(),
+                [None if type(obj) == Obj3d else obj.transforms for obj in objs],
+            )
+            return
+        if not validate and (ext == "stl" or ext == "ply"):
+            _save_binary(filename, ext, objs)
+            return
+        import trimesh
+
+        if len(objs) == 1 and type(objs[0]) == Obj3d:
+            trimesh.exchange.export.export_mesh(
+                _trimesh(objs[0], objs[0].mo.to_mesh64(), validate), filename, ext
             )
-            # Manifold3d has a different definition than Trimesh
-            if not mesh_output.is_watertight:
-                print("WARNING: output mesh is not watertight")
-            trimesh.exchange.export.export_mesh(mesh_output, filename, ext)
         else:
             scene = trimesh.Scene()
             for obj in objs:
-                mesh = obj.mo.to_mesh()
-                if mesh.vert_properties.shape[1] > 3:
-                    vertices = mesh.vert_properties[:, :3]
-                else:
-                    vertices = mesh.vert_properties
-                face_colors = _face_colors(obj, mesh)
-                mesh_output = trimesh.Trimesh(
-                    vertices=vertices,
-                    faces=mesh.tri_verts,
-                    face_colors=face_colors,
-                    process=False,
-                    validate=True,
+                if type(obj) == Obj3d:
+                    scene.add_geometry(_trimesh(obj, obj.mo.to_mesh(), validate))
+                    continue
+                # One geometry, with a node (a mesh instance in GLTF) per transform.
+                mesh = obj.obj.mo.to_mesh()
+                m4 = _np.eye(4)
+                m4[:3] = obj.transforms[0]
+                node = scene.add_geometry(
+                    _trimesh(obj.obj, mesh, validate), transform=m4.copy()
                 )
-                # Manifold3d has a different definition than Trimesh
-                if not mesh_output.is_watertight:
-                    print("WARNING: output mesh is not watertight")
-                scene.add_geometry(mesh_output)
-            if filename.endswith(".3mf"):
-                s_mesh = scene.to_mesh64()
-                s_vertices = _np.array(s_mesh.vertices, _np.float64)
-                s_faces = _np.array(s_mesh.faces, _np.uint64)
-                mo = _m.Manifold(_m.Mesh64(s_vertices, s_faces))
-                _export_3mf(
-                    filename,
-                    mo,
-                    Obj3d.color_map,
-                    Config.get_default_units(),
-                    Config.get_default_color(),
-                )
-                return
+                geom_name = scene.graph[node][1]
+                for i, t in enumerate(obj.transforms[1:], 1):
+                    m4[:3] = t
+                    scene.graph.update(
+                        frame_to=f"{node}_{i}",
+                        frame_from=scene.graph.base_frame,
+                        geometry=geom_name,
+                        matrix=m4.copy(),
+                    )
             trimesh.exchange.export.export_scene(scene, filename, ext)
         # trimesh obj file export does not end with newline
         # currently this upsets prusa_slicer
@@ -220,54 +303,113 @@ def save(filename: str, *objs: Obj3d | Obj2d) -> None:
     else:  # Obj2d
         if ext != "svg":
             raise (ValidationError("Only the SVG format is supported for Obj2d."))
-        _save_svg(filename, *objs)
+        _chkGE("svg_precision", svg_precision, 0)
+        _save_svg(filename, *objs, precision=svg_precision, relative=svg_relative)
 
 
-def _save_svg(filename, *objs):
-    txt = []
-    bb = [0.0, 0.0, 0.0, 0.0]
-    for obj in objs:
-        obb = obj.bounding_box()
-        bb[0] = min(obb[0], bb[0])
-        bb[1] = min(obb[1], bb[1])
-        bb[2] = max(obb[2], bb[2])
-        bb[3] = max(obb[3], bb[3])
-    width = round(bb[2] - bb[0], 5)
-    height = round(bb[3] - bb[1], 5)
-    units = Config.get_default_units()
+def _trimesh(obj, mesh, validate):
+    import trimesh
 
-    txt.append('<?xml version="1.0" encoding="UTF-8"?>')
-    txt.append("<!-- Created by Piecad. -->")
-    txt.append(
-        '<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1 Tiny//EN" "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11-tiny.dtd">'
-    )
-    txt.append(
-        f'<svg width="{width}{units}" height="{height}{units}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg" fill-rule="evenodd">'
+    if mesh.vert_properties.shape[1] > 3:
+        vertices = mesh.vert_properties[:, :3]
+    else:
+        vertices = mesh.vert_properties
+    mesh_output = trimesh.Trimesh(
+        vertices=vertices,
+        faces=mesh.tri_verts,
+        face_colors=_face_colors(obj, mesh),
+        process=False,
+        validate=validate,
     )
+    # Manifold3d has a different definition than Trimesh
+    if validate and not mesh_output.is_watertight:
+        print("WARNING: output mesh is not watertight")
+    return mesh_output
+
+
+def _save_binary(filename, ext, objs):
+    from . import _export_binary
+
+    meshes = []
+    for obj in objs:
+        transforms = None
+        if type(obj) == Instances:
+            obj, transforms = obj.obj, obj.transforms
+        mesh = obj.mo.to_mesh64()
+        vertices = mesh.vert_properties[:, :3]
+        tris = mesh.tri_verts
+        colors = None if ext == "stl" else _face_colors(obj, mesh)
+        if transforms is None:
+            meshes.append((vertices, tris, colors))
+            continue
+        # The mesh is only made once; each copy just moves its vertices.
+        flipped = tris[:, ::-1]
+        for t in transforms:
+            mirrored = _np.linalg.det(t[:, :3]) < 0
+            meshes.append(
+                (vertices @ t[:, :3].T + t[:, 3], flipped if mirrored else tris, colors)
+            )
+    if ext == "stl":
+        _export_binary.export_stl(filename, [m[:2] for m in meshes])
+    else:
+        _export_binary.export_ply(filename, meshes)
+
+
+def _svg_path(pts, precision, relative):
+    # SVG path data for one polygon, an (N,2) array of points already in SVG coordinates.
+    pts = _np.round(pts, precision)
+    if not relative:
+        fmt = "M%r %r\n" + "L%r %r\n" * (len(pts) - 1)
+        return fmt % tuple(pts.ravel().tolist())
+    # Steps between the rounded points, so rounding errors don't add up along the path.
+    steps = _np.round(_np.diff(pts, axis=0), precision)
+    fmt = "M%r %rl" + " %r %r" * len(steps) + "\n"
+    d = fmt % (*pts[0].tolist(), *steps.ravel().tolist())
+    return d.replace(" -", "-")
+
+
+def _save_svg(filename, *objs, precision=5, relative=False):
+    # The drawing always includes the origin.
+    boxes = _np.array([obj.bounding_box() for obj in objs])
+    lo = _np.minimum(boxes[:, :2].min(0), 0.0)
+    hi = _np.maximum(boxes[:, 2:].max(0), 0.0)
+    bb = lo.tolist() + hi.tolist()
+    width = round(bb[2] - bb[0], precision)
+    height = round(bb[3] - bb[1], precision)
+    units = Config.get_default_units()
 
     off_x = 0 - bb[0]
     off_y = 0 - bb[1]
     y_size = bb[3] - bb[1]
-    for obj in objs:
-        color = obj._color if obj._color != None else (128, 128, 128)
-        txt.append(f'<g><path fill="rgb({color[0]},{color[1]},{color[2]})" d="')
-        paths = obj.to_paths()
-        for path in paths:
-            for i in range(len(path)):
-                vert = path[i]
-                x = round(vert[0] + off_x, 5)
-                y = round(y_size - (vert[1] + off_y), 5)
-                if i == 0:
-                    txt.append(f"M{x} {y}")
-                else:
-                    txt.append(f"L{x} {y}")
-
-        txt.append('"/></g>\n')
-
-    txt.append("</svg>")
-
+    # The file is written a piece at a time, in chunks of about this many characters.
+    chunk_size = 1 << 20
     with open(filename, "w") as f:
-        f.write("\n".join(txt))
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write("<!-- Created by Piecad. -->\n")
+        f.write(
+            '<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1 Tiny//EN" "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11-tiny.dtd">\n'
+        )
+        f.write(
+            f'<svg width="{width}{units}" height="{height}{units}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg" fill-rule="evenodd">\n'
+        )
+        for obj in objs:
+            color = obj._color if obj._color != None else (128, 128, 128)
+            f.write(f'<g><path fill="rgb({color[0]},{color[1]},{color[2]})" d="\n')
+            chunk = []
+            size = 0
+            for path in obj.to_paths():
+                pts = _np.empty_like(path)
+                pts[:, 0] = path[:, 0] + off_x
+                pts[:, 1] = y_size - (path[:, 1] + off_y)
+                chunk.append(_svg_path(pts, precision, relative))
+                size += len(chunk[-1])
+                if size >= chunk_size:
+                    f.write("".join(chunk))
+                    chunk = []
+                    size = 0
+            f.write("".join(chunk))
+            f.write('"/></g>\n\n')
+        f.write("</svg>")
 
 
 _view_queue = queue.Queue()
@@ -293,6 +435,9 @@ def view(obj: Obj3d | Obj2d, title: str = "") -> None:
     port, by setting your operating systems `PIECAD_VIEWER` environment
     variable.  By default this is set to: "127.0.0.1:8037".
     This environment variable is also used by the `piecad-viewer` program.
+
+    Models are sent to `Piecad-Viewer` in a compact binary form when it supports it,
+    otherwise as JSON.
     """
     global _view_thread
     if _viewer_available == False:
@@ -317,21 +462,12 @@ def view(obj: Obj3d | Obj2d, title: str = "") -> None:
         _view_thread.start()
         atexit.register(_tell_view_handler_to_exit)
 
-    mesh = obj.mo.to_mesh64()
-    if mesh.vert_properties.shape[1] > 3:
-        vertices = mesh.vert_properties[:, :3]
-    else:
-        vertices = mesh.vert_properties
+    mesh = obj.mo.to_mesh()
+    vertices = mesh.vert_properties[:, :3]
     faces = mesh.tri_verts
     face_colors = _face_colors(obj, mesh)
-    view_data = {}
-    view_data["title"] = title
-    fc = face_colors.tolist()
-    view_data["color"] = fc
-    view_data["vertices"] = vertices.tolist()
-    fl = faces.tolist()
-    view_data["faces"] = fl
-    _view_queue.put(view_data)
+    # Encoding is left to _view_handler, which knows what the viewer accepts.
+    _view_queue.put((title, vertices, faces, face_colors))
     return obj
 
 
@@ -342,17 +478,62 @@ def _tell_view_handler_to_exit():
 
 _piecad_viewer = "127.0.0.1:8037"
 
+# Binary view protocol.
+#
+# On startup we advertise it with an "X-Piecad-View-Protocols: binary" request header.
+# A viewer that understands it answers with "X-Piecad-View-Protocol: binary",
+# older viewers don't answer and keep getting JSON.
+#
+# A binary view is POSTed with "Content-Type: application/x-piecad-view" and a body of:
+#   uint32 (little-endian) length of the JSON header that follows
+#   JSON header (UTF-8): {"title": str, "num_vertices": int, "num_faces": int}
+#   vertices:    num_vertices * 3 float32 (little-endian)
+#   faces:       num_faces * 3 uint32 (little-endian)
+#   face colors: num_faces * 3 uint8 (RGB)
+_view_protocol = "json"
+
+
+def _view_json(title, vertices, faces, face_colors):
+    view_data = {}
+    view_data["title"] = title
+    view_data["color"] = face_colors.tolist()
+    view_data["vertices"] = vertices.tolist()
+    view_data["faces"] = faces.tolist()
+    return [memoryview(json.dumps(view_data).encode())], "application/json"
+
+
+def _view_binary(title, vertices, faces, face_colors):
+    header = json.dumps(
+        {"title": title, "num_vertices": len(vertices), "num_faces": len(faces)}
+    ).encode()
+    chunks = [memoryview(len(header).to_bytes(4, "little")), memoryview(header)]
+    # No copies are made unless the machine is big-endian or a slice isn't contiguous.
+    for a, dtype in (
+        (vertices, "<f4"),
+        (faces, "<u4"),
+        (face_colors, _np.uint8),
+    ):
+        a = _np.ascontiguousarray(a.astype(dtype, copy=False))
+        chunks.append(memoryview(a).cast("B"))
+    return chunks, "application/x-piecad-view"
+
 
 def _view_handler():
-    global _viewer_available, _viewer_started
+    global _viewer_available, _viewer_started, _view_protocol
+    import http.client
+    import subprocess
+
     for i in range(10):
         if _viewer_started:
             break
         try:
             conn = http.client.HTTPConnection(_piecad_viewer, timeout=2)
             content = json.dumps('{"clear":true}')
-            conn.request("POST", "/", content)
+            conn.request("POST", "/", content, {"X-Piecad-View-Protocols": "binary"})
             response = conn.getresponse()
+            if response.getheader("X-Piecad-View-Protocol") == "binary":
+                _view_protocol = "binary"
+            response.read()
             _viewer_started = True
         except TimeoutError:
             process = subprocess.Popen(
@@ -374,11 +555,48 @@ def _view_handler():
         view_data = _view_queue.get()
         if view_data == None:
             break
-        content = json.dumps(view_data)
+        if _view_protocol == "binary":
+            chunks, content_type = _view_binary(*view_data)
+        else:
+            chunks, content_type = _view_json(*view_data)
         view_data = None
-        conn.request("POST", "/", content)
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(sum(len(c) for c in chunks)),
+        }
+        conn.request("POST", "/", chunks, headers)
         response = conn.getresponse()
-        content = None
+        response.read()
+        chunks = None
+
+
+def profile_summary() -> str:
+    """
+    Return a table of the operations recorded while profiling (see `Config.set_profiling`).
+
+    There is one line for each operation and line of your script that called it.
+    It shows the time spent in the operation itself (not counting the operations it called),
+    its total time, the number of calls, and the vertices and triangles that went in and
+    came out. The slowest lines come first.
+    """
+    return _trace.summary()
+
+
+def save_profile_trace(filename: str) -> None:
+    """
+    Save the operations recorded while profiling (see `Config.set_profiling`)
+    as a Chrome trace (JSON) file.
+
+    It can be viewed in [Perfetto](https://ui.perfetto.dev) or Chrome's `chrome://tracing`.
+    """
+    _trace.save_trace(filename)
+
+
+def clear_profile() -> None:
+    """
+    Forget the operations recorded while profiling.
+    """
+    _trace.clear()
 
 
 def winding(lt: list[tuple[float, float]]) -> str:
@@ -404,3 +622,8 @@ def winding(lt: list[tuple[float, float]]) -> str:
             lt[(i + 1) % length][1] + lt[i][1]
         )
     return wstr(winding)
+
+
+_trace.trace_module(
+    globals(), ("winding", "profile_summary", "save_profile_trace", "clear_profile")
+)
@@ -1,3 +1,4 @@
+import math
 import pytest
 import manifold3d as _m
 from piecad import *
@@ -292,3 +293,66 @@ def test_rounded_rectangle_hull_centered(benchmark):
     o = benchmark(_rounded_rectangle_hull, (10, 10), 2.0, 36, True)
     assert o.num_verts() == 40
     assert o.bounding_box() == (-5, -5, 5, 5)
+
+
+def _path(n):
+    p = path((0, 0), 24)
+    for k in range(n):
+        x = k * 1.5
+        p.cubic_bezier_to((x + 0.25, 3), (x + 0.75, 3), (x + 1, 0))
+        p.arc_to(0.25, (x + 1.5, 0))
+    o = p.line_to((n * 1.5, -10)).line_to((0, -10)).close()
+    o.num_verts()
+    return o
+
+
+def test_path(benchmark):
+    o = benchmark(_path, 50)
+    assert o.num_verts() == 1 + 50 * 46 + 2
+
+
+def test_path_curves():
+    import numpy as np
+    from svgpathtools import QuadraticBezier, CubicBezier, Arc
+
+    t = np.linspace(0, 1, 9)
+
+    def pts(seg):
+        return np.array([[p.real, p.imag] for p in (seg.point(x) for x in t)])
+
+    def tail(*calls):
+        p = path((1, 2), 9)
+        for name, args in calls:
+            getattr(p, name)(*args)
+        return np.concatenate(p._subpaths[0])[1:]
+
+    expected = pts(QuadraticBezier(1 + 2j, 5 + 9j, 8 - 1j))
+    assert tail(("quadratic_bezier_to", ((5, 9), (8, -1)))) == pytest.approx(
+        expected[1:]
+    )
+    expected = pts(CubicBezier(1 + 2j, 5 + 9j, -3 + 4j, 8 - 1j))
+    assert tail(("cubic_bezier_to", ((5, 9), (-3, 4), (8, -1)))) == pytest.approx(
+        expected[1:]
+    )
+    for large_arc in (False, True):
+        for ccw in (False, True):
+            expected = pts(Arc(1 + 2j, 6 + 3j, 30, large_arc, ccw, 8 - 1j))
+            got = tail(("arc_to", ((6, 3), (8, -1), 30, large_arc, ccw)))
+            assert got == pytest.approx(expected[1:])
+
+
+def test_path_instances():
+    p1 = path((1, 1)).line_to((5, 1))
+    p2 = path((0, 0)).line_to((2, 0)).line_to((2, 2)).line_to((0, 2))
+    p1.line_to((5, 5))
+    assert p1.close().area() == pytest.approx(8)
+    assert p2.close().area() == pytest.approx(4)
+
+
+def test_path_holes():
+    p = path((0, 0)).line_to((10, 0)).line_to((10, 10)).line_to((0, 10))
+    p.move_to((2, 2)).line_to((2, 4)).line_to((4, 4)).line_to((4, 2))
+    p.move_to((6, 6)).arc_to(2, (6, 6.0001), large_arc=True)
+    o = p.close()
+    assert len(o.to_paths()) == 3
+    assert o.area() == pytest.approx(100 - 4 - math.pi * 4, rel=1e-2)
@@ -1,4 +1,8 @@
+import math
 import pytest
+import manifold3d as _m
+import numpy as _np
+import trimesh
 from piecad import *
 
 
@@ -142,6 +146,33 @@ def test_rounded_cuboid_centered(benchmark):
     assert c.bounding_box() == (-7.5, -5, -18, 7.5, 5, 18)
 
 
+@pytest.mark.parametrize("segments", [12, 30, 36, 37])
+def test_rounded_rectangles(segments):
+    from piecad.primitives_3d import _rounded_rectangles
+
+    pts = _rounded_rectangles([(15, 10), (5, 4)], [3.0, 1.5], segments)
+    for k, (size, r) in enumerate([((15, 10), 3.0), ((5, 4), 1.5)]):
+        expected = rounded_rectangle(size, r, segments).to_paths()[0]
+        assert sorted(map(tuple, _np.round(pts[k], 9))) == sorted(
+            map(tuple, _np.round(expected, 9))
+        )
+
+
+def test_rounded_cuboid_default_segments():
+    c = rounded_cuboid((30, 30, 30), 5)
+    assert c.bounding_box() == (0, 0, 0, 30, 30, 30)
+    # A 20 mm cube grown by 5 mm: faces, quarter cylinder edges and sphere corners.
+    v = 20**3 + 5 * 6 * 20**2 + math.pi * 5**2 * 3 * 20 + 4 / 3 * math.pi * 5**3
+    assert c.volume() == pytest.approx(v, rel=1e-2)
+
+
+def test_rounded_cylinder_poles():
+    c = rounded_cylinder(8, 4, 4.0, 37)
+    mesh = c.mo.to_mesh64()
+    on_axis = _np.hypot(mesh.vert_properties[:, 0], mesh.vert_properties[:, 1]) < 1e-9
+    assert on_axis.sum() == 2
+
+
 def test_rounded_cylinder_100(benchmark):
     c = benchmark(_rounded_cylinder, 25, 10, 4.0, 100, False)
     assert c.num_verts() == 5202
@@ -183,6 +214,48 @@ def test_sphere(benchmark):
     assert c.bounding_box() == (-10, -10, -10, 10, 10, 10)
 
 
+def test_templates():
+    from piecad.primitives_3d import _unit_sphere, _unit_cylinder
+
+    _unit_sphere.cache_clear()
+    s1 = sphere(3, 40)
+    s2 = sphere(7, 40).color("red")
+    assert _unit_sphere.cache_info().hits == 1
+    assert s1.volume() * (7 / 3) ** 3 == pytest.approx(s2.volume())
+    assert s1.mo.original_id() != s2.mo.original_id()
+    assert ellipsoid((1, 2, 3), 40).num_verts() == s1.num_verts()
+    c = cylinder(4, 2, 24, center=True)
+    assert c.bounding_box() == (-2, -2, -2, 2, 2, 2)
+    assert elliptical_cylinder(4, (2, 3), 24).bounding_box() == (-2, -3, 0, 2, 3, 4)
+    assert _unit_cylinder.cache_info().hits >= 1
+    for n in range(3, 3 + _unit_sphere.cache_info().maxsize + 10):
+        _unit_sphere(n)
+    assert _unit_sphere.cache_info().currsize == _unit_sphere.cache_info().maxsize
+
+
+def _balls_and_holes(n, cached):
+    from piecad.primitives_3d import _unit_sphere, _unit_cylinder
+
+    objs = []
+    for i in range(n):
+        if not cached:
+            _unit_sphere.cache_clear()
+            _unit_cylinder.cache_clear()
+        objs.append(sphere(2 + i % 3).translate((i * 10, 0, 0)))
+        objs.append(cylinder(10, 1.5).translate((i * 10, 10, 0)))
+    for o in objs:
+        o.num_verts()
+    return objs
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["build", "template"])
+def test_templates_speed(benchmark, cached):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    objs = benchmark.pedantic(_balls_and_holes, (200, cached), rounds=3)
+    benchmark.extra_info["calls_per_second"] = len(objs) / benchmark.stats["mean"]
+
+
 def test_geodesic_sphere(benchmark):
     c = benchmark(_geodesic_sphere, 10, 360 // 3)
     assert c.num_verts() == 3602
@@ -209,6 +282,100 @@ def test_extrude_chaining_fan(benchmark):
     assert o.num_verts() == 200
 
 
+def test_extrude_chaining_arrays(benchmark):
+    c = circle(10, 100)
+    pts = c.to_paths()[0]
+    l = [(i * 0.25, pts * (1 + i / 200)) for i in range(100)]
+    o = benchmark(_extrude_chaining, l, is_convex=True)
+    assert o.num_verts() == 10000
+    o2 = extrude_chaining([(h, Obj2d(_m.CrossSection([p]))) for h, p in l])
+    assert o.volume() == pytest.approx(o2.volume())
+    assert o.bounding_box() == pytest.approx(o2.bounding_box())
+
+
+def test_extrude_chaining_holes():
+    ring = difference(circle(10, 50), circle(5, 50))
+    o = extrude_chaining([(0, ring), (5, ring), (10, ring)])
+    assert o.num_verts() == 300
+    assert o.volume() == pytest.approx(ring.area() * 10)
+
+
+def test_extrude_chaining_mismatch():
+    with pytest.raises(ValidationError):
+        extrude_chaining([(0, circle(10, 50)), (5, circle(10, 40))])
+    with pytest.raises(ValidationError):
+        extrude_chaining([(0, circle(10, 50)), (5, [(0, 0), (1, 0)])])
+
+
+def _circle_points(r, n):
+    a = _np.linspace(0, 2 * _np.pi, n, endpoint=False)
+    return r * _np.stack([_np.cos(a), _np.sin(a)], axis=1)
+
+
+def test_loft(benchmark):
+    heights = _np.linspace(0, 25, 200)
+    layers = _np.stack([_circle_points(10 - h / 5, 100) for h in heights])
+    o = benchmark(loft, layers, heights, is_convex=True)
+    assert o.num_verts() == 20000
+    o2 = extrude_chaining([(h, l) for h, l in zip(heights, layers)], is_convex=True)
+    assert o.volume() == pytest.approx(o2.volume())
+    o3 = loft(lambda t: _circle_points(10 - 5 * t, 100), heights, is_convex=True)
+    assert o3.volume() == pytest.approx(o.volume())
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_chain_mesh_dtype(closed):
+    from piecad.primitives_3d import _chain_mesh
+
+    # Triangles stay integers, so Mesh64 doesn't have to convert them.
+    layers = _np.stack([_circle_points(5, 16)] * 3)
+    vertices = _np.concatenate([layers, _np.zeros((3, 16, 1))], axis=2)
+    vertices[:, :, 2] = _np.arange(3)[:, None]
+    triangles = _chain_mesh(vertices, layers, [10, 6], False, closed)
+    assert triangles.dtype == _np.uint64
+    assert triangles.max() < 48
+
+
+def test_loft_mismatch():
+    with pytest.raises(ValidationError):
+        loft(_np.zeros((3, 10, 2)), [0, 1])
+
+
+def test_sweep_straight():
+    sq = _np.array([(0, 0), (0, 1), (2, 1), (2, 0)], _np.float64)  # Clockwise
+    o = sweep(sq, [(0, 0, 0), (0, 0, 5)], segments=2)
+    assert o.bounding_box() == pytest.approx((0, 0, 0, 2, 1, 5))
+    assert o.volume() == pytest.approx(10)
+
+
+def test_sweep_closed(benchmark):
+    a = _np.linspace(0, 2 * _np.pi, 12, endpoint=False)
+    ring = 10 * _np.stack([_np.cos(a), _np.sin(a), _np.zeros(12)], axis=1)
+    o = benchmark(sweep, _circle_points(2, 64), ring, closed=True, segments=200)
+    assert o.num_verts() == 200 * 64
+    assert o.mo.genus() == 1
+    assert o.volume() == pytest.approx(2 * _np.pi**2 * 10 * 4, rel=0.01)
+
+
+def test_sweep_repeated_points():
+    sq = _np.array([(0, 0), (1, 0), (1, 1), (0, 1)], _np.float64)
+    with pytest.raises(ValidationError, match="repeated consecutive points"):
+        sweep(sq, [(0, 0, 0), (0, 0, 5), (0, 0, 5), (3, 0, 8)])
+    ring = [(0, 0, 0), (10, 0, 0), (10, 10, 0), (0, 0, 0)]
+    with pytest.raises(ValidationError, match="repeated consecutive points"):
+        sweep(sq, ring, closed=True)
+
+
+def test_sweep_profile_fn():
+    o = sweep(
+        lambda t: _circle_points(4 - 1.5 * _np.sin(_np.pi * t), 32),
+        [(0, 0, 0), (10, 0, 30), (50, 0, 30), (60, 0, 0)],
+        segments=60,
+    )
+    assert o.num_verts() == 60 * 32
+    assert o.mo.genus() == 0
+
+
 import math as _math
 
 
@@ -92,3 +92,477 @@ def test_compose_decompose3d():
     o = compose(*l)
     l2 = o.decompose()
     assert len(l) == len(l2)
+
+
+def _nested_2d():
+    a = union(circle(5), square(4).translate((3, 0)))
+    b = union(a, star(5, 3).translate((-4, 0))).translate((1, 2))
+    holes = union(circle(1), circle(1).translate((3, 0)))
+    return difference(b, holes, circle(0.5).translate((-4, 0)))
+
+
+def test_lazy_evaluation_2d():
+    o1 = _nested_2d()
+    Config.set_lazy_evaluation(True)
+    try:
+        o2 = _nested_2d()
+        # The nested unions are merged into one union of 3, which is the base
+        # of one difference with 3 cutters.
+        assert len(o2._mo.operands[0]._mo._gather()) == 3
+        assert len(o2._mo._gather()) == 4
+    finally:
+        Config.set_lazy_evaluation(False)
+    assert o2.num_verts() == o1.num_verts()
+    assert o2.area() == pytest.approx(o1.area())
+    assert o2.bounding_box() == pytest.approx(o1.bounding_box())
+
+
+def _build_part(i):
+    o = cube(5).minkowski_sum(sphere(1, 24)).translate((i * 10, 0, 0))
+    o.num_verts()
+    return o
+
+
+def _parallel_map(n):
+    return union(*parallel_map(_build_part, range(n)))
+
+
+def test_parallel_map():
+    Config.set_max_workers(2)
+    try:
+        o1 = _parallel_map(4)
+    finally:
+        Config.set_max_workers(None)
+    Config.set_max_workers(1)
+    try:
+        o2 = _parallel_map(4)
+    finally:
+        Config.set_max_workers(None)
+    assert o1.num_verts() == o2.num_verts()
+    assert o1.bounding_box() == pytest.approx(o2.bounding_box())
+    assert o1.volume() == pytest.approx(o2.volume())
+
+
+def test_parallel_map_pickle():
+    import pickle
+
+    o = pickle.loads(pickle.dumps(cube(5).translate((1, 2, 3))))
+    assert o.bounding_box() == pytest.approx((1, 2, 3, 6, 7, 8))
+    c = pickle.loads(pickle.dumps(circle(2).color("red")))
+    assert c._color == (255, 0, 0)
+    assert c.area() == pytest.approx(circle(2).area())
+
+
+def _cylinder_verts(i):
+    return cylinder(5, 2).translate((i * 10, 0, 0)).num_verts()
+
+
+def test_parallel_map_config():
+    # The workers use the settings of the calling process.
+    Config.set_default_segments(8)
+    try:
+        counts = {}
+        for workers in (1, 2):
+            Config.set_max_workers(workers)
+            counts[workers] = parallel_map(_cylinder_verts, range(2))
+    finally:
+        Config.set_default_segments(36)
+        Config.set_max_workers(None)
+    assert counts[1] == counts[2] == [16, 16]
+
+
+def test_star_import_names():
+    # Type hints used by bulk_ops stay out of `from piecad import *`.
+    ns = {}
+    exec("from piecad import *", ns)
+    assert "parallel_map" in ns
+    assert "Callable" not in ns and "Iterable" not in ns
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4, 8, 16])
+def test_parallel_map_workers(benchmark, workers):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    Config.set_max_workers(workers)
+    try:
+        o = benchmark.pedantic(_parallel_map, (16,), rounds=1)
+    finally:
+        Config.set_max_workers(None)
+    assert o.num_verts() > 0
+
+
+def test_linear_array():
+    o = linear_array(cube((2, 1, 1)), 5, (3, 0, 0))
+    assert len(o.decompose()) == 5
+    assert o.bounding_box() == pytest.approx((0, 0, 0, 14, 1, 1))
+    assert o.volume() == pytest.approx(10)
+    o = linear_array(square(1).color("red"), 3, (0, -2))
+    assert o.bounding_box() == pytest.approx((0, -4, 1, 1))
+    assert o._color == (255, 0, 0)
+    # Overlapping copies are unioned.
+    o = linear_array(cube(2), 4, (1, 1, 0))
+    assert len(o.decompose()) == 1
+    assert o.volume() == pytest.approx(4 * 8 - 3 * 2)
+
+
+def test_grid_array():
+    o = grid_array(circle(1, 16), (4, 3), (3, 2.5))
+    assert len(o.decompose()) == 12
+    assert o.area() == pytest.approx(12 * circle(1, 16).area())
+    assert o.bounding_box() == pytest.approx((-1, -1, 10, 6))
+    o = grid_array(cube(1), (2, 3, 4), (2, 2, 2))
+    assert len(o.decompose()) == 24
+    assert o.bounding_box() == pytest.approx((0, 0, 0, 3, 5, 7))
+    with pytest.raises(ValidationError):
+        grid_array(circle(1), (2, 2, 2), (3, 3, 3))
+
+
+def test_polar_array():
+    hole = cylinder(2, 1, 16).translate((10, 0, 0))
+    o = polar_array(hole, 12)
+    assert len(o.decompose()) == 12
+    assert o.volume() == pytest.approx(12 * hole.volume())
+    assert o.bounding_box() == pytest.approx((-11, -11, 0, 11, 11, 2))
+    o = polar_array(square(1).translate((5, 0)), 3, 90)
+    assert o.bounding_box() == pytest.approx((-1, 0, 6, 6))
+    # Copies overlapping at the center are unioned.
+    o = polar_array(cube((4, 1, 1), center=True), 4)
+    assert len(o.decompose()) == 1
+    assert o.volume() == pytest.approx(4 + 4 - 1)
+
+
+def test_overlapping():
+    import numpy as np
+    from piecad.bulk_ops import _overlap_pairs
+
+    rng = np.random.default_rng(1)
+    lo = rng.uniform(0, 100, (300, 3))
+    boxes = np.concatenate([lo, lo + rng.uniform(0.1, 3, (300, 3))], 1)
+    for b in (boxes, boxes[:40], boxes[::25]):
+        n = len(b)
+        d = b.shape[1] // 2
+        brute = any(
+            (b[i, :d] <= b[j, d:]).all() and (b[j, :d] <= b[i, d:]).all()
+            for i in range(n)
+            for j in range(i + 1, n)
+        )
+        assert (len(_overlap_pairs(b)[0]) > 0) == brute
+
+
+def _grid_holes(obj, n, fast):
+    if fast:
+        o = grid_array(obj, (n, n), (1, 1))
+    else:
+        l = []
+        for x in range(n):
+            for y in range(n):
+                l.append(obj.translate((x, y) if type(obj) == Obj2d else (x, y, 0)))
+        o = union(*l)
+    o.num_verts()
+    return o
+
+
+@pytest.mark.parametrize("n", [32, 100])
+@pytest.mark.parametrize("dims", [2, 3])
+@pytest.mark.parametrize("fast", [True, False], ids=["grid_array", "union"])
+def test_grid_array_speed(benchmark, n, dims, fast):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    if not fast and dims == 3 and n == 100:
+        pytest.skip("too slow")
+    obj = circle(0.4, 16) if dims == 2 else cylinder(1, 0.4, 16)
+    obj.num_verts()
+    o = benchmark.pedantic(_grid_holes, (obj, n, fast), rounds=3)
+    assert o.num_verts() == n * n * obj.num_verts()
+
+
+def _counters(name):
+    from piecad import _trace
+
+    return [r.counters for r in _trace._records if r.name == name][-1]
+
+
+def _plate_holes(dims):
+    # A plate with a grid of holes, half of them beside the plate.
+    if dims == 2:
+        plate = square((30, 30))
+        hole = circle(1, 16)
+    else:
+        plate = cube((30, 30, 2))
+        hole = cylinder(4, 1, 16).translate((0, 0, -1))
+    holes = [
+        hole.translate((x * 3 + 1.5, y * 3 + 1.5) + ((0,) if dims == 3 else ()))
+        for x in range(20)
+        for y in range(10)
+    ]
+    return plate, holes
+
+
+@pytest.mark.parametrize("dims", [2, 3])
+def test_difference_culling(dims):
+    import manifold3d as _m
+
+    plate, holes = _plate_holes(dims)
+    # An overlapping pair of cutters, which are not composed.
+    if dims == 2:
+        extra = [square(4).translate((2, 20)), square(4).translate((4, 22))]
+        ref = _m.CrossSection.batch_boolean(
+            [o.mo for o in [plate] + holes + extra], _m.OpType.Subtract
+        )
+    else:
+        extra = [cube(4).translate((2, 20, -1)), cube(4).translate((4, 22, -1))]
+        ref = _m.Manifold.batch_boolean(
+            [o.mo for o in [plate] + holes + extra], _m.OpType.Subtract
+        )
+    clear_profile()
+    Config.set_profiling(True)
+    try:
+        o = difference(plate, *holes, *extra)
+        counters = _counters("difference")
+    finally:
+        Config.set_profiling(False)
+        clear_profile()
+    assert o.num_verts() == ref.num_vert()
+    assert o.bounding_box() == pytest.approx(
+        ref.bounding_box() if dims == 3 else ref.bounds()
+    )
+    if dims == 2:
+        assert o.area() == pytest.approx(ref.area())
+        assert counters == {"culled": 100}
+    else:
+        assert o.volume() == pytest.approx(ref.volume())
+        # The two overlapping cubes also overlap the holes near them.
+        assert counters["culled"] == 100
+        assert 90 <= counters["composed"] < 100
+
+
+def test_difference_culling_touching():
+    o = difference(cube(10), cube(5).translate((10, 0, 0)), sphere(2))
+    assert o.volume() == pytest.approx(1000 - sphere(2).volume() / 8, rel=1e-3)
+    assert difference(cube(10), cube(2).translate((20, 0, 0))).num_verts() == 8
+
+
+def test_intersect_culling():
+    clear_profile()
+    Config.set_profiling(True)
+    try:
+        o = intersect(cube(5), sphere(3), cube(5).translate((5, 0, 0)))
+        counters = _counters("intersect")
+        o2 = intersect(square(5), circle(3).translate((20, 0)))
+    finally:
+        Config.set_profiling(False)
+        clear_profile()
+    assert o.is_empty() and o2.is_empty()
+    assert counters == {"culled": 3}
+    assert intersect(cube(5), sphere(3)).volume() == pytest.approx(
+        sphere(3).volume() / 8, rel=1e-3
+    )
+
+
+def _difference_culled(plate, holes, fast):
+    import manifold3d as _m
+
+    if fast:
+        o = difference(plate, *holes)
+    else:
+        o = Obj3d(
+            _m.Manifold.batch_boolean(
+                [plate.mo] + [h.mo for h in holes], _m.OpType.Subtract
+            )
+        )
+    o.num_verts()
+    return o
+
+
+@pytest.mark.parametrize("fast", [True, False], ids=["culled", "batch_boolean"])
+def test_difference_culling_speed(benchmark, fast):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    plate = cube((100, 100, 2))
+    hole = cylinder(4, 1, 16).translate((0, 0, -1))
+    holes = [
+        hole.translate((x * 3 + 1.5, y * 3 + 1.5, 0))
+        for x in range(66)
+        for y in range(33)
+    ]
+    for h in holes:
+        h.num_verts()
+    o = benchmark.pedantic(_difference_culled, (plate, holes, fast), rounds=3)
+    assert o.num_verts() == 35318
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_union_groups(monkeypatch, seed):
+    import numpy as np
+    import manifold3d as _m
+    from piecad import bulk_ops
+
+    # Small groups, so that the grouping is used for a few dozen objects.
+    monkeypatch.setattr(bulk_ops, "_COMPOSE_GROUP", 8)
+    rng = np.random.default_rng(seed)
+    objs = []
+    for k, p in enumerate(rng.uniform(0, 40, (60, 3))):
+        if k % 3 == 0:
+            o = sphere(rng.uniform(0.5, 3), 16)
+        else:
+            o = cube(tuple(rng.uniform(0.5, 5, 3)))
+        objs.append(o.translate(tuple(p)))
+    objs.append(cube(1).translate((50, 50, 50)))
+    objs.append(cube(1).translate((51, 50, 50)))  # Touching the one before.
+    ref = _m.Manifold.batch_boolean([o.mo for o in objs], _m.OpType.Add)
+    clear_profile()
+    Config.set_profiling(True)
+    try:
+        o = union(*objs)
+        counters = _counters("union")
+    finally:
+        Config.set_profiling(False)
+        clear_profile()
+    assert counters["groups"] > 1
+    assert o.num_verts() == ref.num_vert()
+    assert o.volume() == pytest.approx(ref.volume())
+    v1 = np.array(o.mo.to_mesh64().vert_properties)
+    v2 = np.array(ref.to_mesh64().vert_properties)
+    assert (np.unique(v1, axis=0) == np.unique(v2, axis=0)).all()
+
+
+def test_components():
+    import numpy as np
+    from piecad.bulk_ops import _components
+
+    labels = _components(7, np.array([0, 5, 3, 6]), np.array([5, 2, 4, 4]))
+    assert labels.tolist() == [0, 1, 0, 3, 3, 0, 3]
+
+
+def _union_many(n, fast):
+    import manifold3d as _m
+
+    holes = [
+        cylinder(2, 0.4, 16).translate((x, y, 0))
+        for x in range(100)
+        for y in range(n // 100)
+    ]
+    if fast:
+        o = union(*holes)
+    else:
+        o = Obj3d(_m.Manifold.batch_boolean([h.mo for h in holes], _m.OpType.Add))
+    o.num_verts()
+    return o
+
+
+@pytest.mark.parametrize("n", [1000, 10000])
+@pytest.mark.parametrize("fast", [True, False], ids=["union", "batch_boolean"])
+def test_union_many_speed(benchmark, n, fast):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = benchmark.pedantic(_union_many, (n, fast), rounds=3)
+    assert o.num_verts() == n * 32
+
+
+@pytest.mark.parametrize("op", ["union", "difference", "intersect"])
+def test_tiled(op):
+    plate, holes = _plate_holes(3)
+    if op == "intersect":
+        objs = [plate, sphere(20, 96).translate((15, 15, 0))]
+    else:
+        objs = [plate] + holes
+    f = {"union": union, "difference": difference, "intersect": intersect}[op]
+    ref = f(*objs)
+    clear_profile()
+    Config.set_profiling(True)
+    Config.set_boolean_memory_limit(0.5)
+    try:
+        o = f(*objs)
+        counters = _counters(op)
+    finally:
+        Config.set_boolean_memory_limit(None)
+        Config.set_profiling(False)
+        clear_profile()
+    assert counters["cells"] > 1
+    assert o.volume() == pytest.approx(ref.volume())
+    assert o.bounding_box() == pytest.approx(ref.bounding_box())
+    assert o.mo.genus() == ref.mo.genus()
+    assert len(o.mo.decompose()) == len(ref.mo.decompose())
+
+
+def test_tiled_small():
+    # Operations under the limit are done in one piece.
+    clear_profile()
+    Config.set_profiling(True)
+    Config.set_boolean_memory_limit(100)
+    try:
+        difference(cube(10), sphere(3, 48))
+        counters = _counters("difference")
+    finally:
+        Config.set_boolean_memory_limit(None)
+        Config.set_profiling(False)
+        clear_profile()
+    assert "cells" not in (counters or {})
+    with pytest.raises(ValidationError):
+        Config.set_boolean_memory_limit(0)
+
+
+def _tiled(objs, limit):
+    Config.set_boolean_memory_limit(limit)
+    try:
+        o = difference(*objs)
+        o.num_verts()
+    finally:
+        Config.set_boolean_memory_limit(None)
+    return o
+
+
+@pytest.mark.parametrize("model", ["plate", "lithophane"])
+@pytest.mark.parametrize("limit", [None, 10], ids=["single", "tiled"])
+def test_tiled_speed(benchmark, model, limit):
+    import os
+    import numpy as np
+
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    if model == "plate":
+        # Over 6000 holes in one face.
+        base = cube((121, 121, 2))
+        hole, start, step = cylinder(4, 0.4, 16), 1, 1.5
+    else:
+        path = os.path.join(os.path.dirname(__file__), "..", "examples")
+        base = lithophane(os.path.join(path, "moon_lithophane.jpg"), width_mm=150)
+        hole, start, step = cylinder(10, 1, 16), 4, 5
+    x1, y1 = base.bounding_box()[3:5]
+    holes = [
+        hole.translate((x, y, -1))
+        for x in np.arange(start, x1 - start, step)
+        for y in np.arange(start, y1 - start, step)
+    ]
+    for o in [base] + holes:
+        o.num_verts()
+    o = benchmark.pedantic(_tiled, ([base] + holes, limit), rounds=1)
+    benchmark.extra_info["holes"] = len(holes)
+    assert o.mo.genus() == len(holes)
+
+
+def test_tiled_without_main():
+    import os
+    import subprocess
+    import sys
+
+    # A script read from standard input can't be loaded again by worker processes,
+    # so the cells are computed in the calling process.
+    code = (
+        "from piecad import *\n"
+        "Config.set_max_workers(2)\n"
+        "Config.set_boolean_memory_limit(0.01)\n"
+        "o = difference(cube((30, 30, 2)), *[cylinder(4, 1, 16).translate((x * 3 + 1.5, 5, -1)) for x in range(10)])\n"
+        "print(o.mo.genus())\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-"],
+        input=code,
+        cwd=root,
+        env=dict(os.environ, PYTHONPATH=root),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "10"
@@ -0,0 +1,96 @@
+import os
+import pytest
+from piecad import *
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    Config.set_cache_dir(str(tmp_path))
+    yield tmp_path
+    Config.set_cache_dir(None)
+    Config.set_cache_max_size(1024)
+
+
+def test_cache_reuse(cache_dir):
+    o1 = rounded_cuboid((30, 20, 10), 3, 64)
+    assert len(os.listdir(cache_dir)) == 1
+    o2 = rounded_cuboid((30, 20, 10), 3, 64)
+    assert len(os.listdir(cache_dir)) == 1
+    assert o2.num_verts() == o1.num_verts()
+    assert o2.volume() == pytest.approx(o1.volume())
+    assert o2.bounding_box() == o1.bounding_box()
+
+
+def test_cache_2d(cache_dir):
+    t1 = text(6, "Piecad")
+    t2 = text(6, "Piecad")
+    # The label, and the font's glyph outlines.
+    assert len(os.listdir(cache_dir)) == 2
+    assert t2.num_verts() == t1.num_verts()
+    assert t2.area() == pytest.approx(t1.area())
+
+
+def test_cache_key_includes_inputs_and_config(cache_dir):
+    s = sphere(1, 12)
+    a = cube(5).minkowski_sum(s)
+    b = cube(6).minkowski_sum(s)
+    assert a.volume() != pytest.approx(b.volume())
+    Config.set_default_segments(40)
+    try:
+        rounded_cylinder(10, 5)
+    finally:
+        Config.set_default_segments(36)
+    rounded_cylinder(10, 5)
+    assert len(os.listdir(cache_dir)) == 4
+
+
+def test_cache_eviction(cache_dir):
+    rounded_cuboid((30, 20, 10), 3, 64)
+    size = os.path.getsize(next(cache_dir.iterdir()))
+    Config.set_cache_max_size(1.5 * size / (1024 * 1024))
+    rounded_cuboid((31, 20, 10), 3, 64)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_cache_off():
+    assert Config.get_cache_dir() == None
+    o = rounded_cuboid((30, 20, 10), 3, 64)
+    assert getattr(o, "_cache_key", None) == None
+
+
+def test_cache_text_font(cache_dir):
+    roboto = text(6, "Piecad")
+    text_set_font("Hack-Regular.ttf")
+    try:
+        hack = text(6, "Piecad")
+    finally:
+        text_set_font("Roboto-Regular.ttf")
+    assert hack.num_verts() != roboto.num_verts()
+    assert text(6, "Piecad").num_verts() == roboto.num_verts()
+
+
+def test_cache_colors(cache_dir):
+    from piecad import _cache
+    from piecad._color import _face_color_palette
+
+    def colored(c):
+        return cube(5).color(c)
+
+    def colors(o):
+        palette, face_idx = _face_color_palette(
+            o.mo.to_mesh(), Obj3d.color_map, Config.get_default_color()
+        )
+        return {tuple(int(v) for v in palette[i]) for i in face_idx}
+
+    # A colored result is not stored, so a second call comes back colored too.
+    o1 = _cache.cached("colored", colored, "red")
+    o2 = _cache.cached("colored", colored, "red")
+    assert colors(o1) == colors(o2) == {(255, 0, 0)}
+    assert len(os.listdir(cache_dir)) == 0
+
+    # Inputs that differ only by color have different keys.
+    s = sphere(1, 12)
+    c = cube(5)
+    c.minkowski_sum(s)
+    c.color("blue").minkowski_sum(s)
+    assert len(os.listdir(cache_dir)) == 2
@@ -53,3 +53,16 @@ def test_color_method_2d():
 def test_color_method_3d():
     c = cylinder(1, 1).color("red")
     assert Obj3d.color_map[c.mo.original_id()] == (255, 0, 0)
+
+
+def test_face_color_palette():
+    from piecad._color import _face_color_palette
+
+    red = cube(5).color("red")
+    blue = cube(5).color("blue").translate((10, 0, 0))
+    o = compose(red, blue, cube(5).translate((20, 0, 0)))
+    mesh = o.mo.to_mesh64()
+    palette, face_idx = _face_color_palette(mesh, Obj3d.color_map, (1, 2, 3))
+    assert palette.tolist() == [[1, 2, 3], [255, 0, 0], [0, 0, 255]]
+    assert len(face_idx) == o.num_faces() == 36
+    assert sorted(face_idx.tolist()) == [0] * 12 + [1] * 12 + [2] * 12
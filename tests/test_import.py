@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# Seconds allowed for `import piecad` in a fresh interpreter.
+# (About 0.15 on a typical machine, most of it numpy and manifold3d.)
+IMPORT_BUDGET = 1.0
+
+# Slow modules that must only be loaded when they are used.
+LAZY_MODULES = [
+    "trimesh",
+    "fontTools",
+    "fontPens",
+    "svgpathtools",
+    "PIL",
+    "lib3mf",
+    "scipy",
+    "http.client",
+    "subprocess",
+    "piecad._text",
+    "piecad._path",
+    "piecad._lithophane",
+    "piecad._export_3mf",
+    "piecad._export_binary",
+    "piecad._import_binary",
+]
+
+
+def _run(code):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return out.stdout
+
+
+def _import_time(module="piecad"):
+    code = f"import time\nt = time.perf_counter()\nimport {module}\nprint(time.perf_counter() - t)"
+    return float(_run(code))
+
+
+def test_import_lazy_modules():
+    code = f"import sys, piecad, piecad.projectbox\nprint([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    assert _run(code).strip() == "[]"
+
+
+def test_import_budget():
+    assert min(_import_time() for _ in range(3)) < IMPORT_BUDGET
+
+
+def test_import_time(benchmark):
+    t = benchmark.pedantic(_import_time, rounds=5)
+    assert t < IMPORT_BUDGET
+
+
+def test_import_time_projectbox(benchmark):
+    t = benchmark.pedantic(_import_time, ("piecad.projectbox",), rounds=5)
+    assert t < IMPORT_BUDGET
@@ -0,0 +1,104 @@
+import pytest
+import manifold3d as _m
+import numpy as _np
+import trimesh
+from piecad import *
+from piecad import _lithophane
+
+
+def _create_lithophane(hm):
+    o = _lithophane.create_lithophane(hm, 0.5, 0.8, 3.0)
+    o.num_verts()
+    return o
+
+
+# The per-pixel implementation that create_lithophane replaced, kept for comparison.
+def _create_lithophane_loop(hm, pixel_size=0.5, min_thickness=0.8, max_thickness=3.0):
+    rows, cols = hm.shape
+    vertices = []
+    lookup = {}
+    faces = []
+
+    def add_vertex(v):
+        key = tuple(_np.round(v, 5))
+        if key not in lookup:
+            lookup[key] = len(vertices)
+            vertices.append(v)
+        return lookup[key]
+
+    top = _np.zeros((rows, cols), dtype=int)
+    bottom = _np.zeros((rows, cols), dtype=int)
+    for y in range(rows):
+        for x in range(cols):
+            z = min_thickness + hm[y, x] * (max_thickness - min_thickness)
+            top[y, x] = add_vertex((x * pixel_size, (rows - 1 - y) * pixel_size, z))
+            bottom[y, x] = add_vertex((x * pixel_size, (rows - 1 - y) * pixel_size, 0))
+
+    def quad(t1, t2, b1, b2):
+        faces.append((t1, b1, t2))
+        faces.append((t2, b1, b2))
+
+    for y in range(rows - 1):
+        for x in range(cols - 1):
+            a, b, c, d = top[y, x], top[y, x + 1], top[y + 1, x], top[y + 1, x + 1]
+            faces.append((a, c, b))
+            faces.append((b, c, d))
+            a, b = bottom[y, x], bottom[y + 1, x]
+            c, d = bottom[y, x + 1], bottom[y + 1, x + 1]
+            faces.append((a, b, c))
+            faces.append((c, b, d))
+    for y in range(rows - 1):
+        quad(top[y, 0], top[y + 1, 0], bottom[y, 0], bottom[y + 1, 0])
+        quad(top[y + 1, -1], top[y, -1], bottom[y + 1, -1], bottom[y, -1])
+    for x in range(cols - 1):
+        quad(top[0, x + 1], top[0, x], bottom[0, x + 1], bottom[0, x])
+        quad(top[-1, x], top[-1, x + 1], bottom[-1, x], bottom[-1, x + 1])
+
+    vertices = _np.array(vertices, _np.float64)
+    faces = _np.array(faces, _np.int64)
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False, validate=True)
+    vertices = _np.array(mesh.vertices, _np.float32)
+    faces = _np.array(mesh.faces, _np.uint32)
+    o = Obj3d(_m.Manifold(_m.Mesh(vertices, faces)))
+    o.num_verts()
+    return o
+
+
+def _heightmap(rows, cols):
+    return _np.random.default_rng(1).random((rows, cols))
+
+
+def test_lithophane_matches_loop():
+    hm = _heightmap(30, 45)
+    o1 = _create_lithophane(hm)
+    o2 = _create_lithophane_loop(hm)
+    assert o1.num_verts() == o2.num_verts() == 2 * 30 * 45
+    assert o1.num_faces() == o2.num_faces()
+    assert o1.bounding_box() == o2.bounding_box()
+    assert o1.volume() == pytest.approx(o2.volume())
+
+
+def test_lithophane_300(benchmark):
+    o = benchmark(_create_lithophane, _heightmap(300, 300))
+    assert o.num_verts() == 180000
+    assert o.bounding_box()[3:5] == pytest.approx((149.5, 149.5))
+
+
+def test_lithophane_1000(benchmark):
+    o = benchmark.pedantic(_create_lithophane, (_heightmap(1000, 1000),), rounds=1)
+    assert o.num_verts() == 2000000
+
+
+# The per-pixel versions take minutes, so they only run when benchmarking.
+def test_lithophane_loop_300(benchmark):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = benchmark.pedantic(_create_lithophane_loop, (_heightmap(300, 300),), rounds=1)
+    assert o.num_verts() == 180000
+
+
+def test_lithophane_loop_1000(benchmark):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = benchmark.pedantic(_create_lithophane_loop, (_heightmap(1000, 1000),), rounds=1)
+    assert o.num_verts() == 2000000
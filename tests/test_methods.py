@@ -23,6 +23,86 @@ def test_set_default_segments():
     Config.set_default_segments(36)
 
 
+def test_chord_tolerance():
+    import math
+
+    assert Config.get_chord_tolerance() == None
+    assert Config.get_segments(100) == 36
+    Config.set_chord_tolerance(0.1)
+    try:
+        assert Config.get_segments(0.05) == 8
+        assert Config.get_segments(1.5) == 12
+        assert Config.get_segments(100) == 72
+        assert Config.get_segments(1000) == 120
+        for r in (0.8, 2, 7.3, 50, 250):
+            n = Config.get_segments(r)
+            assert n % 4 == 0
+            assert r * (1 - math.cos(math.pi / n)) <= 0.1 or n == 120
+        assert circle(1.5).num_verts() == 12
+        assert circle(1.5, 36).num_verts() == 36
+        assert cylinder(10, 100).num_verts() == 144
+        assert sphere(2).num_verts() < sphere(2, 36).num_verts()
+        rounded = square(4).offset(3, "round")
+        assert (
+            rounded.num_verts() < square(4).offset(3, "round", segments=36).num_verts()
+        )
+        Config.set_min_facet_angle(10)
+        assert Config.get_segments(1000) == 36
+        with pytest.raises(ValidationError):
+            Config.set_chord_tolerance(0)
+    finally:
+        Config.set_chord_tolerance(None)
+        Config.set_min_facet_angle(3.0)
+    assert circle(1.5).num_verts() == 36
+
+
+def test_chord_tolerance_path():
+    import numpy as np
+
+    def deviation(o, r):
+        pts = np.array(o.to_paths()[0])
+        mid = (pts + np.roll(pts, 1, axis=0)) / 2
+        assert (np.abs(np.hypot(*pts.T) - r) < 1e-6).all()
+        return (r - np.hypot(*mid.T)).max(), len(pts)
+
+    Config.set_chord_tolerance(0.05)
+    try:
+        o = path((10, 0)).arc_to(10, (-10, 0), ccw=True).arc_to(10, (10, 0), ccw=True)
+        d, n = deviation(o.close(), 10)
+        assert d <= 0.05
+        assert n == Config.get_segments(10)
+        p = path((0, 0)).cubic_bezier_to((0, 10), (10, 10), (10, 0))
+        few = len(p.close().to_paths()[0])
+        p = path((0, 0)).cubic_bezier_to((0, 100), (100, 100), (100, 0))
+        assert len(p.close().to_paths()[0]) > few
+    finally:
+        Config.set_chord_tolerance(None)
+
+
+def _holes(tolerance):
+    Config.set_chord_tolerance(tolerance)
+    try:
+        plate = rounded_cuboid((200, 150, 5), 2, 24)
+        holes = [
+            cylinder(7, 1.5).translate((10 + 12 * i, 10 + 12 * j, -1))
+            for i in range(15)
+            for j in range(10)
+        ]
+        o = difference(plate, cylinder(7, 60).translate((100, 75, -1)), *holes)
+        o.num_verts()
+    finally:
+        Config.set_chord_tolerance(None)
+    return o
+
+
+@pytest.mark.parametrize("tolerance", [None, 0.1])
+def test_chord_tolerance_difference(benchmark, tolerance):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = benchmark.pedantic(_holes, (tolerance,), rounds=3)
+    benchmark.extra_info["triangles"] = o.num_faces()
+
+
 def test_bounding_box_2d():
     c = circle(3)
     assert c.bounding_box() == (-3, -3, 3, 3)
@@ -0,0 +1,83 @@
+import json
+import pytest
+from piecad import *
+
+
+@pytest.fixture
+def profiling():
+    clear_profile()
+    Config.set_profiling(True)
+    yield
+    Config.set_profiling(False)
+    clear_profile()
+
+
+def _records():
+    from piecad import _trace
+
+    return {r.name: r for r in _trace._records}
+
+
+def test_profile_off():
+    from piecad import _trace
+
+    clear_profile()
+    cube(5).translate((1, 0, 0))
+    assert len(_trace._records) == 0
+
+
+def test_profile_records(profiling):
+    o = difference(cube(10), sphere(3, 24))
+    rounded_rectangle((20, 10), 2, 16)
+    r = _records()
+    assert r["difference"].in_verts == 8 + sphere(3, 24).num_verts()
+    assert r["difference"].out_verts == o.num_verts()
+    assert r["difference"].out_tris == o.num_faces()
+    assert r["difference"].location.startswith("test_profile.py:")
+    # Nested operations are subtracted from the caller's self time.
+    rr = r["rounded_rectangle"]
+    assert rr.child_time > 0
+    assert rr.child_time <= rr.duration
+    assert r["circle"].location == rr.location
+
+
+def test_profile_summary_and_trace(profiling, tmp_path):
+    union(cube(5), cube(5).translate((2, 0, 0)))
+    lines = profile_summary().splitlines()
+    assert lines[0].split()[:2] == ["self", "ms"]
+    assert any(" union @ test_profile.py:" in l for l in lines[2:])
+    fname = str(tmp_path / "trace.json")
+    save_profile_trace(fname)
+    with open(fname) as f:
+        events = json.load(f)["traceEvents"]
+    names = [e["name"] for e in events]
+    assert "union" in names and "Obj3d.translate" in names
+    for e in events:
+        assert e["ph"] == "X" and e["dur"] >= 0
+
+
+def test_profile_threads(profiling):
+    import threading
+    from piecad import _trace
+
+    # Operations in another thread are not nested in this thread's operation.
+    started, done = threading.Event(), threading.Event()
+
+    def wait():
+        started.set()
+        done.wait(10)
+
+    def other():
+        started.wait(10)
+        for _ in range(3):
+            cube(1).translate((1, 0, 0))
+        done.set()
+
+    t = threading.Thread(target=other)
+    t.start()
+    _trace.traced("wait", wait)()
+    t.join()
+    r = _records()
+    assert r["wait"].child_time == 0
+    assert r["wait"].tid != r["cube"].tid
+    assert len(_trace._records) == 7
@@ -9,5 +9,36 @@ def test_projectbox():
     assert left.num_verts() == right.num_verts()
     assert front.num_verts() == back.num_verts()
     assert top.num_verts() != bottom.num_verts()
-    assert top.num_verts() == 1103
+    assert top.num_verts() == 1099
     assert bottom.num_verts() == 512
+
+
+def test_projectbox_shared_walls():
+    pb = ProjectBox([60, 30, 20])
+    left, right, front, back, top, bottom = pb.finish()
+    assert left is right and front is back
+    pb.right(10, 5, None, cylinder(4, 2).translate([0, 0, -3]))
+    left, right, front, back, top, bottom = pb.finish(parallel=True)
+    assert left is not right and front is back
+    assert right.volume() < left.volume()
+
+
+def _projectbox():
+    walls = ProjectBox([100, 40, 20]).finish()
+    for o in walls:
+        o.num_verts()
+    return walls
+
+
+def test_projectbox_speed(benchmark):
+    walls = benchmark.pedantic(_projectbox, rounds=5)
+    assert walls[4].num_verts() == 1099
+
+
+def test_projectbox_corner_offset():
+    import piecad.projectbox
+
+    names = {}
+    exec("from piecad.projectbox import *", names)
+    assert names["project_box_corner_offset"] == ProjectBox([20, 20, 20]).corner_offset
+    assert "project_box_corner_offset" in vars(piecad.projectbox)
@@ -1,3 +1,4 @@
+import os
 import pytest
 from piecad import *
 
@@ -11,6 +12,45 @@ def test_text():
     assert o.num_verts() == 20551
 
 
+def test_text_list():
+    labels = text(6, ["Label 1", "Label 2", "Label 10"])
+    assert len(labels) == 3
+    for s, o in zip(["Label 1", "Label 2", "Label 10"], labels):
+        assert o.num_verts() == text(6, s).num_verts()
+        assert o.area() == pytest.approx(text(6, s).area())
+
+
+def test_text_glyph_cache_font():
+    from piecad import _text
+
+    o1 = text(6, "Mg")
+    text_set_font("Hack-Regular.ttf")
+    try:
+        o2 = text(6, "Mg")
+    finally:
+        text_set_font("Roboto-Regular.ttf")
+    assert o1.bounding_box() != pytest.approx(o2.bounding_box())
+    assert len(_text._glyphs) >= 2
+
+
+def test_text_glyph_cache_disk(tmp_path):
+    from piecad import _text
+
+    Config.set_cache_dir(str(tmp_path))
+    try:
+        o1 = text(6, "Disk cache")
+        assert os.path.exists(_text._glyph_file(_text.font_name()))
+        _text._glyphs.clear()
+        table = _text._load_glyphs(_text.font_name())
+        assert set(ord(c) for c in "Disk cache") <= set(table)
+        _text._glyphs[_text.font_name()] = table
+        o2 = _text.text_func(6, "Disk cache")
+    finally:
+        Config.set_cache_dir(None)
+    assert o2.num_verts() == o1.num_verts()
+    assert o2.area() == pytest.approx(o1.area())
+
+
 if __name__ == "__main__":
     test_text = "012-ABCQ.abcg {/:;|}"
     sizes = [3, 4, 5, 6, 8, 10]
@@ -46,3 +86,28 @@ if __name__ == "__main__":
 
     gen_test_output("hack", "Hack-Regular.ttf")
     gen_test_output("robo", "Roboto-Regular.ttf")
+
+
+def test_text_overlapping_glyphs(monkeypatch):
+    import manifold3d as _m
+    from piecad import _text
+
+    # Glyphs pulled into each other are unioned, not just put together.
+    def compose(l):
+        raise AssertionError("compose used on overlapping glyphs")
+
+    size = 10
+    with monkeypatch.context() as mp:
+        mp.setattr(_m.CrossSection, "compose", staticmethod(compose))
+        o = _text.text_func(size, "AVAV", inter_char_space=-700)
+    glyphs = []
+    pos = 0
+    for c in "AVAV":
+        cs, width, max_y = _text._get_glyph(c)
+        glyphs.append(cs.translate((pos, 0)))
+        pos += width - 700
+    f = size / max_y
+    ref = _m.CrossSection.batch_boolean(glyphs, _m.OpType.Add).scale((f, f))
+    assert o.area() == pytest.approx(ref.area())
+    assert o.area() < sum(g.area() for g in glyphs) * f * f
+    assert o.num_verts() == ref.num_vert()
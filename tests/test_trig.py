@@ -157,3 +157,13 @@ def test_special_values():
     assert tan(225) == 1
     assert tan(315) == -1
     assert tan(360) == 0
+
+
+def test_cos_sin_array():
+    from piecad.trigonometry import _cos_sin
+
+    angles = [a * 7.5 for a in range(-48, 97)]
+    c, s = _cos_sin(angles)
+    assert c.tolist() == [cos(a) for a in angles]
+    assert s.tolist() == pytest.approx([sin(a) for a in angles], abs=1e-15)
+    assert s[angles.index(90)] == 1 and c[angles.index(-90)] == 0
@@ -0,0 +1,354 @@
+import os
+import pytest
+import manifold3d as _m
+import numpy as _np
+import trimesh
+from piecad import *
+
+
+def test_save_3mf(tmp_path):
+    fname = str(tmp_path / "one.3mf")
+    o = union(cube(5).color("red"), sphere(3).translate((5, 5, 5)))
+    save(fname, o)
+    m = trimesh.load(fname, force="mesh")
+    assert len(m.faces) == o.num_faces()
+    assert m.is_watertight
+
+
+def test_save_3mf_public_api(monkeypatch, tmp_path):
+    from piecad import _export_3mf
+
+    # Without lib3mf's internal C entry points, its public methods are used.
+    o = union(cube(5).color("red"), sphere(3).translate((5, 5, 5)))
+    fast = str(tmp_path / "fast.3mf")
+    public = str(tmp_path / "public.3mf")
+    save(fast, o)
+    monkeypatch.setattr(_export_3mf, "_native", lambda mesh, function: None)
+    save(public, o)
+    m1, m2 = trimesh.load(fast, force="mesh"), trimesh.load(public, force="mesh")
+    assert (m1.faces == m2.faces).all() and (m1.vertices == m2.vertices).all()
+    assert (m1.visual.face_colors == m2.visual.face_colors).all()
+
+
+def test_save_3mf_multiple(tmp_path):
+    fname = str(tmp_path / "two.3mf")
+    o1 = cube(5).color("red")
+    o2 = cylinder(4, 2).color("blue").translate((20, 0, 0))
+    save(fname, o1, o2)
+    scene = trimesh.load(fname)
+    assert len(scene.geometry) == 2
+    counts = sorted(len(g.faces) for g in scene.geometry.values())
+    assert counts == sorted([o1.num_faces(), o2.num_faces()])
+
+
+def _read_stl(fname):
+    import numpy as np
+
+    with open(fname, "rb") as f:
+        data = f.read()
+    dt = np.dtype([("n", "<f4", 3), ("v", "<f4", (3, 3)), ("a", "<u2")])
+    assert int.from_bytes(data[80:84], "little") * dt.itemsize == len(data) - 84
+    return np.frombuffer(data, dt, offset=84)
+
+
+@pytest.mark.parametrize("ext", ["stl", "ply"])
+def test_save_binary_matches_trimesh(tmp_path, ext):
+    from piecad.utilities import _face_colors
+
+    o = union(sphere(10, 48).color("red"), cube(8).translate((5, 5, 5)))
+    native = str(tmp_path / f"native.{ext}")
+    reference = str(tmp_path / f"reference.{ext}")
+    save(native, o)
+    mesh = o.mo.to_mesh64()
+    t = trimesh.Trimesh(
+        vertices=mesh.vert_properties[:, :3],
+        faces=mesh.tri_verts,
+        face_colors=_face_colors(o, mesh),
+        process=False,
+        validate=False,
+    )
+    trimesh.exchange.export.export_mesh(t, reference, ext)
+    if ext == "stl":
+        r1, r2 = _read_stl(native), _read_stl(reference)
+        assert (r1["v"] == r2["v"]).all()
+        assert r1["n"] == pytest.approx(r2["n"], abs=1e-6)
+    else:
+        with open(native, "rb") as f1, open(reference, "rb") as f2:
+            d1, d2 = f1.read(), f2.read()
+        assert d1[d1.index(b"end_header") :] == d2[d2.index(b"end_header") :]
+    m = trimesh.load(native, process=False)
+    assert len(m.faces) == o.num_faces()
+    save(str(tmp_path / f"checked.{ext}"), o, validate=True)
+
+
+def test_save_binary_multiple(tmp_path):
+    fname = str(tmp_path / "two.ply")
+    save(fname, cube(1).color("red"), cube(1).translate((3, 0, 0)))
+    m = trimesh.load(fname)
+    assert len(m.vertices) == 16
+    assert m.bounds.tolist() == [[0, 0, 0], [4, 1, 1]]
+    assert m.visual.face_colors[0].tolist() == [255, 0, 0, 255]
+
+
+@pytest.mark.parametrize(
+    "ext, validate, checked",
+    [
+        ("obj", None, True),
+        ("glb", None, True),
+        ("obj", False, False),
+        ("stl", None, False),
+        ("stl", True, True),
+    ],
+)
+def test_save_validate_default(monkeypatch, tmp_path, ext, validate, checked):
+    from piecad import utilities
+
+    # Files written by trimesh are checked unless asked not to; binary STL and PLY aren't.
+    calls = []
+    trimesh_mesh = utilities._trimesh
+
+    def spy(obj, mesh, validate):
+        calls.append(validate)
+        return trimesh_mesh(obj, mesh, validate)
+
+    monkeypatch.setattr(utilities, "_trimesh", spy)
+    save(str(tmp_path / f"o.{ext}"), cube(2), validate=validate)
+    assert calls == ([True] if checked else [] if ext == "stl" else [False])
+
+
+def _save_peak(fname, o, validate):
+    import tracemalloc
+
+    tracemalloc.start()
+    save(fname, o, validate=validate)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+@pytest.mark.parametrize("ext", ["stl", "ply"])
+@pytest.mark.parametrize("validate", [False, True], ids=["native", "trimesh"])
+def test_save_binary_large(benchmark, tmp_path, ext, validate):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = sphere(50, 1000)
+    o.num_verts()
+    fname = str(tmp_path / f"large.{ext}")
+    peak = benchmark.pedantic(_save_peak, (fname, o, validate), rounds=3)
+    benchmark.extra_info["peak_mb"] = peak / 1e6
+    assert os.path.getsize(fname) > 0
+
+
+@pytest.mark.parametrize("ext", ["stl", "ply"])
+def test_load_binary(tmp_path, ext):
+    fname = str(tmp_path / f"o.{ext}")
+    o = difference(cube(10), sphere(4, 48).translate((5, 5, 5)))
+    save(fname, o)
+    o2 = load(fname)
+    assert o2.num_verts() == o.num_verts()
+    assert o2.num_faces() == o.num_faces()
+    assert o2.volume() == pytest.approx(o.volume())
+    assert o2.bounding_box() == pytest.approx(o.bounding_box())
+
+
+def test_load_ascii_stl(tmp_path):
+    fname = str(tmp_path / "ascii.stl")
+    o = cylinder(10, 3, 24)
+    mesh = o.mo.to_mesh64()
+    t = trimesh.Trimesh(mesh.vert_properties, mesh.tri_verts, process=False)
+    with open(fname, "w") as f:
+        f.write(trimesh.exchange.stl.export_stl_ascii(t))
+    o2 = load(fname)
+    assert o2.volume() == pytest.approx(o.volume())
+
+
+def test_weld():
+    import numpy as np
+    from piecad._import_binary import weld
+
+    corners = np.array(
+        [(0, 0, 0), (1, 0, 0), (-0.0, 0, 0), (1, 0, 0), (0, 1, 2)], np.float32
+    )
+    vertices, index = weld(corners)
+    assert len(vertices) == 3
+    assert (vertices[index] == corners).all()
+    assert index[0] == index[2] and index[1] == index[3]
+
+
+def _load(fname, fast):
+    if fast:
+        o = load(fname)
+    else:
+        # The trimesh path, which load used for every format.
+        ext = fname[fname.rindex(".") + 1 :]
+        m = trimesh.exchange.load.load(fname, ext, force="mesh", validate=True)
+        vertices = _np.array(m.vertices, _np.float64)
+        faces = _np.array(m.faces, _np.uint64)
+        o = Obj3d(_m.Manifold(_m.Mesh64(vertices, faces)))
+    o.num_verts()
+    return o
+
+
+@pytest.mark.parametrize("ext", ["stl", "ply"])
+@pytest.mark.parametrize("fast", [True, False], ids=["native", "trimesh"])
+def test_load_binary_large(benchmark, tmp_path, ext, fast):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    fname = str(tmp_path / f"large.{ext}")
+    save(fname, sphere(50, 1000))
+    o = benchmark.pedantic(_load, (fname, fast), rounds=1)
+    assert o.num_verts() == 999002
+
+
+def test_view_binary_encoding():
+    import json
+    import numpy as np
+    from piecad.utilities import _face_colors, _view_binary
+
+    o = union(cube(5).color("red"), sphere(3).translate((5, 5, 5)))
+    mesh = o.mo.to_mesh()
+    fc = _face_colors(o, mesh)
+    chunks, content_type = _view_binary("t", mesh.vert_properties, mesh.tri_verts, fc)
+    assert content_type == "application/x-piecad-view"
+    data = b"".join(chunks)
+    hlen = int.from_bytes(data[:4], "little")
+    header = json.loads(data[4 : 4 + hlen])
+    assert header == {
+        "title": "t",
+        "num_vertices": o.num_verts(),
+        "num_faces": o.num_faces(),
+    }
+    off = 4 + hlen
+    nv, nf = header["num_vertices"], header["num_faces"]
+    v = np.frombuffer(data, "<f4", nv * 3, off).reshape(-1, 3)
+    off += v.nbytes
+    f = np.frombuffer(data, "<u4", nf * 3, off).reshape(-1, 3)
+    off += f.nbytes
+    c = np.frombuffer(data, np.uint8, nf * 3, off).reshape(-1, 3)
+    off += c.nbytes
+    assert off == len(data)
+    assert (v == mesh.vert_properties[:, :3]).all()
+    assert (f == mesh.tri_verts).all()
+    assert (c == fc).all()
+
+
+def _posts():
+    post = difference(cylinder(8, 3, 48), cylinder(8, 1.2, 24)).color("blue")
+    return Instances(post, [(x * 10, y * 10, 0) for x in range(8) for y in range(6)])
+
+
+@pytest.mark.parametrize("ext", ["3mf", "glb", "stl", "ply", "obj"])
+def test_save_instances(tmp_path, ext):
+    inst = _posts()
+    whole = inst.to_obj3d()
+    fname = str(tmp_path / f"posts.{ext}")
+    save(fname, inst)
+    m = trimesh.load(fname, force="mesh")
+    assert len(m.faces) == whole.num_faces()
+    assert m.volume == pytest.approx(whole.volume(), rel=1e-6)
+    assert m.bounds.ravel() == pytest.approx(whole.bounding_box(), abs=1e-5)
+    if ext in ("3mf", "glb"):
+        scene = trimesh.load(fname)
+        assert len(scene.geometry) == 1
+        assert len(scene.graph.nodes_geometry) == 48
+        save(str(tmp_path / f"whole.{ext}"), whole)
+        assert os.path.getsize(fname) * 10 < os.path.getsize(
+            str(tmp_path / f"whole.{ext}")
+        )
+
+
+@pytest.mark.parametrize("ext", ["3mf", "glb", "stl"])
+def test_save_instances_transforms(tmp_path, ext):
+    o = cube((3, 2, 1)).color("red")
+    mirror = [(-1, 0, 0, 8), (0, 1, 0, 0), (0, 0, 1, 0)]
+    rotate = [(0, -1, 0, 12), (1, 0, 0, 0), (0, 0, 1, 2)]
+    fname = str(tmp_path / f"t.{ext}")
+    save(fname, cube(1), Instances(o, [(0, 0, 0), mirror, rotate]))
+    m = trimesh.load(fname, force="mesh")
+    assert m.volume == pytest.approx(1 + 3 * 6)
+    assert m.bounds.tolist() == [[0, 0, 0], [12, 3, 3]]
+    assert m.is_winding_consistent
+
+
+def test_instances_errors():
+    with pytest.raises(ValidationError):
+        Instances(square(1), [(0, 0, 0)])
+    with pytest.raises(ValidationError):
+        Instances(cube(1), [])
+    with pytest.raises(ValidationError):
+        Instances(cube(1), [(0, 0)])
+
+
+@pytest.mark.parametrize("ext", ["3mf", "glb"])
+@pytest.mark.parametrize("instanced", [True, False], ids=["instances", "whole"])
+def test_save_instances_speed(benchmark, tmp_path, ext, instanced):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    inst = _posts()
+    o = inst if instanced else inst.to_obj3d()
+    fname = str(tmp_path / f"posts.{ext}")
+    benchmark.pedantic(save, (fname, o), rounds=5)
+    benchmark.extra_info["kb"] = os.path.getsize(fname) / 1e3
+
+
+def _svg_points(fname):
+    from svgpathtools import svg2paths
+
+    paths, _ = svg2paths(fname)
+    return [_np.array([s.start for s in p]) for p in paths]
+
+
+def test_save_svg(tmp_path):
+    o1 = difference(square((20, 10)), circle(3, 32).translate((5, 5))).color("red")
+    o2 = square(3).translate((-2, -4))
+    fname = str(tmp_path / "a.svg")
+    save(fname, o1, o2)
+    with open(fname) as f:
+        svg = f.read()
+    assert 'width="22.0mm" height="14.0mm"' in svg
+    assert 'fill="rgb(255,0,0)"' in svg and 'fill="rgb(128,128,128)"' in svg
+    points = _svg_points(fname)
+    assert len(points) == 2
+    # A segment to each point but the first of each polygon (they are closed by the fill).
+    assert len(points[0]) == sum(len(p) - 1 for p in o1.to_paths())
+    # SVG's y axis points down.
+    xs, ys = points[1].real, points[1].imag
+    assert sorted(set(xs.tolist())) == [0, 3] and sorted(set(ys.tolist())) == [11, 14]
+
+
+@pytest.mark.parametrize("precision", [5, 2])
+def test_save_svg_relative(tmp_path, precision):
+    o = union(
+        *[circle(1.2, 64).translate((x * 3, y * 3)) for x in range(5) for y in range(5)]
+    )
+    fname = str(tmp_path / "abs.svg")
+    relname = str(tmp_path / "rel.svg")
+    save(fname, o, svg_precision=precision)
+    save(relname, o, svg_precision=precision, svg_relative=True)
+    p1, p2 = _svg_points(fname)[0], _svg_points(relname)[0]
+    assert p1 == pytest.approx(p2, abs=1e-9)
+    assert _np.abs(p1 - _np.round(p1, precision)).max() < 1e-9
+    assert os.path.getsize(relname) < os.path.getsize(fname)
+    with pytest.raises(ValidationError):
+        save(fname, o, svg_precision=-1)
+
+
+def _svg_big():
+    return union(
+        *[
+            circle(1.2, 64).translate((x * 3, y * 3))
+            for x in range(90)
+            for y in range(90)
+        ]
+    )
+
+
+@pytest.mark.parametrize("relative", [False, True], ids=["absolute", "relative"])
+def test_save_svg_speed(benchmark, tmp_path, relative):
+    if benchmark.disabled:
+        pytest.skip("benchmark only")
+    o = _svg_big()
+    o.to_paths()
+    fname = str(tmp_path / "big.svg")
+    benchmark.pedantic(save, (fname, o), {"svg_relative": relative}, rounds=3)
+    benchmark.extra_info["mb"] = os.path.getsize(fname) / 1e6